@@ -1,5 +0,0 @@
-from django.apps import AppConfig
-
-
-class CollectionjsonConfig(AppConfig):
-    name = 'collectionjson'
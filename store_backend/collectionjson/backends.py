@@ -0,0 +1,125 @@
+"""
+JSON encoding and decoding backends used by the renderers and parsers.
+
+The backend is selected with the JSON_BACKEND setting: 'stdlib' uses Python's json
+module, 'orjson' uses the orjson package and 'auto' (the default) uses orjson when
+it is installed and the stdlib otherwise. Both backends produce the same bytes for
+the documents served by the API. The known differences are in corner cases: orjson
+writes the exponent of very small or very large floats without a sign or padding
+(1e16 instead of 1e+16) and encodes NaN and Infinity as null.
+"""
+
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.utils.json import strict_constant
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+COMPACT_SEPARATORS = (',', ':')
+
+
+class StdlibJsonBackend(object):
+    """
+    JSON backend based on Python's json module.
+    """
+    name = 'stdlib'
+
+    def dumps(self, data, encoder_class=None, ensure_ascii=False, allow_nan=False,
+              indent=None, separators=COMPACT_SEPARATORS):
+        """
+        Custom method to encode data into a JSON bytestring. The \\u2028 and \\u2029
+        characters are always escaped so that the output is a strict javascript
+        subset.
+        """
+        ret = json.dumps(data, cls=encoder_class, indent=indent,
+                         ensure_ascii=ensure_ascii, allow_nan=allow_nan,
+                         separators=separators)
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
+
+    def loads(self, data, strict=True):
+        """
+        Custom method to decode a JSON bytestring or string. Non-standard NaN and
+        Infinity constants are rejected in strict mode.
+        """
+        parse_constant = strict_constant if strict else None
+        return json.loads(data, parse_constant=parse_constant)
+
+
+class OrjsonBackend(StdlibJsonBackend):
+    """
+    JSON backend based on the orjson package. The stdlib backend is used for the
+    requests orjson can't honour (ASCII-only or indented output, non-compact
+    separators) and as a fallback for the values orjson can't handle (such as
+    integers larger than 64 bits or non UTF-8 input).
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImproperlyConfigured("The 'orjson' JSON backend requires the orjson "
+                                       "package.")
+        # date/time values and dataclasses are left to the encoder class so that
+        # they are represented as with the stdlib backend
+        self.options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                        | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+    def dumps(self, data, encoder_class=None, ensure_ascii=False, allow_nan=False,
+              indent=None, separators=COMPACT_SEPARATORS):
+        """
+        Overriden to encode data with orjson whenever the output can be the same as
+        the stdlib one.
+        """
+        if ensure_ascii or indent is not None or tuple(separators) != COMPACT_SEPARATORS:
+            return super(OrjsonBackend, self).dumps(data, encoder_class, ensure_ascii,
+                                                    allow_nan, indent, separators)
+        default = encoder_class().default if encoder_class else None
+        try:
+            ret = orjson.dumps(data, default=default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super(OrjsonBackend, self).dumps(data, encoder_class, ensure_ascii,
+                                                    allow_nan, indent, separators)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9',
+                                                                 b'\\u2029')
+
+    def loads(self, data, strict=True):
+        """
+        Overriden to decode data with orjson. orjson always rejects the non-standard
+        constants so the stdlib backend decides on the data it can't decode.
+        """
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super(OrjsonBackend, self).loads(data, strict)
+
+
+JSON_BACKENDS = {
+    'stdlib': StdlibJsonBackend,
+    'orjson': OrjsonBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def _get_json_backend(name):
+    if name == 'auto':
+        name = 'stdlib' if orjson is None else 'orjson'
+    try:
+        backend_class = JSON_BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown JSON backend '{name}'. Valid backends "
+                                   f"are: auto, {', '.join(JSON_BACKENDS)}.")
+    return backend_class()
+
+
+def get_json_backend():
+    """
+    Convenience function to get the JSON backend selected by the JSON_BACKEND setting.
+    """
+    return _get_json_backend(getattr(settings, 'JSON_BACKEND', 'auto'))
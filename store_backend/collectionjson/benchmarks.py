@@ -0,0 +1,421 @@
+"""
+Benchmarks of the API's serializers and renderers:
+
+- serializers: serialization and rendering of pages of PluginSerializer,
+  PluginMetaSerializer, PipelineSerializer and GenericDefaultPipingParameterSerializer
+  items through the CollectionJsonRenderer, the JSON renderers and the MessagePack
+  renderer (including the size of the rendered pages). The objects are created in a
+  temporary test database.
+- fused: the CollectionJsonRenderer's fused single-pass encoding against the original
+  transform-then-encode rendering path.
+- backends: the available JSON backends for the JSON and tabular renderers and the
+  Collection+JSON parser.
+
+The fused and backends suites use synthetic PluginSerializer items so they don't need
+a database. Run the benchmarks from the store_backend directory:
+
+    python -m collectionjson.benchmarks [number of items ...] [--suite ...]
+        [--output results.json] [--compare baseline.json]
+
+The serializers suite results (per item time, peak allocated memory and size) can be saved
+as JSON with --output and compared with a previous run (for instance for another
+commit) with --compare, in which case the exit status is 1 when any measurement
+regressed beyond --threshold.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+def get_plugin_page(request, n_items):
+    """
+    Custom function to build a paginated page of synthetic serialized plugins.
+    """
+    base_url = request.build_absolute_uri('/api/v1/')
+    results = []
+    for i in range(1, n_items + 1):
+        results.append({
+            'url': f'{base_url}plugins/{i}/',
+            'id': i,
+            'creation_date': '2023-10-01T12:00:00.000000-04:00',
+            'name': f'pl-plugin{i}',
+            'version': '0.1.0',
+            'dock_image': f'fnndsc/pl-plugin{i}:0.1.0',
+            'public_repo': f'https://github.com/FNNDSC/pl-plugin{i}',
+            'icon': '',
+            'type': 'ds',
+            'stars': i % 7,
+            'authors': 'FNNDSC <dev@babyMRI.org>',
+            'title': f'Plugin number {i}',
+            'category': 'Benchmark',
+            'description': 'A synthetic plugin used to benchmark the renderers',
+            'documentation': f'https://github.com/FNNDSC/pl-plugin{i}/README.md',
+            'license': 'MIT',
+            'execshell': 'python3',
+            'selfpath': '/usr/local/bin',
+            'selfexec': f'plugin{i}',
+            'min_number_of_workers': 1,
+            'max_number_of_workers': 1,
+            'min_cpu_limit': 1000,
+            'max_cpu_limit': 2147483647,
+            'min_memory_limit': 200,
+            'max_memory_limit': 2147483647,
+            'min_gpu_limit': 0,
+            'max_gpu_limit': 0,
+            'parameters': f'{base_url}plugins/{i}/parameters/',
+            'pipelines': f'{base_url}plugins/{i}/pipelines/',
+            'meta': f'{base_url}plugins/metas/{i}/',
+        })
+    return {'count': n_items,
+            'next': f'{base_url}plugins/?limit={n_items}&offset={n_items}',
+            'previous': None,
+            'results': results,
+            'collection_links': {'feedback': f'{base_url}feedback/'}}
+
+
+def measure(render, repeat):
+    """
+    Custom function to measure the best wall time and the peak traced memory of a
+    render function.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    render()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def bench_fused_encoding(request, view, sizes, repeat):
+    """
+    Custom function to compare the fused and transform-then-encode Collection+JSON
+    rendering paths.
+    """
+    from unittest import mock
+
+    from rest_framework.response import Response
+
+    from collectionjson.renderers import CollectionJsonRenderer
+
+    renderer = CollectionJsonRenderer()
+    print(f'{"items":>6} {"path":>10} {"time (ms)":>10} {"peak (KiB)":>11}')
+    for n_items in sizes:
+        data = get_plugin_page(request, n_items)
+        context = {'request': request, 'view': view, 'response': Response()}
+
+        def render():
+            # the renderer pops document-level keys so every run gets a fresh copy
+            return renderer.render(dict(data), renderer.media_type, context)
+
+        fused = measure(render, repeat)
+        with mock.patch.object(CollectionJsonRenderer, 'fused_encoding', False):
+            transformed = measure(render, repeat)
+        for (path, (best, peak)) in (('transform', transformed), ('fused', fused)):
+            print(f'{n_items:>6} {path:>10} {best * 1000:>10.3f} {peak / 1024:>11.1f}')
+
+
+def bench_json_backends(request, view, sizes, repeat):
+    """
+    Custom function to compare the JSON backends when rendering JSON and tabular
+    JSON pages and when parsing Collection+JSON templates (also against MessagePack).
+    """
+    import io
+
+    from django.test import override_settings
+    from rest_framework.response import Response
+
+    from collectionjson import backends
+    from collectionjson.parsers import CollectionJsonParser, CollectionMsgpackParser
+    from collectionjson.renderers import BackendJSONRenderer, TableJsonRenderer, msgpack
+
+    names = ['stdlib'] + ([] if backends.orjson is None else ['orjson'])
+    print(f'{"items":>6} {"operation":>10} {"backend":>8} {"time (ms)":>10} '
+          f'{"peak (KiB)":>11}')
+    for n_items in sizes:
+        data = get_plugin_page(request, n_items)
+        context = {'request': request, 'view': view, 'response': Response()}
+        template = {'template': {'data': [{'name': k, 'value': v} for (k, v) in
+                                          data['results'][0].items()] * n_items}}
+        content = backends.StdlibJsonBackend().dumps(template)
+        operations = (
+            ('json', lambda: BackendJSONRenderer().render(data, None, context)),
+            ('table', lambda: TableJsonRenderer().render(dict(data), None, context)),
+            ('parse', lambda: CollectionJsonParser().parse(io.BytesIO(content))),
+        )
+        for (operation, run) in operations:
+            for name in names:
+                with override_settings(JSON_BACKEND=name):
+                    (best, peak) = measure(run, repeat)
+                print(f'{n_items:>6} {operation:>10} {name:>8} {best * 1000:>10.3f} '
+                      f'{peak / 1024:>11.1f}')
+        if msgpack is not None:
+            # the same template as MessagePack for comparison
+            packed = msgpack.packb(template)
+            (best, peak) = measure(
+                lambda: CollectionMsgpackParser().parse(io.BytesIO(packed)), repeat)
+            print(f'{n_items:>6} {"parse":>10} {"msgpack":>8} {best * 1000:>10.3f} '
+                  f'{peak / 1024:>11.1f}')
+
+
+def create_fixtures(n_items):
+    """
+    Custom function to create the objects of the serializers benchmark in the database.
+    """
+    from django.contrib.auth.models import User
+
+    from plugins.models import PluginMeta, PluginMetaStar, Plugin, PluginParameter
+    from pipelines.models import Pipeline, PluginPiping
+
+    user = User.objects.create_user(username='benchmark', password='benchmark-pass')
+    metas = PluginMeta.objects.bulk_create([
+        PluginMeta(name=f'pl-plugin{i}', title=f'Plugin number {i}', type='ds',
+                   public_repo=f'https://github.com/FNNDSC/pl-plugin{i}',
+                   license='MIT', category='Benchmark', authors='FNNDSC',
+                   documentation=f'https://github.com/FNNDSC/pl-plugin{i}/README.md')
+        for i in range(n_items)])
+    PluginMetaStar.objects.bulk_create([PluginMetaStar(meta=meta, user=user)
+                                        for meta in metas[::3]])
+    plugins = Plugin.objects.bulk_create([
+        Plugin(meta=meta, version='0.1.0', dock_image=f'fnndsc/{meta.name}:0.1.0',
+               description='A plugin used to benchmark the serializers',
+               execshell='python3', selfpath='/usr/local/bin', selfexec=meta.name)
+        for meta in metas])
+    Pipeline.objects.bulk_create([
+        Pipeline(name=f'Pipeline{i}', owner=user, locked=False, category='Benchmark',
+                 authors='FNNDSC', description='A pipeline used to benchmark the '
+                                               'serializers')
+        for i in range(n_items)])
+
+    # a pipeline with a chain of pipings of a plugin with 10 parameters with defaults
+    pipeline = Pipeline.objects.create(name='Defaults', owner=user)
+    params = PluginParameter.objects.bulk_create([
+        PluginParameter(plugin=plugins[0], name=f'param{i}', flag=f'--param{i}',
+                        type='string', optional=True) for i in range(10)])
+    defaults = [{'name': param.name, 'default': f'{param.name} value'}
+                for param in params]
+    previous = None
+    for _ in range(max(n_items // len(params), 1)):
+        previous = PluginPiping(plugin=plugins[0], pipeline=pipeline, previous=previous)
+        previous.save(parameter_defaults=defaults)
+    return pipeline
+
+
+def get_serializer_querysets(pipeline):
+    """
+    Custom function to get the querysets of the serializers benchmark. The related
+    objects are fetched in the same queries so that serializing doesn't hit the
+    database.
+    """
+    from plugins.models import PluginMeta, Plugin
+    from plugins.serializers import PluginMetaSerializer, PluginSerializer
+    from pipelines.models import Pipeline
+    from pipelines.serializers import (PipelineSerializer,
+                                       GenericDefaultPipingParameterSerializer)
+
+    return (
+        (PluginSerializer,
+         Plugin.objects.select_related('meta').prefetch_related('meta__fans')),
+        (PluginMetaSerializer, PluginMeta.objects.prefetch_related('fans')),
+        (PipelineSerializer,
+         Pipeline.objects.select_related('owner').exclude(id=pipeline.id)),
+        (GenericDefaultPipingParameterSerializer, pipeline.get_default_parameters()),
+    )
+
+
+def bench_serializers(request, sizes, repeat):
+    """
+    Custom function to measure the per item time of serializing and rendering pages of
+    the API's main serializers and the per item peak memory allocated to do both.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    from rest_framework.generics import GenericAPIView
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.response import Response
+
+    from collectionjson.renderers import (CollectionJsonRenderer, BackendJSONRenderer,
+                                          CollectionMsgpackRenderer, msgpack)
+
+    renderers = (('collection+json', CollectionJsonRenderer),
+                 ('json', BackendJSONRenderer), ('json (drf)', JSONRenderer))
+    if msgpack is not None:
+        renderers += (('collection+msgpack', CollectionMsgpackRenderer),)
+    results = []
+    print(f'{"serializer":>40} {"renderer":>18} {"items":>6} {"serialize (us)":>15} '
+          f'{"render (us)":>12} {"peak (B)":>9} {"size (B)":>9}')
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        pipeline = create_fixtures(max(sizes))
+        for (serializer_class, queryset) in get_serializer_querysets(pipeline):
+            view = GenericAPIView(serializer_class=serializer_class, request=request,
+                                  format_kwarg=None)
+            for n_items in sizes:
+                objects = list(queryset[:n_items])
+                context = {'request': request, 'view': view, 'response': Response()}
+
+                def serialize():
+                    serializer = serializer_class(objects, many=True,
+                                                  context={'request': request})
+                    return {'count': len(objects), 'next': None, 'previous': None,
+                            'results': serializer.data}
+                data = serialize()
+                (serialize_time, _) = measure(serialize, repeat)
+
+                for (renderer_name, renderer_class) in renderers:
+                    renderer = renderer_class()
+
+                    def render():
+                        # the renderer pops document-level keys so every run gets a
+                        # fresh copy
+                        return renderer.render(dict(data), renderer.media_type,
+                                               context)
+
+                    def serialize_and_render():
+                        return renderer.render(serialize(), renderer.media_type,
+                                               context)
+                    (render_time, _) = measure(render, repeat)
+                    size = len(render())
+                    (_, peak) = measure(serialize_and_render, 1)
+                    result = {
+                        'serializer': serializer_class.__name__,
+                        'renderer': renderer_name,
+                        'items': n_items,
+                        'serialize_us_per_item': serialize_time * 1e6 / n_items,
+                        'render_us_per_item': render_time * 1e6 / n_items,
+                        'peak_bytes_per_item': peak / n_items,
+                        'size_bytes_per_item': size / n_items,
+                    }
+                    results.append(result)
+                    print(f'{result["serializer"]:>40} {renderer_name:>18} '
+                          f'{n_items:>6} {result["serialize_us_per_item"]:>15.2f} '
+                          f'{result["render_us_per_item"]:>12.2f} '
+                          f'{result["peak_bytes_per_item"]:>9.0f} '
+                          f'{result["size_bytes_per_item"]:>9.0f}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+    return results
+
+
+def get_environment():
+    """
+    Custom function to describe the environment of a benchmark run.
+    """
+    import django
+
+    from collectionjson.backends import get_json_backend
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit,
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'json_backend': get_json_backend().name}
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Custom function to print the per item time and peak memory ratios of the results
+    against the ones of a baseline run and return the number of measurements that
+    regressed beyond the threshold (a fraction).
+    """
+    def key(result):
+        return (result['serializer'], result['renderer'], result['items'])
+
+    baseline_results = {key(result): result for result in baseline['results']}
+    metrics = ('serialize_us_per_item', 'render_us_per_item', 'peak_bytes_per_item',
+               'size_bytes_per_item')
+    regressions = 0
+    print(f'Comparison against commit {baseline["environment"].get("commit")} '
+          f'(ratio of new to old, regressions beyond {threshold:.0%} are marked):')
+    print(f'{"serializer":>40} {"renderer":>18} {"items":>6} {"serialize":>8} '
+          f'{"render":>8} {"peak":>8} {"size":>8}')
+    for result in results:
+        old = baseline_results.get(key(result))
+        if old is None:
+            continue
+        ratios = []
+        for metric in metrics:
+            # metrics missing from the baseline (added later) are not compared
+            ratio = result[metric] / old[metric] if old.get(metric) else 1.0
+            marker = ''
+            if ratio > 1 + threshold:
+                marker = '!'
+                regressions += 1
+            ratios.append(f'{ratio:>7.2f}{marker:1}')
+        print(f'{result["serializer"]:>40} {result["renderer"]:>18} '
+              f'{result["items"]:>6} ' + ' '.join(ratios))
+    return regressions
+
+
+def main(argv=None):
+    from rest_framework.generics import GenericAPIView
+    from rest_framework.test import APIRequestFactory
+
+    from plugins.serializers import PluginSerializer
+
+    parser = argparse.ArgumentParser(prog='python -m collectionjson.benchmarks',
+                                     description='Benchmark the API serializers and '
+                                                 'renderers.')
+    parser.add_argument('sizes', nargs='*', type=int, default=[10, 100, 1000],
+                        help='number of items of the benchmarked pages')
+    suites = ['serializers', 'fused', 'backends']
+    parser.add_argument('--suite', nargs='+', default=suites, choices=suites)
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='number of timed runs (the best one is reported)')
+    parser.add_argument('--output', help='JSON file to save the serializers results')
+    parser.add_argument('--compare', help='JSON file with the serializers results of '
+                                          'a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative increase reported as a regression')
+    args = parser.parse_args(argv)
+
+    request = GenericAPIView().initialize_request(
+        APIRequestFactory().get('/api/v1/plugins/'))
+    view = GenericAPIView(serializer_class=PluginSerializer, request=request,
+                          format_kwarg=None)
+    regressions = 0
+    if 'serializers' in args.suite:
+        results = bench_serializers(request, args.sizes, args.repeat)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'environment': get_environment(), 'results': results}, f,
+                          indent=2)
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+            print()
+            regressions = compare_results(results, baseline, args.threshold)
+        print()
+    if 'fused' in args.suite:
+        bench_fused_encoding(request, view, args.sizes, args.repeat)
+        print()
+    if 'backends' in args.suite:
+        bench_json_backends(request, view, args.sizes, args.repeat)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.local')
+    import django
+    django.setup()
+    sys.exit(main())
@@ -1,7 +1,35 @@
-
+from rest_framework import serializers
 from rest_framework.fields import SerializerMethodField
 
+from .links import reverse_link
+
 
 class ItemLinkField(SerializerMethodField):
     def __init__(self, method_name, *args, **kwargs):
         super(ItemLinkField, self).__init__(method_name, *args, **kwargs)
+
+
+class LinkTemplateMixin(object):
+    """
+    Hyperlinked field mixin to format the URLs from link templates instead of
+    resolving them with reverse() for every serialized object.
+    """
+
+    def get_url(self, obj, view_name, request, format):
+        """
+        Overriden to get the URL from the view's link template.
+        """
+        # unsaved objects will not yet have a valid URL
+        if hasattr(obj, 'pk') and obj.pk in (None, ''):
+            return None
+        lookup_value = getattr(obj, self.lookup_field)
+        return reverse_link(view_name, self.lookup_url_kwarg, lookup_value, request,
+                            format)
+
+
+class HyperlinkedRelatedField(LinkTemplateMixin, serializers.HyperlinkedRelatedField):
+    pass
+
+
+class HyperlinkedIdentityField(LinkTemplateMixin, serializers.HyperlinkedIdentityField):
+    pass
@@ -0,0 +1,14 @@
+
+from rest_framework.filters import BaseFilterBackend
+
+from .services import get_sparse_queryset
+
+
+class SparseFieldsetFilter(BaseFilterBackend):
+    """
+    Filter backend to restrict the columns fetched from the DB to the ones needed by
+    the requested sparse fieldset (see SparseFieldsetSerializerMixin).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return get_sparse_queryset(view, queryset)
@@ -0,0 +1,91 @@
+"""
+Link templates to build the hyperlinks of the serialized objects without resolving
+each URL with reverse().
+
+The URL of a view with a single integer keyword argument (such as a detail view's
+primary key) is computed once per view name by reversing it with a sentinel value
+and splitting the result into a prefix and a suffix. The hrefs are then formatted by
+concatenating the prefix, the integer and the suffix. Anything a template can't
+reproduce (non-integer values, format suffixes, API versioning or the format query
+parameter) falls back to DRF's reverse().
+"""
+
+from django.conf import settings
+from django.urls import get_script_prefix, get_urlconf, reverse as django_reverse
+from django.urls import NoReverseMatch
+
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+
+SENTINEL = 9223372036854775807  # largest 64-bit integer, not a plausible URL part
+
+# link templates by URLconf, script prefix, view name and keyword argument name
+_LINK_TEMPLATES = {}
+
+
+def get_link_template(view_name, kwarg='pk', urlconf=None):
+    """
+    Convenience function to get the (prefix, suffix) template of the host-relative URL
+    of a view with a single integer keyword argument. None is returned when the URL
+    can't be formatted from a template.
+    """
+    urlconf = urlconf or get_urlconf() or settings.ROOT_URLCONF
+    key = (urlconf, get_script_prefix(), view_name, kwarg)
+    try:
+        return _LINK_TEMPLATES[key]
+    except KeyError:
+        pass
+    template = None
+    try:
+        url = django_reverse(view_name, urlconf=urlconf, kwargs={kwarg: SENTINEL})
+    except NoReverseMatch:
+        url = ''
+    parts = url.split(str(SENTINEL))
+    if len(parts) == 2:
+        # make sure the template reproduces reverse() for another value
+        url = django_reverse(view_name, urlconf=urlconf, kwargs={kwarg: 1})
+        if url == parts[0] + '1' + parts[1]:
+            template = tuple(parts)
+    _LINK_TEMPLATES[key] = template
+    return template
+
+
+def get_absolute_link_template(request, view_name, kwarg='pk'):
+    """
+    Convenience function to get the (prefix, suffix) template of the absolute URL of a
+    view with a single integer keyword argument for a request. The templates are
+    cached in the request as the host, script prefix and URLconf can't change during
+    the request. None is returned when the URL can't be formatted from a template.
+    """
+    try:
+        templates = request._absolute_link_templates
+    except AttributeError:
+        templates = request._absolute_link_templates = {}
+    try:
+        return templates[(view_name, kwarg)]
+    except KeyError:
+        pass
+    template = None
+    if (getattr(request, 'versioning_scheme', None) is None
+            and api_settings.URL_FORMAT_OVERRIDE not in request.GET):
+        relative_template = get_link_template(view_name, kwarg)
+        if relative_template is not None:
+            template = (request.build_absolute_uri(relative_template[0]),
+                        relative_template[1])
+    templates[(view_name, kwarg)] = template
+    return template
+
+
+def reverse_link(view_name, kwarg, value, request=None, format=None):
+    """
+    Convenience function to get the URL of a view with a single keyword argument from
+    its link template. The result is the same as the one of DRF's reverse().
+    """
+    if type(value) is int and format is None:
+        if request is None:
+            template = get_link_template(view_name, kwarg)
+        else:
+            template = get_absolute_link_template(request, view_name, kwarg)
+        if template is not None:
+            return template[0] + str(value) + template[1]
+    return reverse(view_name, kwargs={kwarg: value}, request=request, format=format)
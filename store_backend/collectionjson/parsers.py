@@ -1,17 +1,57 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
 from rest_framework.parsers import JSONParser
 from rest_framework.exceptions import ParseError
 
-class CollectionJsonParser(JSONParser):
+from .backends import get_json_backend
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class BackendJSONParser(JSONParser):
+    """
+    JSON parser that decodes the data with the backend selected by the JSON_BACKEND
+    setting.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Overriden to decode the incoming bytestream with the configured JSON backend.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return get_json_backend().loads(data, strict=self.strict)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class CollectionJsonParser(BackendJSONParser):
     media_type = 'application/vnd.collection+json'
 
-    def validate_data(self, stream_data):
+    def validate_data(self, stream_data, allow_batch=False):
         template_valid_str = "Valid format: {template:{data:[{name: ,value: },...]}}"
+        batch_valid_str = "Valid format: {templates:[{data:[{name: ,value: },...]},...]}"
 
         if not isinstance(stream_data, dict):
             detail = "Template is not a dictionary. "
             detail += template_valid_str
             raise ParseError(detail=detail)
 
+        if 'templates' in stream_data:
+            if not allow_batch:
+                raise ParseError(detail="A batch of templates is not accepted by this "
+                                        "resource. " + template_valid_str)
+            return self.validate_batch_data(stream_data['templates'], batch_valid_str)
+
         json_data = {}
         try:
             for x in stream_data['template']['data']:
@@ -26,9 +66,58 @@ class CollectionJsonParser(JSONParser):
             raise ParseError(detail=detail)
         return json_data 
 
+    def validate_batch_data(self, templates, batch_valid_str):
+        """
+        Custom method to validate a batch of templates and return a list with the data
+        of each template.
+        """
+        max_size = getattr(settings, 'COLLECTION_JSON_MAX_BATCH_SIZE', 100)
+        if not isinstance(templates, list) or not templates:
+            detail = "Templates is not a non-empty list. "
+            detail += batch_valid_str
+            raise ParseError(detail=detail)
+        if len(templates) > max_size:
+            raise ParseError(detail=f"A batch can not have more than {max_size} "
+                                    f"templates.")
+        batch_data = []
+        for (i, template) in enumerate(templates):
+            try:
+                batch_data.append(self.validate_data({'template': template}))
+            except ParseError as e:
+                raise ParseError(detail=f"Template {i}: {e.detail}")
+        return batch_data
+
+    @staticmethod
+    def is_batch_allowed(parser_context):
+        """
+        Custom method to check whether the view receiving the request accepts a batch
+        of templates. Views opt in by setting their allow_batch_create attribute.
+        """
+        view = (parser_context or {}).get('view')
+        return getattr(view, 'allow_batch_create', False)
+
     def parse(self, stream, media_type=None, parser_context=None):
         stream_data = super(CollectionJsonParser, self).parse(stream, media_type,
                                                           parser_context)
-        return self.validate_data(stream_data)
+        return self.validate_data(stream_data, self.is_batch_allowed(parser_context))
+
 
+class CollectionMsgpackParser(CollectionJsonParser):
+    """
+    Parser of Collection+JSON templates encoded as MessagePack. It requires the
+    msgpack package.
+    """
+    media_type = 'application/vnd.collection+msgpack'
 
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Overriden to decode the incoming bytestream as MessagePack.
+        """
+        if msgpack is None:
+            raise ImproperlyConfigured("The MessagePack parser requires the msgpack "
+                                       "package.")
+        try:
+            stream_data = msgpack.unpackb(stream.read())
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
+        return self.validate_data(stream_data, self.is_batch_allowed(parser_context))
@@ -1,15 +1,53 @@
 import json
+from json.encoder import encode_basestring, encode_basestring_ascii
 
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework.serializers import HyperlinkedRelatedField, HyperlinkedIdentityField
 from rest_framework.serializers import HyperlinkedModelSerializer, ManyRelatedField
 from rest_framework.renderers import JSONRenderer
 
+from .backends import get_json_backend
 from .fields import ItemLinkField
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
-class CollectionJsonRenderer(JSONRenderer):
+
+class BackendJSONRenderer(JSONRenderer):
+    """
+    JSON renderer that encodes the data with the backend selected by the
+    JSON_BACKEND setting.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Overriden to encode the data with the configured JSON backend.
+        """
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+
+        if indent is None:
+            separators = (',', ':') if self.compact else (', ', ': ')
+        else:
+            separators = (',', ': ')
+
+        return get_json_backend().dumps(data, self.encoder_class,
+                                        ensure_ascii=self.ensure_ascii,
+                                        allow_nan=not self.strict, indent=indent,
+                                        separators=separators)
+
+
+class CollectionJsonRenderer(BackendJSONRenderer):
     media_type = 'application/vnd.collection+json'
     format = 'collection+json'
+    # subclasses that override the _transform_* methods should set this to False
+    # so that their output goes through the transform-then-encode path
+    fused_encoding = True
 
     def _transform_field(self, key, value):
         return {'name': key, 'value': value}
@@ -156,13 +194,296 @@ class CollectionJsonRenderer(JSONRenderer):
 
         return {'collection': collection}
 
+    def _can_fuse(self, response, view, media_type, renderer_context):
+        return (self.fused_encoding and not response.exception and view is not None
+                and view.get_view_name() != 'Api Root'
+                and self.get_indent(media_type, renderer_context) is None)
+
+    def _encode_data(self, request, view, data):
+        """
+        Custom method to encode the serialized data directly into a Collection+JSON
+        document in a single pass, without building the intermediate collection
+        structure. The output is byte for byte the same as the one of the
+        _transform_data + JSONRenderer.render path.
+        """
+        item_sep, key_sep = (',', ':') if self.compact else (', ', ': ')
+        encode_str = encode_basestring_ascii if self.ensure_ascii else encode_basestring
+        encoder = self.encoder_class(ensure_ascii=self.ensure_ascii,
+                                     allow_nan=not self.strict,
+                                     separators=(item_sep, key_sep))
+
+        def encode(value):
+            cls = value.__class__
+            if cls is str:
+                return encode_str(value)
+            if value is None:
+                return 'null'
+            if cls is int:
+                return int.__repr__(value)
+            if cls is bool:
+                return 'true' if value else 'false'
+            return encoder.encode(value)
+
+        # encoded prefixes of the Collection+JSON objects, cached by field name
+        field_prefixes = {}
+        link_prefixes = {}
+
+        def field_prefix(name):
+            prefix = field_prefixes.get(name)
+            if prefix is None:
+                prefix = field_prefixes[name] = (
+                        '{"name"' + key_sep + encode_str(name) + item_sep + '"value"'
+                        + key_sep)
+            return prefix
+
+        def link_prefix(rel):
+            prefix = link_prefixes.get(rel)
+            if prefix is None:
+                prefix = link_prefixes[rel] = (
+                        '{"rel"' + key_sep + encode_str(rel) + item_sep + '"href"'
+                        + key_sep)
+            return prefix
+
+        def write_links(links):
+            # links is an iterable of (rel, href) pairs
+            parts.append('[')
+            first = True
+            for (rel, href) in links:
+                if not first:
+                    parts.append(item_sep)
+                first = False
+                parts.append(link_prefix(rel))
+                parts.append(encode(href))
+                parts.append('}')
+            parts.append(']')
+
+        parts = ['{"collection"', key_sep, '{"version"', key_sep, '"1.0"', item_sep,
+                 '"href"', key_sep, encode(self.get_href(request)), item_sep,
+                 '"items"', key_sep, '[']
+
+        is_paginated = self._is_paginated(data)
+        items = self._get_items_from_paginated_data(data) if is_paginated else data
+        if isinstance(items, dict):
+            # document-level properties are not part of the item
+            excluded = ('collection_links', 'queries', 'template')
+            items = [{k: v for (k, v) in items.items() if k not in excluded}]
+
+        id_field = None
+        related_fields = ()
+        if hasattr(view, 'get_serializer'):
+            serializer = view.get_serializer()
+            fields = serializer.fields.items()  # also sets the serializer's url_field_name
+            id_field = self._get_id_field(serializer)
+            related_fields = self._get_related_fields(fields, id_field)
+        excluded_fields = set(related_fields)
+        excluded_fields.add(id_field)
+        data_prefix = '{"data"' + key_sep + '['
+        for (i, item) in enumerate(items):
+            if i:
+                parts.append(item_sep)
+            parts.append(data_prefix)
+            parts.append(item_sep.join([(field_prefixes.get(k) or field_prefix(k))
+                                        + encode(v) + '}'
+                                        for (k, v) in item.items()
+                                        if k not in excluded_fields]))
+            parts.append(']')
+            if id_field:
+                parts.append(item_sep + '"href"' + key_sep)
+                parts.append(encode(item[id_field]))
+            item_links = []
+            for rel in related_fields:
+                v = item.get(rel)
+                if isinstance(v, list):
+                    item_links.extend((rel, x) for x in v)
+                elif v is not None:
+                    item_links.append((rel, v))
+            if item_links:
+                parts.append(item_sep + '"links"' + key_sep)
+                write_links(item_links)
+            parts.append('}')
+        parts.append(']')
+
+        links = []
+        if 'collection_links' in data:
+            links.extend(data['collection_links'].items())
+        if is_paginated:
+            links.extend((rel, data[rel]) for rel in ('next', 'previous')
+                         if data.get(rel, None))
+        parts.append(item_sep + '"links"' + key_sep)
+        write_links(links)
+
+        for (key, name) in (('queries', 'queries'), ('template', 'template'),
+                            ('count', 'total')):
+            if key in data:
+                parts.append(item_sep + encode_str(name) + key_sep)
+                parts.append(encode(data[key]))
+        parts.append('}}')
+
+        ret = ''.join(parts)
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
+
     def render(self, data, media_type=None, renderer_context=None):
         request = renderer_context['request']
         view = renderer_context['view']
         response = renderer_context['response']
 
+        if data and self._can_fuse(response, view, media_type, renderer_context):
+            return self._encode_data(request, view, data)
+
         if data:
             data = self._transform_data(request, response, view, data)
 
         return super(CollectionJsonRenderer, self).render(data, media_type,
                                                           renderer_context)
+
+
+class TableJsonRenderer(CollectionJsonRenderer):
+    """
+    Renderer of a compact tabular JSON representation for machine clients. Field
+    names are emitted once as columns and items as rows of values. Link fields are
+    plain href columns that are listed in 'link_columns'.
+    """
+    media_type = 'application/vnd.chris.table+json'
+    format = 'table+json'
+
+    def _get_columns(self, view, items):
+        if items:
+            return list(items[0].keys())
+        if hasattr(view, 'get_serializer'):
+            return [k for (k, v) in view.get_serializer().fields.items()
+                    if not v.write_only]
+        return []
+
+    def _get_link_columns(self, view, columns):
+        if not hasattr(view, 'get_serializer'):
+            return []
+        serializer = view.get_serializer()
+        fields = serializer.fields.items()
+        id_field = self._get_id_field(serializer)
+        link_fields = set(self._get_related_fields(fields, id_field))
+        link_fields.add(id_field)
+        return [k for k in columns if k in link_fields]
+
+    def _get_rows_and_links(self, view, data):
+        links = {}
+        if 'collection_links' in data:
+            links.update(data.pop('collection_links'))
+
+        if view.get_view_name() == 'Api Root':
+            links.update(data)
+            return {'columns': [], 'link_columns': [], 'rows': [], 'links': links}
+
+        items = data
+        if self._is_paginated(data):
+            links.update((rel, data[rel]) for rel in ('next', 'previous')
+                         if data.get(rel, None))
+            items = self._get_items_from_paginated_data(data)
+        elif isinstance(data, dict):
+            excluded = ('queries', 'template')
+            items = [{k: v for (k, v) in data.items() if k not in excluded}]
+
+        columns = self._get_columns(view, items)
+        return {
+            'columns': columns,
+            'link_columns': self._get_link_columns(view, columns),
+            'rows': [[item.get(k) for k in columns] for item in items],
+            'links': links,
+        }
+
+    def _transform_data(self, request, response, view, data):
+        """
+        Overriden to build the tabular representation instead of a Collection+JSON
+        document.
+        """
+        table = {
+            "version": "1.0",
+            "href": self.get_href(request),
+        }
+
+        if response.exception:
+            table.update(self._get_error(data))
+        else:
+            table.update(self._get_rows_and_links(view, data))
+
+        if 'queries' in data:
+            table['queries'] = data.pop('queries')
+
+        if 'template' in data:
+            table['template'] = data.pop('template')
+
+        if 'count' in data:
+            table['total'] = data['count']
+
+        return {'table': table}
+
+    def render(self, data, media_type=None, renderer_context=None):
+        """
+        Overriden to always transform the data before encoding it.
+        """
+        if data:
+            data = self._transform_data(renderer_context['request'],
+                                        renderer_context['response'],
+                                        renderer_context['view'], data)
+        return BackendJSONRenderer.render(self, data, media_type, renderer_context)
+
+
+class CollectionMsgpackRenderer(CollectionJsonRenderer):
+    """
+    Renderer of the Collection+JSON document structure encoded as MessagePack, a
+    compact binary format that is faster to encode and decode than JSON. It requires
+    the msgpack package.
+    """
+    media_type = 'application/vnd.collection+msgpack'
+    format = 'collection+msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def _transform_items(self, view, data):
+        """
+        Overriden to look up the serializer's id and related fields once per document
+        instead of once per item and to return a list (a native MessagePack type).
+        """
+        if isinstance(data, dict):
+            data = [data]
+
+        if not hasattr(view, 'get_serializer'):
+            return [self._simple_transform_item(x) for x in data]
+
+        serializer = view.get_serializer()
+        fields = serializer.fields.items()
+        id_field = self._get_id_field(serializer)
+        related_fields = self._get_related_fields(fields, id_field)
+        excluded = set(related_fields)
+        excluded.add(id_field)
+
+        items = []
+        for item in data:
+            result = {'data': [{'name': k, 'value': v} for (k, v) in item.items()
+                               if k not in excluded]}
+            if id_field:
+                result['href'] = item[id_field]
+            links = []
+            for x in related_fields:
+                links.extend(self._get_item_field_links(x, item))
+            if links:
+                result['links'] = links
+            items.append(result)
+        return items
+
+    def render(self, data, media_type=None, renderer_context=None):
+        """
+        Overriden to encode the Collection+JSON document structure as MessagePack.
+        """
+        if data is None:
+            return b''
+        if msgpack is None:
+            raise ImproperlyConfigured("The MessagePack renderer requires the msgpack "
+                                       "package.")
+        if data:
+            data = self._transform_data(renderer_context['request'],
+                                        renderer_context['response'],
+                                        renderer_context['view'], data)
+        # values that are not native MessagePack types (including the lazy iterables
+        # of items) are converted as with the JSON renderers
+        return msgpack.packb(data, default=self.encoder_class().default)
@@ -0,0 +1,44 @@
+
+from rest_framework import serializers
+
+from .fields import HyperlinkedIdentityField, HyperlinkedRelatedField
+from .services import get_sparse_fieldset
+
+
+class SparseFieldsetSerializerMixin(object):
+    """
+    Serializer mixin to prune the serializer's fields to the sparse fieldset requested
+    through the comma-separated 'fields' and 'exclude' query parameters of a GET
+    request. Only the top-level serializer (or the child of a top-level list
+    serializer) is pruned. The url field of hyperlinked serializers is always kept as
+    it is the href of the collection+json items. Unknown field names are ignored.
+    """
+
+    def get_fields(self):
+        """
+        Overriden to remove the fields that are not in the requested sparse fieldset.
+        """
+        fields = super(SparseFieldsetSerializerMixin, self).get_fields()
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields  # nested serializer
+        (only, exclude) = get_sparse_fieldset(self.context.get('request'))
+        url_field_name = getattr(self, 'url_field_name', None)
+        for name in list(fields.keys()):
+            if name == url_field_name:
+                continue
+            if (only is not None and name not in only) or (exclude and name in exclude):
+                del fields[name]
+        return fields
+
+
+class LinkTemplateSerializerMixin(object):
+    """
+    Hyperlinked model serializer mixin to build the serializer's url and hyperlinked
+    relationship fields from link templates instead of resolving every URL with
+    reverse().
+    """
+    serializer_url_field = HyperlinkedIdentityField
+    serializer_related_field = HyperlinkedRelatedField
@@ -1,10 +1,113 @@
 
+import hashlib
+from functools import lru_cache
 from urllib.parse import urlparse
 
-from django.urls import resolve
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import QuerySet
+from django.urls import get_script_prefix, get_urlconf, resolve, reverse
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import quote_etag
 
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
-from rest_framework import serializers
+from rest_framework import serializers, status
+
+from .fields import ItemLinkField
+
+# precomputed collection+json write templates by template data
+_TEMPLATES = {}
+
+
+def get_sparse_fieldset(request):
+    """
+    Convenience function to get the sets of field names requested by a safe request
+    through the comma-separated 'fields' and 'exclude' query parameters. None is
+    returned for a parameter that is not provided.
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return (None, None)
+    query_params = getattr(request, 'query_params', request.GET)
+    fieldset = []
+    for param in ('fields', 'exclude'):
+        names = {name.strip() for name in query_params.get(param, '').split(',')}
+        names.discard('')
+        fieldset.append(names or None)
+    return tuple(fieldset)
+
+
+def get_serializer_columns(serializer, model):
+    """
+    Convenience function to get the model field paths (in the format of the queryset's
+    only() method) that are needed to compute the readable fields of a serializer.
+    None is returned if a field's source can not be mapped to model fields (for
+    instance method fields or properties of the model itself).
+    """
+    columns = {model._meta.pk.name}
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.ManyRelatedField):
+            field = field.child_relation
+        if field.source == '*':
+            if not isinstance(field, serializers.HyperlinkedIdentityField):
+                return None
+            source_attrs = [field.lookup_field]
+        else:
+            source_attrs = field.source_attrs
+        path = []
+        current_model = model
+        for attr in source_attrs:
+            if attr == 'pk':
+                attr = current_model._meta.pk.name
+            try:
+                model_field = current_model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                if not path:
+                    return None  # property or method of the model itself
+                break  # the whole related object is needed
+            if not model_field.concrete:
+                path.append(current_model._meta.pk.name)  # reverse or m2m relation
+                break
+            path.append(attr)
+            if not model_field.is_relation:
+                break
+            current_model = model_field.related_model
+        columns.add('__'.join(path))
+    return columns
+
+
+def get_sparse_queryset(view_instance, queryset):
+    """
+    Convenience function to restrict the columns fetched by a queryset to the ones
+    needed by a view's serializer when a sparse fieldset is requested. The queryset
+    is returned unchanged when the columns can't be safely determined.
+    """
+    request = getattr(view_instance, 'request', None)
+    if (not isinstance(queryset, QuerySet) or queryset.query.combinator
+            or queryset.query.select_related is True
+            or get_sparse_fieldset(request) == (None, None)):
+        return queryset
+    columns = get_serializer_columns(view_instance.get_serializer(), queryset.model)
+    if columns is None:
+        return queryset
+    # the needed columns of related models are fetched in the same query
+    relations = {column.rsplit('__', 1)[0] for column in columns if '__' in column}
+    if relations:
+        queryset = queryset.select_related(*relations)
+
+    # relations traversed by select_related can't be deferred
+    def add_select_related(tree, prefix):
+        for (name, subtree) in tree.items():
+            path = prefix + name
+            if not any(c == path or c.startswith(path + '__') for c in columns):
+                columns.add(path)
+            add_select_related(subtree, path + '__')
+    add_select_related(queryset.query.select_related or {}, '')
+    return queryset.only(*columns)
 
 
 def get_list_response(list_view_instance, queryset):
@@ -12,6 +115,7 @@ def get_list_response(list_view_instance, queryset):
     Convenience function to get an HTTP response with a list of objects
     from a list view instance and a queryset
     """
+    queryset = get_sparse_queryset(list_view_instance, queryset)
     page = list_view_instance.paginate_queryset(queryset)
     if page is not None:
         serializer = list_view_instance.get_serializer(page, many=True)
@@ -21,6 +125,35 @@ def get_list_response(list_view_instance, queryset):
     return Response(serializer.data)
 
 
+def get_batch_create_response(create_view_instance, batch_data):
+    """
+    Convenience function to get an HTTP response from a create view instance after
+    creating a batch of objects from a list of data dictionaries. The objects are
+    created in order within a single transaction, so either all of them or none are
+    saved. The response has the representation of each created object or, when any
+    of the items is invalid, the errors of each item (empty for the valid ones).
+    """
+    results = []
+    errors = []
+    with transaction.atomic():
+        for data in batch_data:
+            serializer = create_view_instance.get_serializer(data=data)
+            try:
+                with transaction.atomic():
+                    serializer.is_valid(raise_exception=True)
+                    create_view_instance.perform_create(serializer)
+            except serializers.ValidationError as error:
+                detail = error.detail
+                errors.append(detail if isinstance(detail, dict)
+                              else {'non_field_errors': detail})
+                continue
+            results.append(serializer.data)
+            errors.append({})
+        if any(errors):
+            raise serializers.ValidationError(errors)
+    return Response(results, status=status.HTTP_201_CREATED)
+
+
 def append_collection_links(response, link_dict):
     """
     Convenience function to append document-level links to a response object.
@@ -34,14 +167,75 @@ def append_collection_links(response, link_dict):
     return response
 
 
+def get_collection_template(template_data):
+    """
+    Convenience function to get a collection+json template from a dictionary of
+    template field names and values. Templates are computed once and cached, so the
+    returned structure must not be modified.
+    """
+    try:
+        key = tuple(template_data.items())
+        template = _TEMPLATES.get(key)
+    except TypeError:  # unhashable values
+        key = template = None
+    if template is None:
+        template = {'data': [{'name': k, 'value': v} for (k, v) in template_data.items()]}
+        if key is not None:
+            _TEMPLATES[key] = template
+    return template
+
+
 def append_collection_template(response, template_data):
     """
     Convenience function to append to a response a collection+json template.
     """
-    data = []
-    for (k, v) in template_data.items():
-        data.append({"name": k, "value": v})
-    response.data["template"] = {"data": data}
+    response.data["template"] = get_collection_template(template_data)
+    return response
+
+
+def get_query_template(url_name, urlconf=None):
+    """
+    Convenience function to get the collection+json query template of a search view
+    from its URL name. The template's href is host-relative (for a service mounted at
+    the root). Query templates are computed the first time they are requested and
+    cached, so the returned structure must not be modified.
+    """
+    urlconf = urlconf or get_urlconf() or settings.ROOT_URLCONF
+    return _get_query_template(urlconf, url_name)
+
+
+@lru_cache(maxsize=None)
+def _get_query_template(urlconf, url_name):
+    path = reverse(url_name, urlconf=urlconf)[len(get_script_prefix()):]
+    return _get_path_query_template('/' + path, urlconf)
+
+
+def _get_path_query_template(relative_url, urlconf=None):
+    urlconf = urlconf or get_urlconf() or settings.ROOT_URLCONF
+    return _get_urlconf_path_query_template(urlconf, relative_url)
+
+
+@lru_cache(maxsize=None)
+def _get_urlconf_path_query_template(urlconf, relative_url):
+    match = resolve(relative_url, urlconf)
+    filters = match.func.cls.filterset_class.base_filters
+    data = [{"name": k, "value": ""} for k in filters.keys()]
+    return {'href': relative_url, 'rel': 'search', "data": data}
+
+
+def append_collection_queries(response, request, url_names):
+    """
+    Convenience function to append to a response the collection+json query templates
+    of a list of search view URL names. Only the absolute hrefs are computed here, the
+    rest of the query templates are precomputed.
+    """
+    queries = []
+    for url_name in url_names:
+        query = get_query_template(url_name)
+        href = request.build_absolute_uri(get_script_prefix() + query['href'][1:])
+        queries.append({'href': href,
+                        'rel': 'search', 'data': query['data']})
+    response.data["queries"] = queries
     return response
 
 
@@ -51,17 +245,93 @@ def append_collection_querylist(response, query_url_list):
     """
     queries = []
     for query_url in query_url_list:
-        relative_url = urlparse(query_url).path
-        match = resolve(relative_url)
-        filters = match.func.cls.filterset_class.base_filters
-        data = []
-        for k in filters.keys():
-            data.append({"name": k, "value": ""})
-        queries.append({'href': query_url, 'rel': 'search', "data": data})
+        query = _get_path_query_template(urlparse(query_url).path)
+        queries.append({'href': query_url, 'rel': 'search', 'data': query['data']})
     response.data["queries"] = queries
     return response
 
 
+def get_link_field_names(serializer):
+    """
+    Convenience function to get the names of the fields of a serializer whose values
+    are urls.
+    """
+    names = []
+    for (name, field) in serializer.fields.items():
+        if isinstance(field, serializers.ManyRelatedField):
+            field = field.child_relation
+        if isinstance(field, (serializers.HyperlinkedRelatedField, ItemLinkField)):
+            names.append(name)
+    return names
+
+
+def make_links_absolute(request, item_list, link_field_names):
+    """
+    Convenience function to prepend the request's scheme and host to the host-relative
+    urls in the link fields of a list of precomputed serialized items.
+    """
+    prefix = request.build_absolute_uri('/')[:-1]
+    for item in item_list:
+        for name in link_field_names:
+            value = item.get(name)
+            if isinstance(value, list):
+                item[name] = [prefix + url for url in value]
+            elif value:
+                item[name] = prefix + value
+    return item_list
+
+
+def get_precomputed_response(view_instance, data, etag):
+    """
+    Convenience function to get an HTTP response for a precomputed serialized item or
+    list of items with host-relative urls. A list of items can also be given as a
+    queryset of the items so that only the requested page is fetched from the DB. The
+    response includes a strong entity tag and a 304 (Not Modified) response is returned
+    when the entity tag matches the request's If-None-Match header. Clients must
+    revalidate the responses as the precomputed data can be discarded and recomputed at
+    any time. The items are pruned to the requested sparse fieldset, if any. The entity
+    tag of a list of items includes the requested page (limit and offset).
+    """
+    request = view_instance.request
+    serializer = view_instance.get_serializer()
+    field_names = None
+    etag = f'{etag}-{request.accepted_renderer.format}'
+    paginator = view_instance.paginator
+    is_list = isinstance(data, (list, QuerySet))
+    if is_list and isinstance(paginator, LimitOffsetPagination):
+        limit = paginator.get_limit(request)
+        offset = paginator.get_offset(request) if limit is not None else 0
+        etag = f'{etag}-{limit}-{offset}'
+    if get_sparse_fieldset(request) != (None, None):
+        field_names = set(serializer.fields.keys())
+        digest = hashlib.md5(','.join(sorted(field_names)).encode()).hexdigest()
+        etag = f'{etag}-{digest[:16]}'
+    etag = quote_etag(etag)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        link_field_names = get_link_field_names(serializer)
+        if is_list:
+            page = view_instance.paginate_queryset(data)
+            items = list(data if page is None else page)
+            if field_names is not None:
+                items = [{k: v for (k, v) in item.items() if k in field_names}
+                         for item in items]
+            items = make_links_absolute(request, items, link_field_names)
+            if page is not None:
+                response = view_instance.get_paginated_response(items)
+            else:
+                response = Response(items)
+        else:
+            if field_names is not None:
+                data = {k: v for (k, v) in data.items() if k in field_names}
+            response = Response(make_links_absolute(request, [data],
+                                                    link_field_names)[0])
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
 def collection_serializer_is_valid(is_valid_method):
     """
     Convenience 'is_valid' method decorator to generate a properly formatted message
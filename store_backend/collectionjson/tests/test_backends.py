@@ -0,0 +1,169 @@
+
+import io
+import logging
+import datetime
+import decimal
+import uuid
+from unittest import skipIf
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from collectionjson import backends
+from collectionjson.backends import (get_json_backend, StdlibJsonBackend,
+                                     OrjsonBackend)
+from collectionjson.parsers import CollectionJsonParser
+from plugins.models import PluginMeta, Plugin, PluginParameter
+from pipelines.models import Pipeline, PluginPiping
+
+
+DATA = {
+    'name': 'Zoë \u2028 \u2029 "quoted" \\ line\nbreak \x00 </script>',
+    'int': 2147483647,
+    'negative': -12,
+    'float': 0.5,
+    'bool': [True, False],
+    'none': None,
+    'nested': {'list': [1, 'two', {'three': 3.25}], 'empty': {}, 'tuple': (1, 2)},
+    'datetime': datetime.datetime(2023, 10, 1, 12, 0, 0, 123456,
+                                  tzinfo=datetime.timezone.utc),
+    'date': datetime.date(2023, 10, 1),
+    'decimal': decimal.Decimal('1.5'),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'lazy': gettext_lazy('lazy'),
+    'big': 2 ** 70,
+    1: 'non string key',
+}
+
+
+class StdlibJsonBackendTests(TestCase):
+
+    def setUp(self):
+        self.backend = StdlibJsonBackend()
+
+    def test_dumps_escapes_line_separators(self):
+        content = self.backend.dumps({'a': '\u2028\u2029'}, JSONEncoder)
+        self.assertEqual(content, b'{"a":"\\u2028\\u2029"}')
+
+    def test_loads_strict_rejects_non_standard_constants(self):
+        with self.assertRaises(ValueError):
+            self.backend.loads(b'{"a": NaN}')
+        self.assertEqual(self.backend.loads(b'[1]', strict=False), [1])
+
+
+@skipIf(backends.orjson is None, 'orjson is not installed')
+class OrjsonBackendTests(TestCase):
+
+    def setUp(self):
+        self.backend = OrjsonBackend()
+        self.stdlib = StdlibJsonBackend()
+
+    def test_dumps_is_byte_identical_to_stdlib(self):
+        self.assertEqual(self.backend.dumps(DATA, JSONEncoder),
+                         self.stdlib.dumps(DATA, JSONEncoder))
+
+    def test_dumps_is_byte_identical_to_stdlib_for_non_compact_options(self):
+        for kwargs in ({'ensure_ascii': True}, {'indent': 4, 'separators': (',', ': ')},
+                       {'separators': (', ', ': ')}):
+            with self.subTest(**kwargs):
+                self.assertEqual(self.backend.dumps(DATA, JSONEncoder, **kwargs),
+                                 self.stdlib.dumps(DATA, JSONEncoder, **kwargs))
+
+    def test_dumps_raises_like_stdlib_for_unserializable_data(self):
+        with self.assertRaises(TypeError):
+            self.backend.dumps({'a': object()}, JSONEncoder)
+
+    def test_loads_is_identical_to_stdlib(self):
+        content = self.stdlib.dumps(DATA, JSONEncoder)
+        self.assertEqual(self.backend.loads(content), self.stdlib.loads(content))
+        self.assertEqual(self.backend.loads('{"big": 1180591620717411303424}'),
+                         {'big': 2 ** 70})
+
+    def test_loads_strict_rejects_non_standard_constants(self):
+        with self.assertRaises(ValueError):
+            self.backend.loads(b'{"a": NaN}')
+        with self.assertRaises(ValueError):
+            self.backend.loads(b'{"a": ')
+
+
+class GetJsonBackendTests(TestCase):
+
+    @override_settings(JSON_BACKEND='stdlib')
+    def test_get_json_backend_stdlib(self):
+        self.assertIsInstance(get_json_backend(), StdlibJsonBackend)
+        self.assertEqual(get_json_backend().name, 'stdlib')
+
+    @override_settings(JSON_BACKEND='auto')
+    def test_get_json_backend_auto(self):
+        name = 'stdlib' if backends.orjson is None else 'orjson'
+        self.assertEqual(get_json_backend().name, name)
+
+    @override_settings(JSON_BACKEND='simdjson')
+    def test_get_json_backend_failure_unknown_backend(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_json_backend()
+
+
+@skipIf(backends.orjson is None, 'orjson is not installed')
+class BackendResponseTests(TestCase):
+    """
+    Test that the API's responses and parsed requests are the same for all backends.
+    """
+
+    def setUp(self):
+        # avoid cluttered console output (for instance logging all the http requests)
+        logging.disable(logging.WARNING)
+
+        (meta, tf) = PluginMeta.objects.get_or_create(name='simplefsapp', type='fs',
+                                                      title='Zoë app \u2028')
+        plugin = Plugin.objects.create(meta=meta, version='0.1',
+                                       dock_image='fnndsc/pl-simplefsapp')
+        PluginParameter.objects.create(plugin=plugin, name='dir', type='string',
+                                       flag='--dir', optional=True)
+        PluginParameter.objects.create(plugin=plugin, name='ratio', type='float',
+                                       flag='--ratio', optional=True)
+        user = User.objects.create_user(username='foo', password='foopassword')
+        pipeline = Pipeline.objects.create(name='Pipeline \u2029', owner=user,
+                                           category='test')
+        PluginPiping.objects.create(pipeline=pipeline, plugin=plugin)
+        self.plugin_id = plugin.id
+
+    def tearDown(self):
+        # re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def get_contents(self, url, accept):
+        contents = []
+        for backend in ('stdlib', 'orjson'):
+            with override_settings(JSON_BACKEND=backend):
+                response = self.client.get(url, HTTP_ACCEPT=accept)
+                contents.append(response.content)
+        return contents
+
+    def test_responses_are_byte_identical(self):
+        urls = [reverse('plugin-list'), reverse('pluginmeta-list'),
+                reverse('pipeline-list'), reverse('plugin-list') + '?limit=-1',
+                reverse('plugin-detail', kwargs={'pk': self.plugin_id}),
+                reverse('plugin-detail', kwargs={'pk': self.plugin_id + 1000})]
+        for url in urls:
+            for accept in ('application/vnd.collection+json', 'application/json',
+                           'application/vnd.chris.table+json'):
+                with self.subTest(url=url, accept=accept):
+                    (stdlib_content, orjson_content) = self.get_contents(url, accept)
+                    self.assertEqual(stdlib_content, orjson_content)
+
+    def test_parsed_requests_are_identical(self):
+        content = ('{"template": {"data": [{"name": "name", "value": "Zoë \\u2028"}, '
+                   '{"name": "ratio", "value": 0.25}, {"name": "ok", "value": true}]}}')
+        parsed = []
+        for backend in ('stdlib', 'orjson'):
+            with override_settings(JSON_BACKEND=backend):
+                parser = CollectionJsonParser()
+                parsed.append(parser.parse(io.BytesIO(content.encode())))
+        self.assertEqual(parsed[0], parsed[1])
+        self.assertEqual(parsed[0]['name'], 'Zoë \u2028')
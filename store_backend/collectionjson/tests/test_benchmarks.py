@@ -0,0 +1,39 @@
+
+import io
+from contextlib import redirect_stdout
+
+from django.test import TestCase
+
+from collectionjson.benchmarks import compare_results
+
+
+class CompareResultsTests(TestCase):
+
+    def setUp(self):
+        self.result = {'serializer': 'PluginSerializer', 'renderer': 'json', 'items': 10,
+                       'serialize_us_per_item': 100.0, 'render_us_per_item': 10.0,
+                       'peak_bytes_per_item': 1000.0}
+        self.baseline = {'environment': {'commit': 'abc1234'}, 'results': [self.result]}
+
+    def compare(self, result, threshold=0.1):
+        with redirect_stdout(io.StringIO()) as output:
+            regressions = compare_results([result], self.baseline, threshold)
+        return regressions, output.getvalue()
+
+    def test_compare_results_no_regression(self):
+        result = dict(self.result, serialize_us_per_item=105.0, render_us_per_item=5.0)
+        (regressions, output) = self.compare(result)
+        self.assertEqual(regressions, 0)
+        self.assertIn('abc1234', output)
+        self.assertIn('1.05', output)
+
+    def test_compare_results_regression(self):
+        result = dict(self.result, render_us_per_item=20.0, peak_bytes_per_item=2000.0)
+        (regressions, output) = self.compare(result)
+        self.assertEqual(regressions, 2)
+        self.assertIn('2.00!', output)
+
+    def test_compare_results_ignores_unmatched_results(self):
+        result = dict(self.result, items=100, render_us_per_item=20.0)
+        (regressions, output) = self.compare(result)
+        self.assertEqual(regressions, 0)
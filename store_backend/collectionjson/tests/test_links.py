@@ -0,0 +1,82 @@
+
+from django.test import TestCase
+from django.urls import set_script_prefix, clear_script_prefix
+
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
+
+from collectionjson import links
+from collectionjson.links import (get_link_template, get_absolute_link_template,
+                                  reverse_link)
+from plugins.models import PluginMeta, Plugin
+from plugins.serializers import PluginSerializer
+
+
+class LinkTemplateTests(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def get_request(self, url='/api/v1/'):
+        return Request(self.factory.get(url))
+
+    def test_get_link_template(self):
+        self.assertEqual(get_link_template('plugin-detail'), ('/api/v1/plugins/', '/'))
+        self.assertEqual(get_link_template('pluginparameter-list'),
+                         ('/api/v1/plugins/', '/parameters/'))
+        self.assertIs(get_link_template('plugin-detail'),
+                      get_link_template('plugin-detail'))
+
+    def test_get_link_template_returns_none_for_views_without_the_kwarg(self):
+        self.assertIsNone(get_link_template('plugin-list'))
+        self.assertIsNone(get_link_template('plugin-detail', kwarg='name'))
+
+    def test_get_link_template_depends_on_the_script_prefix(self):
+        set_script_prefix('/chris-store/')
+        try:
+            self.assertEqual(get_link_template('plugin-detail'),
+                             ('/chris-store/api/v1/plugins/', '/'))
+        finally:
+            clear_script_prefix()
+        self.assertEqual(get_link_template('plugin-detail'), ('/api/v1/plugins/', '/'))
+
+    def test_get_absolute_link_template_is_cached_in_the_request(self):
+        request = self.get_request()
+        template = get_absolute_link_template(request, 'plugin-detail')
+        self.assertEqual(template, ('http://testserver/api/v1/plugins/', '/'))
+        self.assertIs(get_absolute_link_template(request, 'plugin-detail'), template)
+        self.assertIsNot(get_absolute_link_template(self.get_request(), 'plugin-detail'),
+                         template)
+
+    def test_reverse_link_is_the_same_as_reverse(self):
+        request = self.get_request()
+        for (view_name, value, fmt) in (('plugin-detail', 7, None),
+                                        ('pipeline-plugin-list', 12, None),
+                                        ('plugin-detail', 7, 'json'),
+                                        ('plugin-detail', '7', None)):
+            with self.subTest(view_name=view_name, value=value, format=fmt):
+                expected = reverse(view_name, kwargs={'pk': value}, request=request,
+                                   format=fmt)
+                self.assertEqual(reverse_link(view_name, 'pk', value, request, fmt),
+                                 expected)
+        self.assertEqual(reverse_link('plugin-detail', 'pk', 7), '/api/v1/plugins/7/')
+
+    def test_reverse_link_preserves_the_format_query_parameter(self):
+        request = self.get_request('/api/v1/?format=json')
+        self.assertEqual(reverse_link('plugin-detail', 'pk', 7, request),
+                         'http://testserver/api/v1/plugins/7/?format=json')
+
+    def test_hyperlinked_fields_use_link_templates(self):
+        (meta, tf) = PluginMeta.objects.get_or_create(name='simplefsapp', type='fs')
+        plugin = Plugin.objects.create(meta=meta, version='0.1',
+                                       dock_image='fnndsc/pl-simplefsapp')
+        request = self.get_request()
+        links._LINK_TEMPLATES.clear()
+        data = PluginSerializer(plugin, context={'request': request}).data
+        self.assertEqual(data['url'], f'http://testserver/api/v1/plugins/{plugin.id}/')
+        self.assertEqual(data['parameters'],
+                         f'http://testserver/api/v1/plugins/{plugin.id}/parameters/')
+        self.assertEqual(data['meta'], f'http://testserver/api/v1/{meta.id}/')
+        self.assertTrue(any(key[2] == 'plugin-detail'
+                            for key in links._LINK_TEMPLATES))
@@ -1,14 +1,19 @@
 
+import io
 import json
 import logging
+from unittest import skipIf
 
 from django.urls import path, include
 from django.test.utils import override_settings
 from django.test import TestCase
 
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 from rest_framework.routers import DefaultRouter
 
+from collectionjson.parsers import CollectionJsonParser, msgpack
+
 from . import views
 
 
@@ -52,6 +57,75 @@ class TestCollectionJsonParser(SimplePOSTTest):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class TestCollectionJsonParserBatch(TestCase):
+
+    def setUp(self):
+        self.parser = CollectionJsonParser()
+        self.view = views.MoronModelViewSet()
+        self.view.allow_batch_create = True
+
+    def parse(self, data, view=None):
+        return self.parser.parse(io.BytesIO(json.dumps(data).encode()),
+                                 parser_context={'view': view or self.view})
+
+    def test_parse_batch_success(self):
+        data = {"templates": [{"data": [{"name": "name", "value": "Bob"}]},
+                              {"data": [{"name": "name", "value": "Paul"}]}]}
+        self.assertEqual(self.parse(data), [{'name': 'Bob'}, {'name': 'Paul'}])
+
+    def test_parse_batch_failure_invalid_template(self):
+        data = {"templates": [{"data": [{"name": "name", "value": "Bob"}]},
+                              {"data": [{"value": "Paul"}]}]}
+        with self.assertRaisesMessage(ParseError, 'Template 1:'):
+            self.parse(data)
+
+    def test_parse_batch_failure_view_not_allowing_batches(self):
+        data = {"templates": [{"data": [{"name": "name", "value": "Bob"}]}]}
+        with self.assertRaises(ParseError):
+            self.parse(data, views.MoronModelViewSet())
+
+    def test_parse_batch_failure_empty_batch(self):
+        with self.assertRaises(ParseError):
+            self.parse({"templates": []})
+
+    @override_settings(COLLECTION_JSON_MAX_BATCH_SIZE=1)
+    def test_parse_batch_failure_batch_too_large(self):
+        data = {"templates": [{"data": [{"name": "name", "value": "Bob"}]},
+                              {"data": [{"name": "name", "value": "Paul"}]}]}
+        with self.assertRaises(ParseError):
+            self.parse(data)
+
+
+@skipIf(msgpack is None, 'msgpack is not installed')
+class TestCollectionMsgpackParser(SimplePOSTTest):
+    endpoint = '/rest-api/moron/'
+
+    def setUp(self):
+        super(TestCollectionMsgpackParser, self).setUp()
+        self.content_type = 'application/vnd.collection+msgpack'
+
+    def test_create_success(self):
+        post = msgpack.packb({"template": {"data": [{"name": "name", "value": "Bob"}]}})
+        response = self.client.post(self.endpoint, data=post,
+                                    content_type=self.content_type,
+                                    HTTP_ACCEPT=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["name"], "Bob")
+        item = msgpack.unpackb(response.content)['collection']['items'][0]
+        self.assertEqual(item['data'], [{'name': 'name', 'value': 'Bob'}])
+
+    def test_create_failure_invalid_msgpack(self):
+        response = self.client.post(self.endpoint, data=b'\xc1',
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_failure_invalid_template_missing_field(self):
+        post = msgpack.packb({"templlte": {"data": [{"name": "name", "value": "Bob"}]}})
+        response = self.client.post(self.endpoint, data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 router = DefaultRouter()
 router.register('moron', views.MoronModelViewSet)
 urlpatterns = [
@@ -1,6 +1,7 @@
 
 import logging
 import json
+from unittest import mock, skipIf
 
 from django.urls import path, include
 from django.test.utils import override_settings
@@ -10,6 +11,8 @@ from collection_json import Collection
 from rest_framework import status
 from rest_framework.routers import DefaultRouter
 
+from collectionjson.renderers import CollectionJsonRenderer, msgpack
+
 from .models import Dummy, Idiot, Moron, Simple
 from . import views
 
@@ -172,6 +175,129 @@ class TestEmpty(TestCase):
         self.assertEqual(response.content.decode('utf8'), '')
 
 
+@override_settings(ROOT_URLCONF='collectionjson.tests.test_renderers')
+class TestFusedEncoding(TestCase):
+
+    def setUp(self):
+        # avoid cluttered console output (for instance logging all the http requests)
+        logging.disable(logging.WARNING)
+        create_models()
+        Moron.objects.create(name='Zoë \u2028 "quoted" \\ line\nbreak')
+        Simple.objects.create(name='Foobar Baz')
+
+    def tearDown(self):
+        # re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_fused_encoding_is_byte_identical_to_transform_then_encode(self):
+        endpoints = ['/rest-api/dummy/', '/rest-api/dummy/1/', '/rest-api/moron/',
+                     '/rest-api/moron/?limit=1', '/rest-api/moron/?limit=1&offset=1',
+                     '/rest-api/idiot/', '/rest-api/normal-model/',
+                     '/rest-api/no-serializer/', '/rest-api/paginated/',
+                     '/rest-api/none-paginated/', '/rest-api/parse-error/',
+                     '/rest-api/url-rewrite/', '/rest-api/']
+        for endpoint in endpoints:
+            with self.subTest(endpoint=endpoint):
+                fused = self.client.get(endpoint).content
+                with mock.patch.object(CollectionJsonRenderer, 'fused_encoding', False):
+                    transformed = self.client.get(endpoint).content
+                self.assertEqual(fused, transformed)
+
+    def test_fused_encoding_escapes_line_separators(self):
+        response = self.client.get('/rest-api/moron/')
+        self.assertIn(b'\\u2028', response.content)
+        self.assertNotIn('\u2028'.encode(), response.content)
+
+
+@override_settings(ROOT_URLCONF='collectionjson.tests.test_renderers')
+class TestTableJsonRenderer(TestCase):
+    accept = 'application/vnd.chris.table+json'
+
+    def setUp(self):
+        # avoid cluttered console output (for instance logging all the http requests)
+        logging.disable(logging.WARNING)
+        create_models()
+
+    def tearDown(self):
+        # re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def get_table(self, endpoint):
+        response = self.client.get(endpoint, HTTP_ACCEPT=self.accept)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], self.accept)
+        return json.loads(response.content.decode('utf8'))['table']
+
+    def test_it_emits_field_names_once_and_rows_of_values(self):
+        table = self.get_table('/rest-api/dummy/')
+        self.assertEqual(table['href'], 'http://testserver/rest-api/dummy/')
+        self.assertEqual(table['total'], 1)
+        self.assertEqual(table['columns'], ['url', 'name', 'moron', 'idiots',
+                                            'other_stuff', 'some_link', 'empty'])
+        self.assertEqual(len(table['rows']), 1)
+        row = dict(zip(table['columns'], table['rows'][0]))
+        self.assertEqual(row['name'], 'Yolo McSwaggerson')
+        self.assertEqual(len(row['idiots']), 2)
+        self.assertIsNone(row['empty'])
+
+    def test_it_lists_the_link_columns(self):
+        table = self.get_table('/rest-api/dummy/')
+        self.assertEqual(table['link_columns'], ['url', 'moron', 'idiots',
+                                                 'other_stuff', 'some_link', 'empty'])
+
+    def test_detail_views_render_a_single_row(self):
+        table = self.get_table('/rest-api/dummy/1/')
+        self.assertEqual(len(table['rows']), 1)
+        self.assertNotIn('total', table)
+
+    def test_paginated_views_render_collection_links(self):
+        table = self.get_table('/rest-api/paginated/')
+        self.assertEqual(table['columns'], ['foo'])
+        self.assertEqual(table['rows'], [[1]])
+        self.assertEqual(table['links'], {'next': 'http://test.com/colleciton/next',
+                                          'previous': 'http://test.com/colleciton/previous'})
+
+    def test_collection_json_stays_the_default(self):
+        response = self.client.get('/rest-api/dummy/')
+        self.assertEqual(response['Content-Type'], 'application/vnd.collection+json')
+
+
+@skipIf(msgpack is None, 'msgpack is not installed')
+@override_settings(ROOT_URLCONF='collectionjson.tests.test_renderers')
+class TestCollectionMsgpackRenderer(TestCase):
+    accept = 'application/vnd.collection+msgpack'
+
+    def setUp(self):
+        # avoid cluttered console output (for instance logging all the http requests)
+        logging.disable(logging.WARNING)
+        create_models()
+
+    def tearDown(self):
+        # re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_it_preserves_the_collection_json_structure(self):
+        for endpoint in ('/rest-api/dummy/', '/rest-api/dummy/1/',
+                         '/rest-api/paginated/', '/rest-api/dummy/?limit=1'):
+            with self.subTest(endpoint=endpoint):
+                response = self.client.get(endpoint, HTTP_ACCEPT=self.accept)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response['Content-Type'], self.accept)
+                collection = json.loads(self.client.get(endpoint).content)
+                self.assertEqual(msgpack.unpackb(response.content), collection)
+
+    def test_it_is_smaller_than_collection_json(self):
+        response = self.client.get('/rest-api/dummy/', HTTP_ACCEPT=self.accept)
+        self.assertLess(len(response.content),
+                        len(self.client.get('/rest-api/dummy/').content))
+
+    def test_errors_are_reported(self):
+        response = self.client.get('/rest-api/dummy/1000/', HTTP_ACCEPT=self.accept)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        collection = msgpack.unpackb(response.content)['collection']
+        self.assertIn('message', collection['error'])
+
+
 router = DefaultRouter()
 router.register('dummy', views.DummyReadOnlyModelViewSet)
 router.register('moron', views.MoronReadOnlyModelViewSet)
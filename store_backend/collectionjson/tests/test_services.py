@@ -4,9 +4,14 @@ from django.urls import path, include
 from django.test.utils import override_settings
 from django.test import TestCase
 
+from rest_framework import serializers
+from rest_framework.request import Request
 from rest_framework.routers import DefaultRouter
+from rest_framework.test import APIRequestFactory
 
 from collectionjson import services
+from plugins.models import Plugin
+from plugins.serializers import PluginSerializer
 
 from .models import Moron
 from . import views
@@ -91,6 +96,74 @@ class FunctionTests(SimpleGetTest):
                          [{'href': query_urls[0], 'rel': 'search',
                            "data": [{"name": "name", "value": ""}]}])
 
+    def test_append_collection_queries(self):
+        """
+        Test whether services.append_collection_queries() appends the collection+json
+        queries templates of a list of URL names with absolute hrefs to its response
+        argument
+        """
+        response = self.response
+        request = response.renderer_context['request']
+        response = services.append_collection_queries(response, request, ['moron-list'])
+        self.assertEqual(response.data['queries'],
+                         [{'href': 'http://testserver' + self.endpoint, 'rel': 'search',
+                           "data": [{"name": "name", "value": ""}]}])
+
+    def test_get_query_template_is_computed_once(self):
+        """
+        Test whether services.get_query_template() returns the same host-relative
+        query template structure for every call with the same URL name
+        """
+        query = services.get_query_template('moron-list')
+        self.assertEqual(query['href'], self.endpoint)
+        self.assertIs(services.get_query_template('moron-list'), query)
+
+    def test_get_collection_template_is_computed_once(self):
+        """
+        Test whether services.get_collection_template() returns the same template
+        structure for every call with the same template data
+        """
+        template = services.get_collection_template({"name": "", "age": ""})
+        self.assertEqual(template, {'data': [{'name': 'name', 'value': ''},
+                                             {'name': 'age', 'value': ''}]})
+        self.assertIs(services.get_collection_template({"name": "", "age": ""}),
+                      template)
+
+
+class SparseFieldsetTests(TestCase):
+    """
+    Test the sparse fieldset functions in the services module
+    """
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def get_request(self, url, method='get'):
+        return Request(getattr(self.factory, method)(url))
+
+    def test_get_sparse_fieldset(self):
+        request = self.get_request('/api/v1/plugins/?fields=name, version,&exclude=id')
+        self.assertEqual(services.get_sparse_fieldset(request),
+                         ({'name', 'version'}, {'id'}))
+        request = self.get_request('/api/v1/plugins/')
+        self.assertEqual(services.get_sparse_fieldset(request), (None, None))
+
+    def test_get_sparse_fieldset_ignores_unsafe_requests(self):
+        request = self.get_request('/api/v1/plugins/?fields=name', 'post')
+        self.assertEqual(services.get_sparse_fieldset(request), (None, None))
+
+    def test_get_serializer_columns(self):
+        request = self.get_request('/api/v1/plugins/?fields=name,version,parameters')
+        serializer = PluginSerializer(context={'request': request})
+        self.assertEqual(services.get_serializer_columns(serializer, Plugin),
+                         {'id', 'meta__name', 'version'})
+
+    def test_get_serializer_columns_returns_none_for_model_properties(self):
+        request = self.get_request('/api/v1/plugins/')
+        serializer = PluginSerializer(context={'request': request})
+        serializer.fields['label'] = serializers.ReadOnlyField(source='__str__')
+        self.assertIsNone(services.get_serializer_columns(serializer, Plugin))
+
 
 router = DefaultRouter()
 router.register('moron', views.MoronModelViewSet)
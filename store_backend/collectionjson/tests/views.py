@@ -8,8 +8,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ParseError
 
-from collectionjson.renderers import CollectionJsonRenderer
-from collectionjson.parsers import CollectionJsonParser
+from collectionjson.renderers import (CollectionJsonRenderer, TableJsonRenderer,
+                                      CollectionMsgpackRenderer)
+from collectionjson.parsers import CollectionJsonParser, CollectionMsgpackParser
 
 from .models import Dummy, Idiot, Moron, MoronFilter, Simple
 from .serializers import MoronHyperlinkedModelSerializer, IdiotHyperlinkedModelSerializer
@@ -17,8 +18,8 @@ from .serializers import DummyHyperlinkedModelSerializer, SimpleModelSerializer
 
 
 class MoronModelViewSet(ModelViewSet):
-    renderer_classes = (CollectionJsonRenderer, )
-    parser_classes = (CollectionJsonParser, )
+    renderer_classes = (CollectionJsonRenderer, CollectionMsgpackRenderer)
+    parser_classes = (CollectionJsonParser, CollectionMsgpackParser)
     queryset = Moron.objects.all()
     serializer_class = MoronHyperlinkedModelSerializer
     filter_backends = (DjangoFilterBackend,)
@@ -38,7 +39,8 @@ class IdiotReadOnlyModelViewSet(ReadOnlyModelViewSet):
 
 
 class DummyReadOnlyModelViewSet(ReadOnlyModelViewSet):
-    renderer_classes = (CollectionJsonRenderer, )
+    renderer_classes = (CollectionJsonRenderer, TableJsonRenderer,
+                        CollectionMsgpackRenderer)
     queryset = Dummy.objects.all()
     serializer_class = DummyHyperlinkedModelSerializer
     
@@ -57,7 +59,8 @@ class NoSerializerView(APIView):
 
 
 class PaginatedDataView(APIView):
-    renderer_classes = (CollectionJsonRenderer, )
+    renderer_classes = (CollectionJsonRenderer, TableJsonRenderer,
+                        CollectionMsgpackRenderer)
 
     def get(self, request):
         return Response({
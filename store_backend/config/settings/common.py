@@ -42,27 +42,32 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'DEFAULT_RENDERER_CLASSES': (
         'collectionjson.renderers.CollectionJsonRenderer',
-        'rest_framework.renderers.JSONRenderer',
+        'collectionjson.renderers.TableJsonRenderer',
+        'collectionjson.renderers.CollectionMsgpackRenderer',
+        'collectionjson.renderers.BackendJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_PARSER_CLASSES': (
         'collectionjson.parsers.CollectionJsonParser',
-        'rest_framework.parsers.JSONParser',
+        'collectionjson.parsers.CollectionMsgpackParser',
+        'collectionjson.parsers.BackendJSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
+        'users.authentication.CachedTokenAuthentication',
+        'users.authentication.CachedBasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
+        'collectionjson.filters.SparseFieldsetFilter',
     )
 }
 
 MIDDLEWARE = [
     'core.middleware.ResponseMiddleware',
+    'core.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -104,6 +109,47 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# JSON backend of the renderers and parsers: 'auto' (orjson when installed), 'orjson'
+# or 'stdlib'
+
+JSON_BACKEND = 'auto'
+
+# Response compression: content codings in order of preference (brotli and zstd are
+# only used when their packages are installed), minimum size of the compressed
+# responses in bytes and timeout of the cached compressed responses in seconds
+
+COMPRESSION_ENCODINGS = ('zstd', 'br', 'gzip')
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CACHE_TIMEOUT = 86400
+
+# Maximum number of templates in a batch write request
+
+COLLECTION_JSON_MAX_BATCH_SIZE = 100
+
+# Timeouts in seconds of the cached authentication tokens (token to user) and of the
+# cached verified basic auth credentials (which are only accepted while the user's
+# password is unchanged). A cached token is discarded when the token or its user is
+# saved or deleted, but only from the cache of the process that makes the change, so
+# with a per-process cache (such as LocMemCache) a deleted token or a deactivated user
+# can be accepted by the other processes for up to TOKEN_AUTH_CACHE_TIMEOUT seconds.
+# Use a shared cache (such as Redis or Memcached) to revoke tokens right away
+
+TOKEN_AUTH_CACHE_TIMEOUT = 60
+BASIC_AUTH_CACHE_TIMEOUT = 300
+
+# Timeout in seconds of the cached pipeline execution plans
+
+PIPELINE_PLAN_CACHE_TIMEOUT = 3600
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -80,6 +80,9 @@ urlpatterns = format_suffix_patterns([
     path('v1/plugins/<int:pk>/parameters/',
         plugin_views.PluginParameterList.as_view(), name='pluginparameter-list'),
 
+    path('v1/plugins/<int:pk>/pipelines/',
+        pipeline_views.PluginPipelineList.as_view(), name='plugin-pipeline-list'),
+
     path('v1/plugins/parameters/<int:pk>/',
         plugin_views.PluginParameterDetail.as_view(), name='pluginparameter-detail'),
 
@@ -96,6 +99,18 @@ urlpatterns = format_suffix_patterns([
         pipeline_views.PipelineDetail.as_view(),
         name='pipeline-detail'),
 
+    path('v1/pipelines/<int:pk>/document/',
+        pipeline_views.PipelineDocument.as_view(),
+        name='pipeline-document'),
+
+    path('v1/pipelines/<int:pk>/plan/',
+        pipeline_views.PipelineExecutionPlan.as_view(),
+        name='pipeline-plan'),
+
+    path('v1/pipelines/<int:pk>/fork/',
+        pipeline_views.PipelineFork.as_view(),
+        name='pipeline-fork'),
+
     path('v1/pipelines/<int:pk>/plugins/',
         pipeline_views.PipelinePluginList.as_view(), name='pipeline-plugin-list'),
 
@@ -0,0 +1,25 @@
+"""
+Cache helpers that keep the cache consistent with the DB transactions.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def cache_on_commit(key, value, timeout):
+    """
+    Convenience function to cache a value read from the DB once the current transaction
+    is committed. Uncommitted data must not be cached as the transaction could be rolled
+    back (the value is cached immediately in autocommit mode).
+    """
+    transaction.on_commit(lambda: cache.add(key, value, timeout=timeout))
+
+
+def delete_on_commit(key):
+    """
+    Convenience function to discard a cached value whose DB data has changed. The value
+    is discarded immediately and again once the current transaction is committed in
+    case it's been cached by another request in the meantime.
+    """
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -1,9 +1,34 @@
 
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponse
+from django.utils.cache import cc_delim_re, patch_vary_headers
+from django.utils.text import compress_string
 from rest_framework import status
-from rest_framework.renderers import JSONRenderer
 
-from collectionjson.renderers import CollectionJsonRenderer
+from collectionjson.renderers import BackendJSONRenderer, CollectionJsonRenderer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# compression functions by content coding, brotli and zstd are only available when
+# their packages are installed
+COMPRESSORS = {'gzip': compress_string}
+if brotli is not None:
+    COMPRESSORS['br'] = lambda content: brotli.compress(content, quality=4)
+if zstandard is not None:
+    COMPRESSORS['zstd'] = lambda content: zstandard.ZstdCompressor(level=3).compress(
+        content)
 
 
 class RenderedResponse(HttpResponse):
@@ -16,7 +41,7 @@ class RenderedResponse(HttpResponse):
         if mime == 'application/json':
             kwargs['content_type'] = 'application/json'
             data['error'] = data.pop('detail')
-            renderer = JSONRenderer()
+            renderer = BackendJSONRenderer()
             content = renderer.render(data)
         else:
             kwargs['content_type'] = 'application/vnd.collection+json'
@@ -45,3 +70,113 @@ class ResponseMiddleware(object):
         mime = request.META.get('HTTP_ACCEPT')
         if mime != 'text/html':
             return api_500(request)
+
+
+class CompressionMiddleware(object):
+    """
+    Middleware to compress responses with the best content coding accepted by the
+    client among gzip, brotli (br) and zstd. Responses shorter than the
+    COMPRESSION_MIN_SIZE setting are not compressed. The compressed content of the
+    responses with a strong entity tag (such as the precomputed representations) is
+    cached per coding so that cache hits are served without recompressing them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.encodings = getattr(settings, 'COMPRESSION_ENCODINGS',
+                                 ('zstd', 'br', 'gzip'))
+        self.cache_timeout = getattr(settings, 'COMPRESSION_CACHE_TIMEOUT', 86400)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if (response.streaming or response.has_header('Content-Encoding')
+                or not self.is_compressible(response.get('Content-Type', ''))):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_size:
+            return response
+
+        encoding = self.get_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        etag = response.get('ETag')
+        key = None
+        compressed_content = None
+        if etag and etag.startswith('"'):
+            key = self.get_cache_key(request, response, encoding, etag)
+            compressed_content = cache.get(key)
+        if compressed_content is None:
+            compressed_content = COMPRESSORS[encoding](response.content)
+            if len(compressed_content) >= len(response.content):
+                return response
+            if key is not None:
+                cache.set(key, compressed_content, timeout=self.cache_timeout)
+
+        response.content = compressed_content
+        response['Content-Length'] = str(len(compressed_content))
+        # the strong ETag is made weak as the content is no longer the same as the
+        # one of the identity coding while still allowing conditional requests
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def get_cache_key(request, response, encoding, etag):
+        """
+        Custom method to get the cache key of the compressed content of a response. The
+        key depends on the request's absolute URI (including the query string), the
+        content coding, the entity tag and the request headers the response varies on.
+        """
+        parts = [request.build_absolute_uri(), encoding, etag]
+        for header in cc_delim_re.split(response.get('Vary', '')):
+            header = header.strip().upper().replace('-', '_')
+            if header and header != 'ACCEPT_ENCODING':
+                meta_key = header if header == 'CONTENT_TYPE' else 'HTTP_' + header
+                parts.append(f'{header}={request.META.get(meta_key, "")}')
+        digest = hashlib.md5('\n'.join(parts).encode()).hexdigest()
+        return f'compressed_response_{encoding}_{digest}'
+
+    def get_encoding(self, accept_encoding):
+        """
+        Custom method to get the preferred content coding that is both accepted by the
+        client and available. Returns None when there is no such coding.
+        """
+        accepted = {}
+        for coding in accept_encoding.split(','):
+            (name, _, params) = coding.partition(';')
+            quality = 1.0
+            for param in params.split(';'):
+                (key, _, value) = param.strip().partition('=')
+                if key.lower() == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            name = name.strip().lower()
+            if name:
+                accepted[name] = quality
+        available = [e for e in self.encodings if e in COMPRESSORS]
+        candidates = [e for e in available if accepted.get(e, accepted.get('*', 0)) > 0]
+        if not candidates:
+            return None
+        # the client's quality values take precedence over the server's preference
+        return max(candidates,
+                   key=lambda e: (accepted.get(e, accepted.get('*', 0)),
+                                  -available.index(e)))
+
+    @staticmethod
+    def is_compressible(content_type):
+        """
+        Custom method to determine whether a content type is worth compressing.
+        """
+        media_type = content_type.split(';')[0].strip().lower()
+        return (media_type.startswith('text/') or media_type.endswith('json')
+                or media_type.endswith('xml') or media_type.endswith('javascript')
+                or media_type.endswith('msgpack'))
@@ -0,0 +1,198 @@
+
+import gzip
+import logging
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import TestCase, RequestFactory, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+
+from core import middleware
+from core.middleware import CompressionMiddleware
+from pipelines.models import Pipeline, PluginPiping
+from pipelines.serializers import PipelineSerializer
+from plugins.models import PluginMeta, Plugin
+
+
+COLLECTION_JSON = 'application/vnd.collection+json'
+
+
+class CompressionMiddlewareTests(TestCase):
+    """
+    Test the CompressionMiddleware middleware.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.content = b'{"collection": {"items": [' + b'{"name": "value"},' * 200 + b']}}'
+        self.etag = None
+        self.calls = 0
+        self.compressors = {'gzip': middleware.compress_string,
+                            'br': lambda content: b'br' + content[:10],
+                            'zstd': lambda content: b'zstd' + content[:10]}
+        cache.clear()
+
+    def get_response(self, request):
+        response = HttpResponse(self.content, content_type=COLLECTION_JSON)
+        if self.etag:
+            response['ETag'] = self.etag
+        return response
+
+    def get(self, accept_encoding, path='/api/v1/', **kwargs):
+        request = self.factory.get(path, HTTP_ACCEPT_ENCODING=accept_encoding, **kwargs)
+        with mock.patch.dict(middleware.COMPRESSORS, self.compressors, clear=True):
+            return CompressionMiddleware(self.get_response)(request)
+
+    def test_compression_gzip_success(self):
+        response = self.get('gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.content)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_compression_uses_server_preference_for_equal_qualities(self):
+        response = self.get('gzip, br, zstd')
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+        response = self.get('gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+    def test_compression_uses_client_quality_values(self):
+        response = self.get('zstd;q=0.5, br;q=0, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response = self.get('*;q=0.1, gzip;q=0')
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+
+    def test_compression_skips_unavailable_encodings(self):
+        del self.compressors['zstd']
+        response = self.get('zstd, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        response = self.get('zstd')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.content)
+
+    def test_compression_skips_responses_below_threshold(self):
+        self.content = b'{"collection": {}}'
+        response = self.get('gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    @override_settings(COMPRESSION_MIN_SIZE=10)
+    def test_compression_threshold_is_configurable(self):
+        self.content = b'{"collection": {"items": [' + b'{"a": 1},' * 10 + b']}}'
+        response = self.get('gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_compression_skips_non_compressible_content(self):
+        self.get_response = lambda request: HttpResponse(b'\x89PNG' * 1000,
+                                                         content_type='image/png')
+        response = self.get('gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_compression_skips_streaming_responses(self):
+        self.get_response = lambda request: StreamingHttpResponse(
+            iter([self.content]), content_type=COLLECTION_JSON)
+        response = self.get('gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_compression_weakens_strong_etags(self):
+        self.etag = '"abc-collection+json"'
+        response = self.get('gzip')
+        self.assertEqual(response['ETag'], 'W/"abc-collection+json"')
+
+    def test_compression_caches_compressed_content_per_url_etag_and_encoding(self):
+        self.etag = '"abc-collection+json"'
+        compress = mock.Mock(side_effect=middleware.compress_string)
+        self.compressors['gzip'] = compress
+        first = self.get('gzip')
+        second = self.get('gzip')
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(gzip.decompress(second.content), self.content)
+
+        # another encoding, host, path or query string gets its own cache entry
+        self.get('br')
+        self.assertEqual(compress.call_count, 1)
+        self.get('gzip', HTTP_HOST='other.example.org')
+        self.assertEqual(compress.call_count, 2)
+        self.get('gzip', path='/api/v1/other/')
+        self.assertEqual(compress.call_count, 3)
+        self.get('gzip', path='/api/v1/?limit=1&offset=1')
+        self.assertEqual(compress.call_count, 4)
+        self.get('gzip', path='/api/v1/?limit=1&offset=1')
+        self.assertEqual(compress.call_count, 4)
+
+    def test_compression_caches_compressed_content_per_vary_header(self):
+        self.etag = '"abc-collection+json"'
+        compress = mock.Mock(side_effect=middleware.compress_string)
+        self.compressors['gzip'] = compress
+        self.get_response = lambda request: self.get_vary_response(request)
+        self.get('gzip', HTTP_ACCEPT='application/json')
+        self.get('gzip', HTTP_ACCEPT='application/vnd.collection+json')
+        self.assertEqual(compress.call_count, 2)
+        self.get('gzip', HTTP_ACCEPT='application/json')
+        self.assertEqual(compress.call_count, 2)
+
+    def get_vary_response(self, request):
+        response = HttpResponse(self.content, content_type=COLLECTION_JSON)
+        response['ETag'] = self.etag
+        response['Vary'] = 'Accept'
+        return response
+
+    def test_compression_does_not_cache_responses_without_strong_etag(self):
+        compress = mock.Mock(side_effect=middleware.compress_string)
+        self.compressors['gzip'] = compress
+        self.get('gzip')
+        self.get('gzip')
+        self.assertEqual(compress.call_count, 2)
+
+
+class CompressionMiddlewareIntegrationTests(TestCase):
+    """
+    Test that the API's responses are compressed.
+    """
+
+    def setUp(self):
+        # avoid cluttered console output (for instance logging all the http requests)
+        logging.disable(logging.WARNING)
+        cache.clear()
+        user = User.objects.create_user(username='foo', password='foopassword')
+        (meta, tf) = PluginMeta.objects.get_or_create(name='simplefsapp', type='fs')
+        plugin = Plugin.objects.create(meta=meta, version='0.1',
+                                       dock_image='fnndsc/pl-simplefsapp')
+        for i in range(5):
+            pipeline = Pipeline.objects.create(name=f'Pipeline{i}', owner=user,
+                                               locked=False)
+            PluginPiping.objects.create(pipeline=pipeline, plugin=plugin)
+        PipelineSerializer.save_representation(pipeline)
+        self.pipeline = pipeline
+
+    def tearDown(self):
+        # re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_precomputed_response_is_compressed_and_revalidated(self):
+        url = reverse('pipeline-detail', kwargs={'pk': self.pipeline.id})
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'Pipeline4', gzip.decompress(response.content))
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip',
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(COMPRESSION_MIN_SIZE=1)
+    def test_precomputed_responses_of_the_same_pipeline_are_not_mixed_up(self):
+        detail_url = reverse('pipeline-detail', kwargs={'pk': self.pipeline.id})
+        pipings_url = reverse('pipeline-pluginpiping-list',
+                              kwargs={'pk': self.pipeline.id})
+        contents = []
+        for url in (detail_url, pipings_url, pipings_url + '?limit=1&offset=1'):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            contents.append(gzip.decompress(response.content))
+            self.assertEqual(contents[-1], self.client.get(url).content)
+        self.assertEqual(len(set(contents)), 3)
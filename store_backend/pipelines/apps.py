@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PipelinesConfig(AppConfig):
     name = 'pipelines'
+
+    def ready(self):
+        from . import signals  # noqa
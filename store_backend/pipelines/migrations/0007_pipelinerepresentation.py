@@ -0,0 +1,26 @@
+# Generated by Django 4.2.5 on 2026-10-19 00:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipelines', '0006_pluginpiping_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineRepresentation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+                ('etag', models.CharField(max_length=64)),
+                ('detail', models.JSONField()),
+                ('plugin_pipings', models.JSONField()),
+                ('default_parameters', models.JSONField()),
+                ('pipeline', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='representation', to='pipelines.pipeline')),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-19 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipelines', '0007_pipelinerepresentation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pluginpiping',
+            index=models.Index(fields=['plugin', 'pipeline'], name='pipelines_p_plugin__b62efe_idx'),
+        ),
+    ]
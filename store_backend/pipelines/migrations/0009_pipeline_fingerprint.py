@@ -0,0 +1,79 @@
+# Generated by Django 4.2.5 on 2026-10-19 01:01
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+def compute_fingerprint(tree_list):
+    """
+    Compute a canonical hash of a list of nodes representing a tree of plugins. This
+    is a frozen copy of Pipeline.compute_fingerprint at the time of this migration.
+    """
+    children = [[] for _ in tree_list]
+    root_ix = None
+    for (ix, d) in enumerate(tree_list):
+        if d['previous_index'] is None:
+            root_ix = ix
+        else:
+            children[d['previous_index']].append(ix)
+    order = [root_ix]
+    for ix in order:
+        order.extend(children[ix])
+    hashes = [None] * len(tree_list)
+    for ix in reversed(order):
+        d = tree_list[ix]
+        defaults = sorted([[default['name'], default['default']] for default in
+                           d['plugin_parameter_defaults']], key=lambda x: x[0])
+        node = [d['plugin_name'], d['plugin_version'], defaults,
+                sorted(hashes[child_ix] for child_ix in children[ix])]
+        node_str = json.dumps(node, separators=(',', ':'))
+        hashes[ix] = hashlib.sha256(node_str.encode()).hexdigest()
+    return hashes[root_ix]
+
+
+def set_fingerprints(apps, schema_editor):
+    """
+    Compute the fingerprint of the existing pipelines.
+    """
+    Pipeline = apps.get_model('pipelines', 'Pipeline')
+    PluginPiping = apps.get_model('pipelines', 'PluginPiping')
+    default_model_classes = [apps.get_model('pipelines', name) for name in
+                             ('DefaultPipingStrParameter', 'DefaultPipingIntParameter',
+                              'DefaultPipingFloatParameter', 'DefaultPipingBoolParameter')]
+    for pipeline in Pipeline.objects.iterator():
+        pipings = list(PluginPiping.objects.filter(pipeline=pipeline).select_related(
+            'plugin__meta').order_by('id'))
+        if not pipings:
+            continue
+        indices = {piping.id: ix for (ix, piping) in enumerate(pipings)}
+        tree_list = [{'plugin_name': piping.plugin.meta.name,
+                      'plugin_version': piping.plugin.version,
+                      'previous_index': indices.get(piping.previous_id),
+                      'plugin_parameter_defaults': []} for piping in pipings]
+        for default_model_class in default_model_classes:
+            values = default_model_class.objects.filter(
+                plugin_piping__pipeline=pipeline).values_list(
+                'plugin_piping_id', 'plugin_param__name', 'value')
+            for (piping_id, param_name, value) in values:
+                tree_list[indices[piping_id]]['plugin_parameter_defaults'].append(
+                    {'name': param_name, 'default': value})
+        pipeline.fingerprint = compute_fingerprint(tree_list)
+        pipeline.save(update_fields=['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipelines', '0008_pluginpiping_plugin_pipeline_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipeline',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.RunPython(set_fingerprints, migrations.RunPython.noop),
+    ]
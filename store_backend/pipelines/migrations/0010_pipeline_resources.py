@@ -0,0 +1,104 @@
+# Generated by Django 4.2.5 on 2026-10-19 01:03
+
+from django.db import migrations, models
+
+
+# frozen copy of pipelines.models.RESOURCES at the time of this migration
+RESOURCES = ('cpu_limit', 'memory_limit', 'gpu_limit', 'number_of_workers')
+
+
+def compute_resources(pipings):
+    """
+    Compute the resource envelope of a tree of pipings given as a list of (id,
+    previous_id, *demands) tuples. This is a frozen copy of Pipeline.compute_resources
+    at the time of this migration.
+    """
+    children = {}
+    demands = {}
+    root_id = None
+    for (piping_id, previous_id, *demand) in pipings:
+        demands[piping_id] = [value or 0 for value in demand]
+        if previous_id is None:
+            root_id = piping_id
+        else:
+            children.setdefault(previous_id, []).append(piping_id)
+    peak = [0] * len(RESOURCES)
+    max_node = [0] * len(RESOURCES)
+    level = [root_id] if root_id is not None else []
+    while level:
+        level_demand = [sum(values) for values in
+                        zip(*[demands[piping_id] for piping_id in level])]
+        peak = [max(values) for values in zip(peak, level_demand)]
+        for piping_id in level:
+            max_node = [max(values) for values in zip(max_node, demands[piping_id])]
+        level = [child_id for piping_id in level
+                 for child_id in children.get(piping_id, [])]
+    resources = {}
+    for (ix, resource) in enumerate(RESOURCES):
+        resources['peak_' + resource] = peak[ix]
+        resources['max_node_' + resource] = max_node[ix]
+    return resources
+
+
+def set_resources(apps, schema_editor):
+    """
+    Compute the resource envelope of the existing pipelines.
+    """
+    Pipeline = apps.get_model('pipelines', 'Pipeline')
+    PluginPiping = apps.get_model('pipelines', 'PluginPiping')
+    for pipeline in Pipeline.objects.iterator():
+        pipings = PluginPiping.objects.filter(pipeline=pipeline).values_list(
+            'id', 'previous_id', *['plugin__min_' + resource for resource in RESOURCES])
+        resources = compute_resources(list(pipings))
+        Pipeline.objects.filter(pk=pipeline.pk).update(**resources)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipelines', '0009_pipeline_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipeline',
+            name='max_node_cpu_limit',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pipeline',
+            name='max_node_gpu_limit',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pipeline',
+            name='max_node_memory_limit',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pipeline',
+            name='max_node_number_of_workers',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pipeline',
+            name='peak_cpu_limit',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='pipeline',
+            name='peak_gpu_limit',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='pipeline',
+            name='peak_memory_limit',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='pipeline',
+            name='peak_number_of_workers',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(set_resources, migrations.RunPython.noop),
+    ]
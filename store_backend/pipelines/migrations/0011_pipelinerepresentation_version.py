@@ -0,0 +1,29 @@
+# Generated by Django 4.2.5 on 2026-10-19 01:49
+
+from django.db import migrations, models
+
+
+def delete_representations(apps, schema_editor):
+    """
+    Delete the stored representations as they were computed before they were versioned
+    (with outdated serializers' output). They are recomputed with the pipelines manager's
+    'precompute' command.
+    """
+    PipelineRepresentation = apps.get_model('pipelines', 'PipelineRepresentation')
+    PipelineRepresentation.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipelines', '0010_pipeline_resources'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipelinerepresentation',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(delete_representations, migrations.RunPython.noop),
+    ]
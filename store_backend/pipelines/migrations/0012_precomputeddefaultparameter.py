@@ -0,0 +1,31 @@
+# Generated by Django 4.2.5 on 2026-10-19 02:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipelines', '0011_pipelinerepresentation_version'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='pipelinerepresentation',
+            name='default_parameters',
+        ),
+        migrations.CreateModel(
+            name='PrecomputedDefaultParameter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('data', models.JSONField()),
+                ('representation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='default_parameters', to='pipelines.pipelinerepresentation')),
+            ],
+            options={
+                'ordering': ('representation', 'position'),
+                'unique_together': {('representation', 'position')},
+            },
+        ),
+    ]
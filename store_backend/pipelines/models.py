@@ -1,13 +1,29 @@
 
-from django.db import models
+import json
+import hashlib
+from collections import deque
+
+from django.db import models, connection, transaction
+from django.db.models.functions import Cast
 from django.core.exceptions import ObjectDoesNotExist
 
 import django_filters
 from django_filters.rest_framework import FilterSet
 
+from plugins.fields import CPUInt, MemoryInt
 from plugins.models import Plugin, PluginParameter
 
 
+# plugin resources aggregated in the resource envelope of a pipeline (the plugin fields
+# are prefixed by 'min_' and the pipeline fields by 'peak_' and 'max_node_')
+RESOURCES = ('cpu_limit', 'memory_limit', 'gpu_limit', 'number_of_workers')
+
+# version of the precomputed pipeline representations, it must be increased whenever
+# the serialized output of the pipelines, plugin pipings or default parameters (or the
+# way it's stored) changes so that the stored representations are not served anymore
+REPRESENTATION_VERSION = 2
+
+
 class Pipeline(models.Model):
     creation_date = models.DateTimeField(auto_now_add=True)
     modification_date = models.DateTimeField(auto_now_add=True)
@@ -16,6 +32,15 @@ class Pipeline(models.Model):
     authors = models.CharField(max_length=200, blank=True)
     category = models.CharField(max_length=100, blank=True)
     description = models.CharField(max_length=800, blank=True)
+    fingerprint = models.CharField(max_length=64, blank=True, db_index=True)
+    peak_cpu_limit = models.IntegerField(default=0, db_index=True)  # In millicores
+    peak_memory_limit = models.IntegerField(default=0, db_index=True)  # In Mi
+    peak_gpu_limit = models.IntegerField(default=0, db_index=True)
+    peak_number_of_workers = models.IntegerField(default=0, db_index=True)
+    max_node_cpu_limit = models.IntegerField(default=0)  # In millicores
+    max_node_memory_limit = models.IntegerField(default=0)  # In Mi
+    max_node_gpu_limit = models.IntegerField(default=0)
+    max_node_number_of_workers = models.IntegerField(default=0)
     owner = models.ForeignKey('auth.User', on_delete=models.CASCADE)
     plugins = models.ManyToManyField(Plugin, related_name='pipelines',
                                      through='PluginPiping')
@@ -29,10 +54,294 @@ class Pipeline(models.Model):
     def check_parameter_defaults(self):
         """
         Custom method to raise an exception if any of the plugin parameters associated to
-        any of the pipings in the pipeline doesn't have a default value.
+        any of the pipings in the pipeline doesn't have a default value. A single
+        aggregate query checks whether there is any missing default and only then a
+        second query gets all the parameters without a default for the error message.
+        """
+        querysets = [default_model_class.objects.filter(plugin_piping__pipeline=self,
+                                                        value__isnull=True)
+                     for default_model_class in DEFAULT_PIPING_PARAMETER_MODELS.values()]
+        lookup = models.Exists(querysets[0])
+        for queryset in querysets[1:]:
+            lookup = lookup | models.Exists(queryset)
+        if not Pipeline.objects.filter(lookup, pk=self.pk).exists():
+            return
+        querysets = [queryset.values_list('plugin_piping_id', 'plugin_param_id',
+                                          'plugin_param__name')
+                     for queryset in querysets]
+        missing = sorted(querysets[0].union(*querysets[1:], all=True))
+        param_names = [f'{name} (piping {piping_id})' for (piping_id, _, name) in missing]
+        raise ValueError('A default is required for parameters %s'
+                         % ', '.join(param_names))
+
+    def get_plugin_tree(self):
+        """
+        Custom method to get the list of nodes representing the tree of plugins in the
+        pipeline in the same format that is accepted by the plugin_tree field at creation
+        time. Nodes are listed in breath-first order and the list is computed with a
+        fixed number of DB queries regardless of the size of the tree.
+        """
+        pipings = list(self.plugin_pipings.select_related('plugin__meta').order_by('id'))
+        parameter_defaults = {piping.id: [] for piping in pipings}
+        for default_model_class in DEFAULT_PIPING_PARAMETER_MODELS.values():
+            values = default_model_class.objects.filter(
+                plugin_piping__pipeline=self).order_by('plugin_param_id').values_list(
+                'plugin_piping_id', 'plugin_param__name', 'value')
+            for (piping_id, param_name, value) in values:
+                parameter_defaults[piping_id].append({'name': param_name,
+                                                      'default': value})
+        root = None
+        children = {}
+        for piping in pipings:
+            if piping.previous_id is None:
+                root = piping
+            else:
+                children.setdefault(piping.previous_id, []).append(piping)
+        tree = []
+        if root is None:
+            return tree
+        indices = {}
+        # breath-first traversal
+        queue = deque([root])
+        while len(queue):
+            piping = queue.popleft()
+            indices[piping.id] = len(tree)
+            previous_index = None
+            if piping.previous_id is not None:
+                previous_index = indices[piping.previous_id]
+            tree.append({'plugin_id': piping.plugin.id,
+                         'plugin_name': piping.plugin.meta.name,
+                         'plugin_version': piping.plugin.version,
+                         'title': piping.title,
+                         'previous_index': previous_index,
+                         'plugin_parameter_defaults': parameter_defaults[piping.id]})
+            queue.extend(children.get(piping.id, []))
+        return tree
+
+    def get_execution_plan(self):
+        """
+        Custom method to get the execution plan of the pipeline: a list of the tree
+        levels in breath-first order where each level is the list of pipings that can run
+        in parallel once the previous level has finished. Each piping includes the
+        resolved identity and resources of its plugin and all its parameter defaults.
+        The plan is computed with a fixed number of DB queries regardless of the size of
+        the tree.
+        """
+        pipings = list(self.plugin_pipings.select_related('plugin__meta').order_by('id'))
+        parameters = {piping.id: [] for piping in pipings}
+        for default_model_class in DEFAULT_PIPING_PARAMETER_MODELS.values():
+            values = default_model_class.objects.filter(
+                plugin_piping__pipeline=self).order_by('plugin_param_id').values_list(
+                'plugin_piping_id', 'plugin_param__name', 'plugin_param__flag',
+                'plugin_param__type', 'value')
+            for (piping_id, name, flag, param_type, value) in values:
+                parameters[piping_id].append({'name': name, 'flag': flag,
+                                              'type': param_type, 'value': value})
+        children = {}
+        level = []
+        for piping in pipings:
+            if piping.previous_id is None:
+                level.append(piping)
+            else:
+                children.setdefault(piping.previous_id, []).append(piping)
+        levels = []
+        while level:
+            nodes = []
+            for piping in level:
+                plugin = piping.plugin
+                node = {'piping_id': piping.id,
+                        'previous_piping_id': piping.previous_id,
+                        'title': piping.title,
+                        'plugin_id': plugin.id,
+                        'plugin_name': plugin.meta.name,
+                        'plugin_version': plugin.version,
+                        'plugin_type': plugin.meta.type,
+                        'dock_image': plugin.dock_image,
+                        'execshell': plugin.execshell,
+                        'selfpath': plugin.selfpath,
+                        'selfexec': plugin.selfexec,
+                        'parameters': parameters[piping.id]}
+                for resource in RESOURCES:
+                    node['min_' + resource] = getattr(plugin, 'min_' + resource)
+                nodes.append(node)
+            levels.append(nodes)
+            level = [child for piping in level for child in children.get(piping.id, [])]
+        return levels
+
+    def update_fingerprint(self):
+        """
+        Custom method to recompute and save the fingerprint of the pipeline after a
+        change of its tree of plugins or default parameter values.
+        """
+        plugin_tree = self.get_plugin_tree()
+        self.fingerprint = Pipeline.compute_fingerprint(plugin_tree) if plugin_tree else ''
+        Pipeline.objects.filter(pk=self.pk).update(fingerprint=self.fingerprint)
+
+    def update_resources(self):
+        """
+        Custom method to recompute and save the resource envelope of the pipeline after a
+        change of its tree of plugins.
+        """
+        pipings = self.plugin_pipings.values_list(
+            'id', 'previous_id', *['plugin__min_' + resource for resource in RESOURCES])
+        resources = Pipeline.compute_resources(list(pipings))
+        for (field_name, value) in resources.items():
+            setattr(self, field_name, value)
+        Pipeline.objects.filter(pk=self.pk).update(**resources)
+
+    @staticmethod
+    def compute_resources(pipings):
+        """
+        Custom method to compute the resource envelope of a tree of pipings given as a
+        list of (id, previous_id, min_cpu_limit, min_memory_limit, min_gpu_limit,
+        min_number_of_workers) tuples. Pipings at the same level of the tree may run
+        concurrently so the peak demand of a resource is the max over the levels of the
+        sum of the demands of the pipings in a level. The max single node demand of each
+        resource is also computed. Return a dictionary keyed by pipeline field name.
+        """
+        children = {}
+        demands = {}
+        root_id = None
+        for (piping_id, previous_id, *demand) in pipings:
+            demands[piping_id] = [value or 0 for value in demand]
+            if previous_id is None:
+                root_id = piping_id
+            else:
+                children.setdefault(previous_id, []).append(piping_id)
+        peak = [0] * len(RESOURCES)
+        max_node = [0] * len(RESOURCES)
+        level = [root_id] if root_id is not None else []
+        # breath-first traversal level by level
+        while level:
+            level_demand = [sum(values) for values in
+                            zip(*[demands[piping_id] for piping_id in level])]
+            peak = [max(values) for values in zip(peak, level_demand)]
+            for piping_id in level:
+                max_node = [max(values) for values in zip(max_node, demands[piping_id])]
+            level = [child_id for piping_id in level
+                     for child_id in children.get(piping_id, [])]
+        resources = {}
+        for (ix, resource) in enumerate(RESOURCES):
+            resources['peak_' + resource] = peak[ix]
+            resources['max_node_' + resource] = max_node[ix]
+        return resources
+
+    @staticmethod
+    def compute_fingerprint(tree_list):
+        """
+        Custom method to compute a canonical hash of a list of nodes representing a tree
+        of plugins in the format returned by get_plugin_tree. The hash only depends on
+        the plugins' names and versions, their parameter defaults and the shape of the
+        tree, so it doesn't change with the order of the nodes, the titles or the
+        pipeline's descriptive fields. Each node is hashed with the sorted hashes of its
+        children (Merkle tree) so that the cost is linear in the size of the tree.
+        """
+        children = [[] for _ in tree_list]
+        root_ix = None
+        for (ix, d) in enumerate(tree_list):
+            if d['previous_index'] is None:
+                root_ix = ix
+            else:
+                children[d['previous_index']].append(ix)
+        # breath-first order so that children are hashed before their parents when the
+        # order is reversed
+        order = [root_ix]
+        for ix in order:
+            order.extend(children[ix])
+        hashes = [None] * len(tree_list)
+        for ix in reversed(order):
+            d = tree_list[ix]
+            defaults = sorted([[default['name'], default['default']] for default in
+                               d['plugin_parameter_defaults']], key=lambda x: x[0])
+            node = [d['plugin_name'], d['plugin_version'], defaults,
+                    sorted(hashes[child_ix] for child_ix in children[ix])]
+            node_str = json.dumps(node, separators=(',', ':'))
+            hashes[ix] = hashlib.sha256(node_str.encode()).hexdigest()
+        return hashes[root_ix]
+
+    def get_default_parameters(self):
+        """
+        Custom method to get a queryset with all the default parameters of the pipeline
+        regardless of their type. The queryset is a single UNION ALL query of flat
+        dictionaries ordered by plugin piping and parameter so that it can be counted and
+        paginated in the DB. Each dictionary has a '<type>_value' key per parameter type
+        with only the key for the parameter's type set to the default value.
+        """
+        querysets = []
+        for (param_type, default_model_class) in DEFAULT_PIPING_PARAMETER_MODELS.items():
+            values = {}
+            for (value_type, value_model_class) in DEFAULT_PIPING_PARAMETER_MODELS.items():
+                if value_type == param_type:
+                    values[value_type + '_value'] = models.F('value')
+                else:
+                    value_field = value_model_class._meta.get_field('value')
+                    values[value_type + '_value'] = Cast(
+                        models.Value(None), output_field=value_field.__class__())
+            querysets.append(default_model_class.objects.filter(
+                plugin_piping__pipeline=self).values(
+                'id', 'plugin_piping_id',
+                previous_plugin_piping_id=models.F('plugin_piping__previous_id'),
+                plugin_id=models.F('plugin_piping__plugin_id'),
+                plugin_name=models.F('plugin_param__plugin__meta__name'),
+                plugin_version=models.F('plugin_param__plugin__version'),
+                param_id=models.F('plugin_param_id'),
+                param_name=models.F('plugin_param__name'),
+                type=models.F('plugin_param__type'),
+                **values))
+        queryset = querysets[0].union(*querysets[1:], all=True)
+        return queryset.order_by('plugin_piping_id', 'param_id')
+
+    def fork(self, owner, **kwargs):
+        """
+        Custom method to create a new locked copy of the pipeline owned by the passed
+        owner, including its tree of plugin pipings and all their default parameter
+        values. Keyword arguments override the copied descriptive fields (name is
+        required as pipeline names are unique). Rows are copied with a fixed number of
+        set-based SQL statements inside a single transaction regardless of the size of
+        the tree.
         """
-        for piping in self.plugin_pipings.all():
-            piping.check_parameter_defaults()
+        fields = {'authors': self.authors, 'category': self.category,
+                  'description': self.description, 'fingerprint': self.fingerprint}
+        for resource in RESOURCES:
+            for prefix in ('peak_', 'max_node_'):
+                fields[prefix + resource] = getattr(self, prefix + resource)
+        fields.update(kwargs)
+        with transaction.atomic():
+            pipeline = Pipeline.objects.create(owner=owner, locked=True, **fields)
+            pipings = list(self.plugin_pipings.order_by('id').values_list(
+                'id', 'title', 'plugin_id', 'previous_id'))
+            if not pipings:
+                return pipeline
+            # a single multi-row INSERT returning the new ids in order
+            new_pipings = PluginPiping.objects.bulk_create(
+                [PluginPiping(title=title, plugin_id=plugin_id, pipeline=pipeline)
+                 for (_, title, plugin_id, _) in pipings])
+            new_ids = {}
+            for ((piping_id, _, _, _), new_piping) in zip(pipings, new_pipings):
+                new_ids[piping_id] = new_piping.id
+            for ((_, _, _, previous_id), new_piping) in zip(pipings, new_pipings):
+                new_piping.previous_id = new_ids.get(previous_id)
+            PluginPiping.objects.bulk_update(
+                [piping for piping in new_pipings if piping.previous_id is not None],
+                ['previous'])
+            # an INSERT ... SELECT per default type remapping the plugin pipings
+            new_piping_id = models.Case(
+                *[models.When(plugin_piping_id=piping_id, then=models.Value(new_id))
+                  for (piping_id, new_id) in new_ids.items()],
+                output_field=models.BigIntegerField())
+            for default_model_class in DEFAULT_PIPING_PARAMETER_MODELS.values():
+                queryset = default_model_class.objects.filter(
+                    plugin_piping__pipeline=self).annotate(
+                    new_value=models.F('value'),
+                    new_plugin_piping_id=new_piping_id,
+                    new_plugin_param_id=models.F('plugin_param_id')).values_list(
+                    'new_value', 'new_plugin_piping_id', 'new_plugin_param_id')
+                (sql, params) = queryset.query.sql_with_params()
+                table = connection.ops.quote_name(default_model_class._meta.db_table)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'INSERT INTO {table} (value, plugin_piping_id, '
+                                   f'plugin_param_id) {sql}', params)
+        return pipeline
 
     @staticmethod
     def get_accesible_pipelines(user):
@@ -64,11 +373,148 @@ class PipelineFilter(FilterSet):
     description = django_filters.CharFilter(field_name='description',
                                             lookup_expr='icontains')
     authors = django_filters.CharFilter(field_name='authors', lookup_expr='icontains')
+    fingerprint = django_filters.CharFilter(field_name='fingerprint', lookup_expr='exact')
+    max_cpu_limit = django_filters.CharFilter(
+        method='filter_by_resource_limit',
+        help_text='Integer number of cores (e.g. 8) or millicores in the xm format '
+                  '(e.g. 8000m).')
+    max_memory_limit = django_filters.CharFilter(
+        method='filter_by_resource_limit',
+        help_text='Integer number of Mi (e.g. 16384) or memory in the xMi or xGi '
+                  'format (e.g. 16Gi).')
+    max_gpu_limit = django_filters.CharFilter(method='filter_by_resource_limit',
+                                              help_text='Integer number of GPUs.')
+    max_number_of_workers = django_filters.CharFilter(
+        method='filter_by_resource_limit', help_text='Integer number of workers.')
+    plugin_name = django_filters.CharFilter(method='filter_by_plugin')
+    plugin_version = django_filters.CharFilter(method='filter_by_plugin')
+    plugin_id = django_filters.NumberFilter(method='filter_by_plugin')
 
     class Meta:
         model = Pipeline
         fields = ['id', 'owner_username', 'name', 'category', 'description',
-                  'authors', 'min_creation_date', 'max_creation_date']
+                  'authors', 'min_creation_date', 'max_creation_date', 'fingerprint',
+                  'plugin_name', 'plugin_version', 'plugin_id', 'max_cpu_limit',
+                  'max_memory_limit', 'max_gpu_limit', 'max_number_of_workers']
+
+    def filter_by_resource_limit(self, queryset, name, value):
+        """
+        Custom method to get a filtered queryset with the pipelines whose peak demand of
+        a resource fits within the given limit. CPU and memory limits can be given as
+        integers (cores and Mi) or in the format of the plugin descriptors (e.g.
+        8000m and 16Gi).
+        """
+        conversions = {'max_cpu_limit': CPUInt, 'max_memory_limit': MemoryInt}
+        units = {'max_cpu_limit': 1000}  # integer cpu limits are given in cores
+        try:
+            if value.isdigit():
+                limit = int(value) * units.get(name, 1)
+            else:
+                limit = conversions[name](value)
+        except (KeyError, ValueError):
+            return queryset.none()
+        field_name = 'peak_' + name[len('max_'):]
+        return queryset.filter(**{field_name + '__lte': limit})
+
+    def filter_by_plugin(self, queryset, name, value):
+        """
+        Custom method to defer the plugin filters to filter_queryset where they are
+        combined so that they all apply to the same plugin piping.
+        """
+        return queryset
+
+    def filter_queryset(self, queryset):
+        """
+        Overriden to keep only the pipelines with a plugin piping that matches all the
+        given plugin filters. An EXISTS subquery is used instead of a join so that the
+        result doesn't contain duplicated pipelines and doesn't need a DISTINCT.
+        """
+        queryset = super(PipelineFilter, self).filter_queryset(queryset)
+        lookups = {'plugin_name': 'plugin__meta__name',
+                   'plugin_version': 'plugin__version',
+                   'plugin_id': 'plugin_id'}
+        piping_lookup = {}
+        for (name, lookup) in lookups.items():
+            value = self.form.cleaned_data.get(name)
+            if value not in (None, ''):
+                piping_lookup[lookup] = value
+        if piping_lookup:
+            pipings = PluginPiping.objects.filter(pipeline=models.OuterRef('pk'),
+                                                  **piping_lookup)
+            queryset = queryset.filter(models.Exists(pipings))
+        return queryset
+
+
+class PipelineRepresentation(models.Model):
+    """
+    Model class that stores the precomputed serialized representation (with host-relative
+    urls) of an unlocked pipeline. Unlocked pipelines are immutable and public so their
+    representation can be served directly without going through the serializers.
+    """
+    creation_date = models.DateTimeField(auto_now_add=True)
+    version = models.PositiveIntegerField(default=0)
+    etag = models.CharField(max_length=64)
+    detail = models.JSONField()
+    plugin_pipings = models.JSONField()
+    pipeline = models.OneToOneField(Pipeline, on_delete=models.CASCADE,
+                                    related_name='representation')
+
+    def __str__(self):
+        return self.etag
+
+    @staticmethod
+    def get_precomputed_data(pipeline_id, field_name):
+        """
+        Custom method to get a tuple with the entity tag and the precomputed serialized
+        data stored in the field_name field for a pipeline without instantiating any
+        model object. The entity tag includes the field name as each field is a
+        different resource. None is returned if the pipeline's representation has not
+        been computed with the current representation version.
+        """
+        queryset = PipelineRepresentation.objects.filter(pipeline_id=pipeline_id,
+                                                         version=REPRESENTATION_VERSION)
+        precomputed = queryset.values_list('etag', field_name).first()
+        if precomputed is None:
+            return None
+        (etag, data) = precomputed
+        return (f'{etag}-{field_name}', data)
+
+    @staticmethod
+    def get_precomputed_default_parameters(pipeline_id):
+        """
+        Custom method to get a tuple with the entity tag and a queryset of the
+        precomputed serialized default parameters of a pipeline so that they can be
+        paginated in the DB. None is returned if the pipeline's representation has not
+        been computed with the current representation version.
+        """
+        queryset = PipelineRepresentation.objects.filter(pipeline_id=pipeline_id,
+                                                         version=REPRESENTATION_VERSION)
+        precomputed = queryset.values_list('etag', 'id').first()
+        if precomputed is None:
+            return None
+        (etag, representation_id) = precomputed
+        queryset = PrecomputedDefaultParameter.objects.filter(
+            representation_id=representation_id).order_by('position')
+        return (f'{etag}-default_parameters', queryset.values_list('data', flat=True))
+
+
+class PrecomputedDefaultParameter(models.Model):
+    """
+    Model class that stores the precomputed serialized representation of a default
+    parameter value of an unlocked pipeline. Each default is stored in its own row so
+    that the list of defaults of large pipelines can be paginated in the DB.
+    """
+    position = models.PositiveIntegerField()
+    data = models.JSONField()
+    representation = models.ForeignKey(PipelineRepresentation, on_delete=models.CASCADE,
+                                       related_name='default_parameters')
+
+    class Meta:
+        ordering = ('representation', 'position',)
+        unique_together = ('representation', 'position',)
+
+    def __str__(self):
+        return str(self.position)
 
 
 class PluginPiping(models.Model):
@@ -81,6 +527,10 @@ class PluginPiping(models.Model):
 
     class Meta:
         ordering = ('pipeline',)
+        indexes = [
+            # supports finding the pipelines that use a plugin
+            models.Index(fields=['plugin', 'pipeline']),
+        ]
 
     def __str__(self):
         return str(self.id)
@@ -119,17 +569,50 @@ class PluginPiping(models.Model):
                     default_piping_param.value = param[0]['default']
                     default_piping_param.save()
 
-    def check_parameter_defaults(self):
+    def swap_plugin(self, plugin):
         """
-        Custom method to raise an exception if any of the plugin parameters associated to
-        the piping doesn't have a default value.
-        """
-        for type in DEFAULT_PIPING_PARAMETER_MODELS:
-            typed_parameters = getattr(self, type + '_param')
-            for parameter in typed_parameters.all():
-                if parameter.value is None:
-                    raise ValueError('A default is required for parameter %s'
-                                     % parameter.plugin_param.name)
+        Custom method to replace the piping's plugin by another plugin (usually another
+        version of the same plugin) touching only the affected default rows. Defaults of
+        parameters with the same name and type in both plugins are kept, defaults of
+        parameters that are not in the new plugin are deleted and defaults for the new
+        plugin's extra parameters are created from the plugin's own defaults.
+        """
+        old_params = {param.name: param for param in self.plugin.parameters.all()}
+        new_params = {param.name: param for param in plugin.parameters.select_related(
+            'string_default', 'integer_default', 'float_default', 'boolean_default')}
+        kept = {}
+        deleted = {}
+        for (name, old_param) in old_params.items():
+            new_param = new_params.get(name)
+            if new_param is not None and new_param.type == old_param.type:
+                if new_param.id != old_param.id:
+                    kept.setdefault(old_param.type, []).append(
+                        models.When(plugin_param_id=old_param.id,
+                                    then=models.Value(new_param.id)))
+            else:
+                deleted.setdefault(old_param.type, []).append(old_param.id)
+        created = {}
+        for (name, new_param) in new_params.items():
+            old_param = old_params.get(name)
+            if old_param is None or old_param.type != new_param.type:
+                default_model_class = DEFAULT_PIPING_PARAMETER_MODELS[new_param.type]
+                default = new_param.get_default()
+                created.setdefault(new_param.type, []).append(
+                    default_model_class(plugin_piping=self, plugin_param=new_param,
+                                        value=default.value if default else None))
+        with transaction.atomic():
+            for (param_type, model_class) in DEFAULT_PIPING_PARAMETER_MODELS.items():
+                defaults = model_class.objects.filter(plugin_piping=self)
+                if param_type in deleted:
+                    defaults.filter(plugin_param_id__in=deleted[param_type]).delete()
+                if param_type in kept:
+                    defaults.update(plugin_param_id=models.Case(
+                        *kept[param_type], default=models.F('plugin_param_id'),
+                        output_field=models.BigIntegerField()))
+                if param_type in created:
+                    model_class.objects.bulk_create(created[param_type])
+            PluginPiping.objects.filter(pk=self.pk).update(plugin=plugin)
+        self.plugin = plugin
 
 
 class DefaultPipingStrParameter(models.Model):
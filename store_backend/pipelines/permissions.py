@@ -26,7 +26,7 @@ class IsChrisOrOwnerAndLockedOrNotLockedReadOnly(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        pipeline = obj.plugin_piping.pipeline
+        pipeline = self.get_pipeline(obj)
         if request.user.is_authenticated and request.user.username == 'chris':
             # superuser 'chris' always has read/write access
             return True
@@ -38,6 +38,24 @@ class IsChrisOrOwnerAndLockedOrNotLockedReadOnly(permissions.BasePermission):
             # only allow read access (GET, HEAD or OPTIONS requests.)
             return request.method in permissions.SAFE_METHODS
 
+    @staticmethod
+    def get_pipeline(obj):
+        """
+        Get the pipeline the object belongs to.
+        """
+        return obj.plugin_piping.pipeline
+
+
+class IsChrisOrOwnerAndLockedOrNotLockedReadOnlyPipeline(
+        IsChrisOrOwnerAndLockedOrNotLockedReadOnly):
+    """
+    Same as IsChrisOrOwnerAndLockedOrNotLockedReadOnly but for pipeline objects.
+    """
+
+    @staticmethod
+    def get_pipeline(obj):
+        return obj
+
 
 class IsChrisOrOwnerOrNotLocked(permissions.BasePermission):
     """
@@ -51,3 +69,14 @@ class IsChrisOrOwnerOrNotLocked(permissions.BasePermission):
             return True
         # superuser 'chris' and owner always have read/write access
         return (request.user == pipeline.owner) or (request.user.username == 'chris')
+
+
+class IsChrisOrOwnerAndLockedOrNotLockedReadOnlyPiping(
+        IsChrisOrOwnerAndLockedOrNotLockedReadOnly):
+    """
+    Same as IsChrisOrOwnerAndLockedOrNotLockedReadOnly but for plugin piping objects.
+    """
+
+    @staticmethod
+    def get_pipeline(obj):
+        return obj.pipeline
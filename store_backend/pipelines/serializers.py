@@ -1,72 +1,222 @@
 
 import json
+import hashlib
+from collections import deque
 
-from django.core.exceptions import ObjectDoesNotExist
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Prefetch, Q
 from django.utils import timezone
 from rest_framework import serializers
-from rest_framework.reverse import reverse
 
-from collectionjson.fields import ItemLinkField
-from plugins.models import Plugin, TYPES
+from collectionjson.fields import (ItemLinkField, HyperlinkedIdentityField,
+                                   HyperlinkedRelatedField)
+from collectionjson.links import reverse_link
+from collectionjson.serializers import (SparseFieldsetSerializerMixin,
+                                       LinkTemplateSerializerMixin)
+from plugins.models import Plugin, PluginParameter, TYPES
 from plugins.serializers import DEFAULT_PARAMETER_SERIALIZERS
 
-from .models import Pipeline, PluginPiping
+from .models import Pipeline, PipelineRepresentation, PluginPiping
+from .models import PrecomputedDefaultParameter
+from .models import DEFAULT_PIPING_PARAMETER_MODELS, REPRESENTATION_VERSION
 from .models import DefaultPipingFloatParameter, DefaultPipingIntParameter
 from .models import DefaultPipingBoolParameter, DefaultPipingStrParameter
 
 
-class PluginPipingSerializer(serializers.HyperlinkedModelSerializer):
+class PluginPipingSerializer(SparseFieldsetSerializerMixin, LinkTemplateSerializerMixin,
+                             serializers.HyperlinkedModelSerializer):
     previous_id = serializers.ReadOnlyField(source='previous.id')
     plugin_id = serializers.ReadOnlyField(source='plugin.id')
     plugin_name = serializers.ReadOnlyField(source='plugin.meta.name')
-    plugin_version = serializers.ReadOnlyField(source='plugin.version')
+    plugin_version = serializers.CharField(source='plugin.version', required=False)
     pipeline_id = serializers.ReadOnlyField(source='pipeline.id')
-    previous = serializers.HyperlinkedRelatedField(view_name='pluginpiping-detail',
-                                                 read_only=True)
-    plugin = serializers.HyperlinkedRelatedField(view_name='plugin-detail',
-                                                 read_only=True)
-    pipeline = serializers.HyperlinkedRelatedField(view_name='pipeline-detail',
-                                                   read_only=True)
+    previous = HyperlinkedRelatedField(view_name='pluginpiping-detail', read_only=True)
+    plugin = HyperlinkedRelatedField(view_name='plugin-detail', read_only=True)
+    pipeline = HyperlinkedRelatedField(view_name='pipeline-detail', read_only=True)
 
     class Meta:
         model = PluginPiping
         fields = ('url', 'id', 'previous_id', 'title', 'plugin_id', 'plugin_name',
                   'plugin_version', 'pipeline_id', 'previous', 'plugin', 'pipeline')
 
+    def update(self, instance, validated_data):
+        """
+        Overriden to swap the piping's plugin by another version of the same plugin and
+        change the piping's title touching only the affected rows.
+        """
+        plugin = validated_data.pop('plugin', None)
+        with transaction.atomic():
+            if plugin is not None and plugin.id != instance.plugin_id:
+                instance.swap_plugin(plugin)
+            if 'title' in validated_data:
+                instance.title = validated_data['title']
+                PluginPiping.objects.filter(pk=instance.pk).update(title=instance.title)
+            PluginPipingSerializer.touch_pipeline(instance.pipeline)
+        return instance
+
+    def validate(self, data):
+        """
+        Overriden to replace the plugin version by the plugin with that version and the
+        same name as the piping's current plugin. The structure of unlocked pipelines
+        can not be modified.
+        """
+        if self.instance:
+            PluginPipingSerializer.validate_pipeline_locked(self.instance.pipeline)
+            if 'plugin' in data:
+                version = data['plugin']['version']
+                try:
+                    data['plugin'] = Plugin.objects.get(meta=self.instance.plugin.meta,
+                                                        version=version)
+                except Plugin.DoesNotExist:
+                    raise serializers.ValidationError(
+                        {'plugin_version': [f'Could not find any plugin with name '
+                                            f'{self.instance.plugin.meta.name} and '
+                                            f'version {version}.']})
+        return data
+
+    @staticmethod
+    def validate_pipeline_locked(pipeline):
+        """
+        Custom method to raise a validation error if the structure of a pipeline can not
+        be modified because it's unlocked (immutable).
+        """
+        if not pipeline.locked:
+            raise serializers.ValidationError(
+                {'non_field_errors': ['The plugin pipings of an unlocked pipeline can '
+                                      'not be modified.']})
+
+    @staticmethod
+    def touch_pipeline(pipeline):
+        """
+        Custom method to update the modification date, the fingerprint and the resource
+        envelope of a pipeline after a change of its structure.
+        """
+        pipeline.modification_date = timezone.now()
+        Pipeline.objects.filter(pk=pipeline.pk).update(
+            modification_date=pipeline.modification_date)
+        pipeline.update_fingerprint()
+        pipeline.update_resources()
+
+
+class PluginPipingSubtreeSerializer(serializers.Serializer):
+    previous_id = serializers.IntegerField(write_only=True)
+    plugin_tree = serializers.JSONField(write_only=True)
+
+    def create(self, validated_data):
+        """
+        Overriden to attach the tree of plugins under the previous piping of the
+        pipeline. Return the root piping of the new subtree.
+        """
+        pipeline = validated_data['pipeline']
+        with transaction.atomic():
+            root_piping = PipelineSerializer._add_plugin_tree_to_pipeline(
+                pipeline, validated_data['plugin_tree'], validated_data['previous_id'])
+            PluginPipingSerializer.touch_pipeline(pipeline)
+        return root_piping
+
+    def validate_previous_id(self, previous_id):
+        """
+        Overriden to validate that the previous piping belongs to the pipeline and
+        replace its id by the piping object.
+        """
+        pipeline = self.context['pipeline']
+        try:
+            return pipeline.plugin_pipings.get(pk=previous_id)
+        except PluginPiping.DoesNotExist:
+            raise serializers.ValidationError(
+                [f'Could not find any plugin piping with id {previous_id} in this '
+                 f'pipeline.'])
+
+    def validate_plugin_tree(self, plugin_tree):
+        """
+        Overriden to validate the tree of plugins in the same way as when creating a
+        pipeline.
+        """
+        return PipelineSerializer().validate_plugin_tree(plugin_tree)
+
+    def validate(self, data):
+        """
+        Overriden to validate that the pipeline is locked.
+        """
+        PluginPipingSerializer.validate_pipeline_locked(self.context['pipeline'])
+        return data
+
 
-class PipelineSerializer(serializers.HyperlinkedModelSerializer):
+class PipelineSerializer(SparseFieldsetSerializerMixin, LinkTemplateSerializerMixin,
+                         serializers.HyperlinkedModelSerializer):
     plugin_tree = serializers.JSONField(write_only=True, required=False)
+    on_duplicate = serializers.ChoiceField(choices=['reject', 'return'],
+                                           write_only=True, required=False)
+    fingerprint = serializers.ReadOnlyField()
     owner_username = serializers.ReadOnlyField(source='owner.username')
-    plugins = serializers.HyperlinkedIdentityField(view_name='pipeline-plugin-list')
-    plugin_pipings = serializers.HyperlinkedIdentityField(
+    plugins = HyperlinkedIdentityField(view_name='pipeline-plugin-list')
+    plugin_pipings = HyperlinkedIdentityField(
         view_name='pipeline-pluginpiping-list')
-    default_parameters = serializers.HyperlinkedIdentityField(
+    default_parameters = HyperlinkedIdentityField(
         view_name='pipeline-defaultparameter-list')
+    document = HyperlinkedIdentityField(view_name='pipeline-document')
+    plan = HyperlinkedIdentityField(view_name='pipeline-plan')
 
     class Meta:
         model = Pipeline
         fields = ('url', 'id', 'name', 'locked', 'authors', 'category', 'description',
-                  'plugin_tree', 'owner_username', 'creation_date', 'modification_date',
-                  'plugins', 'plugin_pipings', 'default_parameters')
+                  'plugin_tree', 'on_duplicate', 'fingerprint', 'peak_cpu_limit',
+                  'peak_memory_limit', 'peak_gpu_limit', 'peak_number_of_workers',
+                  'max_node_cpu_limit', 'max_node_memory_limit', 'max_node_gpu_limit',
+                  'max_node_number_of_workers', 'owner_username', 'creation_date',
+                  'modification_date', 'plugins', 'plugin_pipings', 'default_parameters',
+                  'document', 'plan')
+        read_only_fields = ('peak_cpu_limit', 'peak_memory_limit', 'peak_gpu_limit',
+                            'peak_number_of_workers', 'max_node_cpu_limit',
+                            'max_node_memory_limit', 'max_node_gpu_limit',
+                            'max_node_number_of_workers')
 
     def create(self, validated_data):
         """
         Overriden to create the pipeline and associate to it a tree of plugins computed
-        from a passed tree.
+        from a passed tree. If the on_duplicate mode is set and an accessible pipeline
+        with the same fingerprint already exists then the creation is either rejected or
+        the existing pipeline is returned instead.
         """
         tree_dict = validated_data.pop('plugin_tree')
+        on_duplicate = validated_data.pop('on_duplicate', None)
+        plugins = getattr(self, 'plugins', None)
+        fingerprint = PipelineSerializer.get_tree_fingerprint(tree_dict, plugins)
+        if on_duplicate:
+            duplicate = Pipeline.get_accesible_pipelines(validated_data['owner']).filter(
+                fingerprint=fingerprint).first()
+            if duplicate is not None:
+                if on_duplicate == 'reject':
+                    raise serializers.ValidationError(
+                        {'non_field_errors': [f"Pipeline '{duplicate.name}' with id "
+                                              f"{duplicate.id} has the same plugin tree "
+                                              f"and default parameter values."]})
+                self.duplicate = duplicate
+                return duplicate
+        validated_data['fingerprint'] = fingerprint
         pipeline = super(PipelineSerializer, self).create(validated_data)
-        PipelineSerializer._add_plugin_tree_to_pipeline(pipeline, tree_dict)
+        PipelineSerializer._add_plugin_tree_to_pipeline(pipeline, tree_dict,
+                                                        plugins=plugins)
+        pipeline.update_resources()
+        if not pipeline.locked:
+            PipelineSerializer.save_representation(pipeline)
         return pipeline
 
     def update(self, instance, validated_data):
         """
         Overriden to remove parameters that are not allowed to be used on update to add
-        modification date.
+        modification date. The precomputed representation of the pipeline is also
+        saved if the pipeline is unlocked.
         """
         validated_data.pop('plugin_tree', None)
+        validated_data.pop('on_duplicate', None)
         validated_data.update({'modification_date': timezone.now()})
-        return super(PipelineSerializer, self).update(instance, validated_data)
+        pipeline = super(PipelineSerializer, self).update(instance, validated_data)
+        if not pipeline.locked:
+            PipelineSerializer.save_representation(pipeline)
+        return pipeline
 
     def validate(self, data):
         """
@@ -82,8 +232,12 @@ class PipelineSerializer(serializers.HyperlinkedModelSerializer):
                 # if user wants to unlock pipeline right away at creation time then check
                 # that defaults for all plugin parameters can be defined
                 tree = data['plugin_tree']['tree']
+                plugins = getattr(self, 'plugins', None)
+                if plugins is None:
+                    plugins = Plugin.objects.in_bulk(
+                        {int(node['plugin_id']) for node in tree})
                 for node in tree:
-                    plg = Plugin.objects.get(pk=node['plugin_id'])
+                    plg = plugins[int(node['plugin_id'])]
                     parameters = plg.parameters.all()
                     for parameter in parameters:
                         default = parameter.get_default()
@@ -103,7 +257,9 @@ class PipelineSerializer(serializers.HyperlinkedModelSerializer):
         """
         Overriden to validate the tree of plugin ids. It should be a list of dictionaries.
         Each dictionary is a tree node containing the index of the previous node in the
-        list and either a plugin id or a plugin name and a plugin version.
+        list and either a plugin id or a plugin name and a plugin version. The plugins
+        are taken from the 'tree_plugins' context entry if given (a tuple as returned by
+        get_tree_plugins) and otherwise fetched from the DB in a batch.
         """
         try:
             plugin_list = list(json.loads(plugin_tree))
@@ -117,27 +273,38 @@ class PipelineSerializer(serializers.HyperlinkedModelSerializer):
 
         for d in plugin_list:
             try:
-                prev_ix = d['previous_index']
+                d['previous_index']
                 if 'plugin_id' not in d:
-                    plg_name = d['plugin_name']
-                    plg_version = d['plugin_version']
-                    plg = Plugin.objects.get(meta__name=plg_name, version=plg_version)
-                    d['plugin_id'] = plg.id
+                    (d['plugin_name'], d['plugin_version'])
                 else:
-                    plg_id = d['plugin_id']
-                    plg = Plugin.objects.get(pk=plg_id)
-            except ObjectDoesNotExist:
-                if 'plugin_id' not in d:
-                    msg = [f'Could not find any plugin with name {plg_name} and version '
-                           f'{plg_version}.']
-                else:
-                    msg = [f'Could not find any plugin with id {plg_id}.']
-                raise serializers.ValidationError(msg)
+                    int(d['plugin_id'])
             except Exception:
                 msg = [f"Object {d} must be a JSON object with 'previous_index' and "
                        f"either 'plugin_id' or 'plugin_name' and 'plugin_version' "
                        f"properties."]
                 raise serializers.ValidationError(msg)
+        tree_plugins = self.context.get('tree_plugins')
+        if tree_plugins is None:
+            tree_plugins = PipelineSerializer.get_tree_plugins(plugin_list)
+        (plugins_by_id, plugins_by_name) = tree_plugins
+        self.plugins = {}  # the plugins of this tree keyed by id
+        for d in plugin_list:
+            if 'plugin_id' not in d:
+                plg_name = d['plugin_name']
+                plg_version = d['plugin_version']
+                plg = plugins_by_name.get((str(plg_name), str(plg_version)))
+                if plg is None:
+                    msg = [f'Could not find any plugin with name {plg_name} and version '
+                           f'{plg_version}.']
+                    raise serializers.ValidationError(msg)
+                d['plugin_id'] = plg.id
+            else:
+                plg_id = d['plugin_id']
+                plg = plugins_by_id.get(int(plg_id))
+                if plg is None:
+                    msg = [f'Could not find any plugin with id {plg_id}.']
+                    raise serializers.ValidationError(msg)
+            self.plugins[plg.id] = plg
             if plg.meta.type == 'fs':
                 msg = [f"Plugin {plg} is of type 'fs' and therefore can not be used to "
                        f"create a pipeline."]
@@ -172,18 +339,97 @@ class PipelineSerializer(serializers.HyperlinkedModelSerializer):
         if not locked and self.instance: # this validation only happens on update
             try:
                 self.instance.check_parameter_defaults()
-            except ValueError:
+            except ValueError as e:
                 # overriden validation methods automatically add the field name
                 raise serializers.ValidationError(
-                    ['Pipeline can not be unlocked until all plugin parameters have '
-                     'default values.'])
+                    [f'Pipeline can not be unlocked until all plugin parameters have '
+                     f'default values. {str(e)}.'])
         return locked
 
+    @staticmethod
+    def get_tree_fingerprint(tree_dict, plugins=None):
+        """
+        Custom method to compute the fingerprint of a validated tree of plugins before
+        it's saved to the DB. As in PluginPiping.save, parameters without a default in the
+        tree get the plugin's own default. The plugins are taken from the plugins
+        dictionary (keyed by id) if given and otherwise fetched from the DB in a batch.
+        """
+        tree = tree_dict['tree']
+        if plugins is None:
+            plugins = Plugin.objects.filter(
+                pk__in={int(node['plugin_id']) for node in tree}).select_related(
+                'meta').prefetch_related(PipelineSerializer.get_parameters_prefetch())
+            plugins = {plg.id: plg for plg in plugins}
+        previous = {}
+        for (ix, node) in enumerate(tree):
+            for child_ix in node['child_indices']:
+                previous[child_ix] = ix
+        tree_list = []
+        for (ix, node) in enumerate(tree):
+            plg = plugins[int(node['plugin_id'])]
+            given = {d['name']: d['default'] for d in node['plugin_parameter_defaults']}
+            defaults = []
+            for param in plg.parameters.all():
+                if param.name in given:
+                    default_model_class = DEFAULT_PIPING_PARAMETER_MODELS[param.type]
+                    value_field = default_model_class._meta.get_field('value')
+                    value = value_field.to_python(given[param.name])
+                else:
+                    default = param.get_default()
+                    value = default.value if default else None
+                defaults.append({'name': param.name, 'default': value})
+            tree_list.append({'plugin_name': plg.meta.name,
+                              'plugin_version': plg.version,
+                              'previous_index': previous.get(ix),
+                              'plugin_parameter_defaults': defaults})
+        return Pipeline.compute_fingerprint(tree_list)
+
+    @staticmethod
+    def get_tree_plugins(tree_list):
+        """
+        Custom method to fetch in a batch all the plugins referenced by the nodes of a
+        tree list either by id or by name and version (with their parameters and the
+        parameters' defaults). Returns a tuple of two
+        dictionaries with the plugins keyed by id and by (name, version) respectively.
+        """
+        ids = set()
+        lookup = None
+        for d in tree_list:
+            if 'plugin_id' in d:
+                ids.add(int(d['plugin_id']))
+            else:
+                q = Q(meta__name=str(d['plugin_name']),
+                             version=str(d['plugin_version']))
+                lookup = q if lookup is None else lookup | q
+        if ids:
+            lookup = Q(pk__in=ids) if lookup is None else lookup | Q(
+                pk__in=ids)
+        plugins_by_id = {}
+        plugins_by_name = {}
+        if lookup is not None:
+            queryset = Plugin.objects.filter(lookup).select_related(
+                'meta').prefetch_related(PipelineSerializer.get_parameters_prefetch())
+            for plg in queryset:
+                plugins_by_id[plg.id] = plg
+                plugins_by_name[(plg.meta.name, plg.version)] = plg
+        return plugins_by_id, plugins_by_name
+
+    @staticmethod
+    def get_parameters_prefetch():
+        """
+        Custom method to get the prefetch of the plugins' parameters together with their
+        defaults that is needed to compute the fingerprint of a tree.
+        """
+        parameters = PluginParameter.objects.select_related(
+            'string_default', 'integer_default', 'float_default', 'boolean_default')
+        return Prefetch('parameters', queryset=parameters)
+
     @staticmethod
     def validate_plugin_parameter_defaults(plugin, parameter_defaults):
         """
         Custom method to validate the parameter names and their default values given
-        for a plugin in the plugin tree.
+        for a plugin in the plugin tree. A null default value is accepted as it's how
+        the pipeline document represents a parameter without a default.
         """
         parameters = plugin.parameters.all()
         for d in parameter_defaults:
@@ -200,6 +446,8 @@ class PipelineSerializer(serializers.HyperlinkedModelSerializer):
                 raise serializers.ValidationError(
                     {'plugin_tree': [f'Could not find any parameter with name {name} for '
                                      f'plugin {plugin.meta.name}.']})
+            if default is None:
+                continue
             default_param_serializer = DEFAULT_PARAMETER_SERIALIZERS[param[0].type](
                 data={'value': default})
             if not default_param_serializer.is_valid():
@@ -264,47 +512,179 @@ class PipelineSerializer(serializers.HyperlinkedModelSerializer):
         num_nodes = len(tree)
         # breath-first traversal
         nodes = []
-        queue = [root_ix]
+        queue = deque([root_ix])
         while len(queue):
-            curr_ix = queue.pop(0)
+            curr_ix = queue.popleft()
             nodes.append(curr_ix)
             queue.extend(tree[curr_ix]['child_indices'])
         if len(nodes) < num_nodes:
             raise ValueError('Tree is not connected!')
 
     @staticmethod
-    def _add_plugin_tree_to_pipeline(pipeline, tree_dict):
+    def save_representation(pipeline):
+        """
+        Custom method to precompute and save to the DB the serialized representation
+        (detail, plugin pipings and default parameters) of an unlocked pipeline. Urls
+        are host-relative as no request is passed in the serializers' context. Each
+        default parameter is stored in its own row so that they can be paginated in the
+        DB.
+        """
+        context = {'request': None}
+        detail = PipelineSerializer(pipeline, context=context).data
+        pipings = pipeline.plugin_pipings.select_related('previous', 'plugin__meta',
+                                                         'pipeline').order_by('id')
+        plugin_pipings = PluginPipingSerializer(pipings, many=True, context=context).data
+        default_parameters = GenericDefaultPipingParameterSerializer(
+            pipeline.get_default_parameters(), many=True, context=context).data
+        content = json.dumps([REPRESENTATION_VERSION, detail, plugin_pipings,
+                              default_parameters], sort_keys=True)
+        etag = hashlib.sha256(content.encode()).hexdigest()
+        with transaction.atomic():
+            (representation, created) = PipelineRepresentation.objects.update_or_create(
+                pipeline=pipeline, defaults={'version': REPRESENTATION_VERSION,
+                                             'etag': etag, 'detail': detail,
+                                             'plugin_pipings': plugin_pipings})
+            if not created:
+                representation.default_parameters.all().delete()
+            PrecomputedDefaultParameter.objects.bulk_create(
+                [PrecomputedDefaultParameter(representation=representation,
+                                             position=position, data=data)
+                 for (position, data) in enumerate(default_parameters)])
+
+    @staticmethod
+    def _add_plugin_tree_to_pipeline(pipeline, tree_dict, previous=None, plugins=None):
         """
         Internal custom method to associate a tree of plugins to a pipeline in the DB.
+        The root of the tree is attached to the previous piping if given. The plugins
+        are taken from the plugins dictionary (keyed by id) if given and otherwise
+        fetched from the DB in a batch. Each piping is saved only once together with its
+        default parameter values so that the defaults are created with their final
+        values and no signal recomputes the pipeline's representation while the tree is
+        being added. Return the root piping.
         """
         # here a piping precedes another piping if its corresponding plugin precedes
         # the other piping's plugin in the pipeline
         root_ix = tree_dict['root_index']
         tree = tree_dict['tree']
-        root_plg = Plugin.objects.get(pk=tree[root_ix]['plugin_id'])
+        if plugins is None:
+            plugins = Plugin.objects.in_bulk({int(node['plugin_id']) for node in tree})
+        root_plg = plugins[int(tree[root_ix]['plugin_id'])]
         title = tree[root_ix]['title']
-        root_plg_piping = PluginPiping.objects.create(title=title, pipeline=pipeline,
-                                                      plugin=root_plg)
+        root_plg_piping = PluginPiping(title=title, pipeline=pipeline, plugin=root_plg,
+                                       previous=previous)
         defaults = tree[root_ix]['plugin_parameter_defaults']
         root_plg_piping.save(parameter_defaults=defaults)
         # breath-first traversal
-        piping_queue = [root_plg_piping]
-        ix_queue = [root_ix]
+        piping_queue = deque([root_plg_piping])
+        ix_queue = deque([root_ix])
         while len(piping_queue):
-            curr_ix = ix_queue.pop(0)
-            curr_piping = piping_queue.pop(0)
+            curr_ix = ix_queue.popleft()
+            curr_piping = piping_queue.popleft()
             for ix in tree[curr_ix]['child_indices']:
-                plg = Plugin.objects.get(pk=tree[ix]['plugin_id'])
+                plg = plugins[int(tree[ix]['plugin_id'])]
                 title = tree[ix]['title']
-                plg_piping = PluginPiping.objects.create(title=title, pipeline=pipeline,
-                                                         plugin=plg, previous=curr_piping)
+                plg_piping = PluginPiping(title=title, pipeline=pipeline, plugin=plg,
+                                          previous=curr_piping)
                 defaults = tree[ix]['plugin_parameter_defaults']
                 plg_piping.save(parameter_defaults=defaults)
                 ix_queue.append(ix)
                 piping_queue.append(plg_piping)
+        return root_plg_piping
 
 
-class DefaultPipingStrParameterSerializer(serializers.HyperlinkedModelSerializer):
+class PipelineForkSerializer(PipelineSerializer):
+    plugin_tree = None
+    on_duplicate = None
+
+    class Meta:
+        model = Pipeline
+        fields = ('url', 'id', 'name', 'locked', 'authors', 'category', 'description',
+                  'fingerprint', 'peak_cpu_limit', 'peak_memory_limit', 'peak_gpu_limit',
+                  'peak_number_of_workers', 'max_node_cpu_limit', 'max_node_memory_limit',
+                  'max_node_gpu_limit', 'max_node_number_of_workers', 'owner_username',
+                  'creation_date', 'modification_date', 'plugins', 'plugin_pipings',
+                  'default_parameters', 'document', 'plan')
+        read_only_fields = ('locked',) + PipelineSerializer.Meta.read_only_fields
+
+    def create(self, validated_data):
+        """
+        Overriden to create the new pipeline as a locked copy of the source pipeline.
+        """
+        source = validated_data.pop('source')
+        return source.fork(**validated_data)
+
+    def validate(self, data):
+        """
+        Overriden to skip the plugin tree validation as the tree is copied from the
+        source pipeline.
+        """
+        return data
+
+
+class PipelineDocumentSerializer(SparseFieldsetSerializerMixin,
+                                 LinkTemplateSerializerMixin,
+                                 serializers.HyperlinkedModelSerializer):
+    owner_username = serializers.ReadOnlyField(source='owner.username')
+    plugin_tree = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Pipeline
+        fields = ('url', 'id', 'name', 'locked', 'authors', 'category', 'description',
+                  'fingerprint', 'owner_username', 'creation_date', 'modification_date',
+                  'plugin_tree')
+
+    def get_plugin_tree(self, obj):
+        """
+        Overriden to get the pipeline's tree of plugins as a list in the same format
+        that is accepted (as a JSON string) by the plugin_tree field of a new pipeline.
+        """
+        return obj.get_plugin_tree()
+
+
+class PipelineExecutionPlanSerializer(SparseFieldsetSerializerMixin,
+                                      LinkTemplateSerializerMixin,
+                                      serializers.HyperlinkedModelSerializer):
+    plan = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Pipeline
+        fields = ('url', 'id', 'name', 'locked', 'fingerprint', 'peak_cpu_limit',
+                  'peak_memory_limit', 'peak_gpu_limit', 'peak_number_of_workers',
+                  'modification_date', 'plan')
+
+    def get_plan(self, obj):
+        """
+        Overriden to get the pipeline's execution plan as a list of levels. The plan is
+        generated once per version of the pipeline and of its plugins and cached for the
+        PIPELINE_PLAN_CACHE_TIMEOUT setting's number of seconds.
+        """
+        key = PipelineExecutionPlanSerializer.get_plan_cache_key(obj)
+        plan = cache.get(key)
+        if plan is None:
+            plan = obj.get_execution_plan()
+            cache.set(key, plan,
+                      timeout=getattr(settings, 'PIPELINE_PLAN_CACHE_TIMEOUT', 3600))
+        return plan
+
+    @staticmethod
+    def get_plan_cache_key(pipeline):
+        """
+        Custom method to get the cache key of the execution plan of a version of a
+        pipeline. The key includes the latest modification date of the pipeline's plugins
+        and plugin metas so that a plugin change made by any process (even with a
+        per-process cache) produces a new key.
+        """
+        dates = pipeline.plugin_pipings.aggregate(
+            plugin_date=Max('plugin__modification_date'),
+            meta_date=Max('plugin__meta__modification_date'))
+        dates = [date.timestamp() if date else 0 for date in dates.values()]
+        return (f'pipeline_plan_{pipeline.id}_{pipeline.modification_date.timestamp()}_'
+                f'{pipeline.fingerprint}_{dates[0]}_{dates[1]}')
+
+
+class DefaultPipingStrParameterSerializer(SparseFieldsetSerializerMixin,
+                                          LinkTemplateSerializerMixin,
+                                          serializers.HyperlinkedModelSerializer):
     previous_plugin_piping_id = serializers.ReadOnlyField(
         source='plugin_piping.previous_id')
     plugin_piping_id = serializers.ReadOnlyField(source='plugin_piping.id')
@@ -314,10 +694,10 @@ class DefaultPipingStrParameterSerializer(serializers.HyperlinkedModelSerializer
     param_id = serializers.ReadOnlyField(source='plugin_param.id')
     param_name = serializers.ReadOnlyField(source='plugin_param.name')
     type = serializers.ReadOnlyField(source='plugin_param.type')
-    plugin_piping = serializers.HyperlinkedRelatedField(view_name='pluginpiping-detail',
-                                                   read_only=True)
-    plugin_param = serializers.HyperlinkedRelatedField(view_name='pluginparameter-detail',
-                                                       read_only=True)
+    plugin_piping = HyperlinkedRelatedField(view_name='pluginpiping-detail',
+                                            read_only=True)
+    plugin_param = HyperlinkedRelatedField(view_name='pluginparameter-detail',
+                                           read_only=True)
 
     class Meta:
         model = DefaultPipingStrParameter
@@ -326,7 +706,9 @@ class DefaultPipingStrParameterSerializer(serializers.HyperlinkedModelSerializer
                   'plugin_name', 'plugin_version', 'plugin_id', 'plugin_param')
 
 
-class DefaultPipingIntParameterSerializer(serializers.HyperlinkedModelSerializer):
+class DefaultPipingIntParameterSerializer(SparseFieldsetSerializerMixin,
+                                          LinkTemplateSerializerMixin,
+                                          serializers.HyperlinkedModelSerializer):
     previous_plugin_piping_id = serializers.ReadOnlyField(
         source='plugin_piping.previous_id')
     plugin_piping_id = serializers.ReadOnlyField(source='plugin_piping.id')
@@ -336,10 +718,10 @@ class DefaultPipingIntParameterSerializer(serializers.HyperlinkedModelSerializer
     param_id = serializers.ReadOnlyField(source='plugin_param.id')
     param_name = serializers.ReadOnlyField(source='plugin_param.name')
     type = serializers.ReadOnlyField(source='plugin_param.type')
-    plugin_piping = serializers.HyperlinkedRelatedField(view_name='pluginpiping-detail',
-                                                   read_only=True)
-    plugin_param = serializers.HyperlinkedRelatedField(view_name='pluginparameter-detail',
-                                                       read_only=True)
+    plugin_piping = HyperlinkedRelatedField(view_name='pluginpiping-detail',
+                                            read_only=True)
+    plugin_param = HyperlinkedRelatedField(view_name='pluginparameter-detail',
+                                           read_only=True)
 
     class Meta:
         model = DefaultPipingIntParameter
@@ -348,7 +730,9 @@ class DefaultPipingIntParameterSerializer(serializers.HyperlinkedModelSerializer
                   'plugin_name', 'plugin_version', 'plugin_id', 'plugin_param')
 
 
-class DefaultPipingFloatParameterSerializer(serializers.HyperlinkedModelSerializer):
+class DefaultPipingFloatParameterSerializer(SparseFieldsetSerializerMixin,
+                                            LinkTemplateSerializerMixin,
+                                            serializers.HyperlinkedModelSerializer):
     previous_plugin_piping_id = serializers.ReadOnlyField(
         source='plugin_piping.previous_id')
     plugin_piping_id = serializers.ReadOnlyField(source='plugin_piping.id')
@@ -358,10 +742,10 @@ class DefaultPipingFloatParameterSerializer(serializers.HyperlinkedModelSerializ
     param_id = serializers.ReadOnlyField(source='plugin_param.id')
     param_name = serializers.ReadOnlyField(source='plugin_param.name')
     type = serializers.ReadOnlyField(source='plugin_param.type')
-    plugin_piping = serializers.HyperlinkedRelatedField(view_name='pluginpiping-detail',
-                                                   read_only=True)
-    plugin_param = serializers.HyperlinkedRelatedField(view_name='pluginparameter-detail',
-                                                       read_only=True)
+    plugin_piping = HyperlinkedRelatedField(view_name='pluginpiping-detail',
+                                            read_only=True)
+    plugin_param = HyperlinkedRelatedField(view_name='pluginparameter-detail',
+                                           read_only=True)
 
     class Meta:
         model = DefaultPipingFloatParameter
@@ -370,7 +754,9 @@ class DefaultPipingFloatParameterSerializer(serializers.HyperlinkedModelSerializ
                   'plugin_name', 'plugin_version', 'plugin_id', 'plugin_param')
 
 
-class DefaultPipingBoolParameterSerializer(serializers.HyperlinkedModelSerializer):
+class DefaultPipingBoolParameterSerializer(SparseFieldsetSerializerMixin,
+                                           LinkTemplateSerializerMixin,
+                                           serializers.HyperlinkedModelSerializer):
     previous_plugin_piping_id = serializers.ReadOnlyField(
         source='plugin_piping.previous_id')
     plugin_piping_id = serializers.ReadOnlyField(source='plugin_piping.id')
@@ -380,10 +766,10 @@ class DefaultPipingBoolParameterSerializer(serializers.HyperlinkedModelSerialize
     param_id = serializers.ReadOnlyField(source='plugin_param.id')
     param_name = serializers.ReadOnlyField(source='plugin_param.name')
     type = serializers.ReadOnlyField(source='plugin_param.type')
-    plugin_piping = serializers.HyperlinkedRelatedField(view_name='pluginpiping-detail',
-                                                   read_only=True)
-    plugin_param = serializers.HyperlinkedRelatedField(view_name='pluginparameter-detail',
-                                                       read_only=True)
+    plugin_piping = HyperlinkedRelatedField(view_name='pluginpiping-detail',
+                                            read_only=True)
+    plugin_param = HyperlinkedRelatedField(view_name='pluginparameter-detail',
+                                           read_only=True)
 
     class Meta:
         model = DefaultPipingBoolParameter
@@ -392,22 +778,21 @@ class DefaultPipingBoolParameterSerializer(serializers.HyperlinkedModelSerialize
                   'plugin_name', 'plugin_version', 'plugin_id', 'plugin_param')
 
 
-class GenericDefaultPipingParameterSerializer(serializers.HyperlinkedModelSerializer):
-    previous_plugin_piping_id = serializers.ReadOnlyField(
-        source='plugin_piping.previous_id')
-    plugin_piping_id = serializers.ReadOnlyField(source='plugin_piping.id')
-    plugin_id = serializers.ReadOnlyField(source='plugin_piping.plugin_id')
-    plugin_name = serializers.ReadOnlyField(source='plugin_param.plugin.meta.name')
-    plugin_version = serializers.ReadOnlyField(source='plugin_param.plugin.version')
-    param_id = serializers.ReadOnlyField(source='plugin_param.id')
-    param_name = serializers.ReadOnlyField(source='plugin_param.name')
-    type = serializers.ReadOnlyField(source='plugin_param.type')
+class GenericDefaultPipingParameterSerializer(SparseFieldsetSerializerMixin,
+                                              LinkTemplateSerializerMixin,
+                                              serializers.HyperlinkedModelSerializer):
+    previous_plugin_piping_id = serializers.ReadOnlyField()
+    plugin_piping_id = serializers.ReadOnlyField()
+    plugin_id = serializers.ReadOnlyField()
+    plugin_name = serializers.ReadOnlyField()
+    plugin_version = serializers.ReadOnlyField()
+    param_id = serializers.ReadOnlyField()
+    param_name = serializers.ReadOnlyField()
+    type = serializers.ReadOnlyField()
     value = serializers.SerializerMethodField()
     url = ItemLinkField('_get_url')
-    plugin_piping = serializers.HyperlinkedRelatedField(view_name='pluginpiping-detail',
-                                                   read_only=True)
-    plugin_param = serializers.HyperlinkedRelatedField(view_name='pluginparameter-detail',
-                                                       read_only=True)
+    plugin_piping = ItemLinkField('_get_plugin_piping_url')
+    plugin_param = ItemLinkField('_get_plugin_param_url')
 
     class Meta:
         model = DefaultPipingStrParameter
@@ -423,17 +808,123 @@ class GenericDefaultPipingParameterSerializer(serializers.HyperlinkedModelSerial
         request = self.context['request']
         # here default piping parameter detail view names are assumed to
         # follow a convention
-        view_name = 'defaultpiping' + TYPES[obj.plugin_param.type] + 'parameter-detail'
-        return reverse(view_name, request=request, kwargs={"pk": obj.id})
+        view_name = 'defaultpiping' + TYPES[obj['type']] + 'parameter-detail'
+        return reverse_link(view_name, 'pk', obj['id'], request)
+
+    def _get_plugin_piping_url(self, obj):
+        """
+        Custom method to get the url of the serialized object's plugin piping.
+        """
+        request = self.context['request']
+        return reverse_link('pluginpiping-detail', 'pk', obj['plugin_piping_id'], request)
+
+    def _get_plugin_param_url(self, obj):
+        """
+        Custom method to get the url of the serialized object's plugin parameter.
+        """
+        request = self.context['request']
+        return reverse_link('pluginparameter-detail', 'pk', obj['param_id'], request)
 
     def get_value(self, obj):
         """
         Overriden to get the default parameter value regardless of its type.
         """
-        return obj.value
+        return obj[obj['type'] + '_value']
 
 
 DEFAULT_PIPING_PARAMETER_SERIALIZERS = {'string': DefaultPipingStrParameterSerializer,
                                         'integer': DefaultPipingIntParameterSerializer,
                                         'float': DefaultPipingFloatParameterSerializer,
                                         'boolean': DefaultPipingBoolParameterSerializer}
+
+
+class PipelineDefaultParameterBatchSerializer(serializers.Serializer):
+    defaults = serializers.JSONField(write_only=True)
+
+    def validate_defaults(self, defaults):
+        """
+        Overriden to validate in a single pass a list of new default values for the
+        pipeline's parameters. Each entry is a dictionary with the new 'value' and either
+        the 'id' (plus the 'type' if the id is ambiguous) of the default parameter or the
+        'plugin_piping_id' and 'param_name' of the default parameter. The validated list
+        contains (type, id, value) tuples.
+        """
+        if isinstance(defaults, str):
+            try:
+                defaults = json.loads(defaults)
+            except json.decoder.JSONDecodeError:
+                raise serializers.ValidationError([f'Invalid JSON string {defaults}.'])
+        if not isinstance(defaults, list) or len(defaults) == 0:
+            raise serializers.ValidationError([f'Invalid list of defaults {defaults}.'])
+        by_id = {}
+        by_name = {}
+        for d in self.instance.get_default_parameters():
+            by_id.setdefault(d['id'], []).append(d)
+            by_name[(d['plugin_piping_id'], d['param_name'])] = d
+        errors = []
+        validated = {}
+        for entry in defaults:
+            try:
+                value = entry['value']
+                if 'id' in entry:
+                    matches = by_id.get(entry['id'], [])
+                    if 'type' in entry:
+                        matches = [d for d in matches if d['type'] == entry['type']]
+                    if len(matches) > 1:
+                        raise ValueError(f"Ambiguous default parameter id {entry['id']}, "
+                                         f"a 'type' is required.")
+                    param = matches[0] if matches else None
+                else:
+                    key = (entry['plugin_piping_id'], entry['param_name'])
+                    param = by_name.get(key)
+            except KeyError as e:
+                errors.append(f"Invalid entry {entry}, missing property {e}. Each "
+                              f"entry must have a 'value' and either an 'id' or a "
+                              f"'plugin_piping_id' and 'param_name'.")
+                continue
+            except (ValueError, TypeError) as e:
+                errors.append(f'Invalid entry {entry}. {str(e)}')
+                continue
+            if param is None:
+                errors.append(f'Could not find any default parameter for {entry} in '
+                              f'this pipeline.')
+                continue
+            param_type = param['type']
+            param_serializer = DEFAULT_PIPING_PARAMETER_SERIALIZERS[param_type]()
+            value_field = param_serializer.fields['value']
+            try:
+                value = value_field.run_validation(value)
+            except serializers.ValidationError:
+                errors.append(f"Invalid value {value} for parameter "
+                              f"{param['param_name']} of type {param_type} in plugin "
+                              f"piping {param['plugin_piping_id']}.")
+                continue
+            key = (param_type, param['id'])
+            if key in validated:
+                errors.append(f'Duplicated entry {entry}.')
+                continue
+            validated[key] = value
+        if errors:
+            raise serializers.ValidationError(errors)
+        return [(param_type, id, value) for ((param_type, id), value)
+                in validated.items()]
+
+    def update(self, instance, validated_data):
+        """
+        Overriden to apply all the new default values with one bulk update per parameter
+        type within a single transaction.
+        """
+        new_defaults = {}
+        for (param_type, id, value) in validated_data['defaults']:
+            default_model_class = DEFAULT_PIPING_PARAMETER_MODELS[param_type]
+            new_defaults.setdefault(param_type, []).append(
+                default_model_class(id=id, value=value))
+        with transaction.atomic():
+            for (param_type, objs) in new_defaults.items():
+                DEFAULT_PIPING_PARAMETER_MODELS[param_type].objects.bulk_update(objs,
+                                                                                ['value'])
+            instance.update_fingerprint()
+            if not instance.locked:
+                # bulk updates don't send post_save signals
+                PipelineSerializer.save_representation(instance)
+        return instance
@@ -1,10 +1,14 @@
 """
-Pipeline manager module that provides functionality to add, modify and delete pipelines.
+Pipeline manager module that provides functionality to add, modify, delete, export and
+import pipelines and to precompute the representation of the unlocked pipelines.
 """
 
 import os
 import sys
+import json
+import itertools
 from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
 
 if __name__ == '__main__':
     # django needs to be loaded when this script is run standalone from the command line
@@ -14,10 +18,41 @@ if __name__ == '__main__':
     django.setup()
 
 from django.contrib.auth.models import User
-from pipelines.models import Pipeline
+from django.db import transaction
+from pipelines.models import Pipeline, REPRESENTATION_VERSION
 from pipelines.serializers import PipelineSerializer
 
 
+def parse_pipeline_record(line):
+    """
+    Parse a line of an NDJSON pipelines file and validate the structure of the pipeline
+    (required properties and a connected plugin tree) without accessing the DB so that it
+    can run in a separate process. Return a tuple with the pipeline dictionary and an
+    error message that is None when the pipeline is valid.
+    """
+    try:
+        record = json.loads(line)
+        name = record['name']
+        tree_list = record['plugin_tree']
+        if not isinstance(name, str) or not name:
+            raise ValueError(f'Invalid pipeline name {name}.')
+        if not isinstance(tree_list, list) or not tree_list:
+            raise ValueError(f'Invalid plugin tree {tree_list}.')
+        nodes = []
+        for d in tree_list:
+            if 'plugin_id' not in d:
+                (d['plugin_name'], d['plugin_version'])
+            nodes.append({'plugin_id': d.get('plugin_id'), 'title': d.get('title'),
+                          'plugin_parameter_defaults': [],
+                          'previous_index': d['previous_index']})
+        PipelineSerializer.validate_tree(PipelineSerializer.get_tree(nodes))
+    except KeyError as e:
+        return None, f'Missing property {e}.'
+    except Exception as e:
+        return None, str(e)
+    return record, None
+
+
 class PipelineManager(object):
 
     def __init__(self):
@@ -54,6 +89,40 @@ class PipelineManager(object):
         parser_remove = subparsers.add_parser('remove', help='Remove an existing pipeline')
         parser_remove.add_argument('id', type=int, help="Plugin's id")
 
+        # create the parser for the "export" command
+        parser_export = subparsers.add_parser(
+            'export', help='Export pipelines as NDJSON (a JSON document per line)')
+        parser_export.add_argument('--file', help="Output file path (defaults to stdout)")
+        parser_export.add_argument('--owner',
+                                   help="Only export the pipelines of this username")
+        parser_export.add_argument('--name', help="Only export the pipelines whose name "
+                                                  "contains this string")
+        parser_export.add_argument('--unlocked', action='store_true',
+                                   help="Only export unlocked pipelines")
+
+        # create the parser for the "import" command
+        parser_import = subparsers.add_parser(
+            'import', help='Import pipelines from an NDJSON file')
+        parser_import.add_argument('file', help="Input file path ('-' for stdin)")
+        parser_import.add_argument('--owner', help="Owner username of all the imported "
+                                                   "pipelines (defaults to each "
+                                                   "pipeline's owner_username)")
+        parser_import.add_argument('--chunksize', type=int, default=100,
+                                   help="Number of pipelines committed per transaction")
+        parser_import.add_argument('--workers', type=int, default=1,
+                                   help="Number of processes used to parse and check "
+                                        "the structure of the pipelines (the validation "
+                                        "against the DB is not parallelized)")
+        parser_import.add_argument('--checkpoint',
+                                   help="File that keeps the number of lines already "
+                                        "processed so that an interrupted import can be "
+                                        "resumed")
+
+        # create the parser for the "precompute" command
+        subparsers.add_parser(
+            'precompute', help='Precompute the representation of the unlocked pipelines '
+                               'without an up-to-date one')
+
         self.parser = parser
 
     def add_pipeline(self, args):
@@ -101,6 +170,137 @@ class PipelineManager(object):
         pipeline = self.get_pipeline(args.id)
         pipeline.delete()
 
+    def export_pipelines(self, args):
+        """
+        Export existing pipelines to a NDJSON file. Plugins are referenced by name and
+        version so that the pipelines can be imported into another store.
+        """
+        queryset = Pipeline.objects.select_related('owner').order_by('id')
+        if args.owner:
+            queryset = queryset.filter(owner__username=args.owner)
+        if args.name:
+            queryset = queryset.filter(name__icontains=args.name)
+        if args.unlocked:
+            queryset = queryset.filter(locked=False)
+        f = open(args.file, 'w') if args.file else sys.stdout
+        try:
+            for pipeline in queryset.iterator():
+                f.write(json.dumps(self.get_pipeline_record(pipeline)) + '\n')
+        finally:
+            if args.file:
+                f.close()
+
+    def import_pipelines(self, args):
+        """
+        Import pipelines from a NDJSON file. The structure of the pipelines is checked
+        in parallel (the validation against the DB happens in the main process), their
+        plugins and owners are fetched from the DB in a batch per chunk and each chunk is
+        committed in its own transaction. Invalid pipelines are reported and skipped.
+        """
+        start = self.read_checkpoint(args.checkpoint)
+        f = open(args.file) if args.file != '-' else sys.stdin
+        executor = None
+        if args.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=args.workers)
+        num_imported = 0
+        num_errors = 0
+        try:
+            lines = itertools.islice(f, start, None)
+            while True:
+                chunk = list(itertools.islice(lines, args.chunksize))
+                if not chunk:
+                    break
+                if executor:
+                    results = list(executor.map(parse_pipeline_record, chunk))
+                else:
+                    results = [parse_pipeline_record(line) for line in chunk]
+                records = {}
+                for (ix, (record, error)) in enumerate(results):
+                    line_number = start + ix + 1
+                    if error is not None:
+                        if chunk[ix].strip():  # blank lines are silently skipped
+                            self.report_import_error(line_number, error)
+                            num_errors += 1
+                    else:
+                        records[line_number] = record
+                errors = self.import_pipeline_chunk(records, args.owner)
+                for (line_number, error) in errors:
+                    self.report_import_error(line_number, error)
+                num_imported += len(records) - len(errors)
+                num_errors += len(errors)
+                start += len(chunk)
+                self.write_checkpoint(args.checkpoint, start)
+                print(f'{start} lines processed, {num_imported} pipelines imported, '
+                      f'{num_errors} errors', file=sys.stderr)
+        finally:
+            if executor:
+                executor.shutdown()
+            if args.file != '-':
+                f.close()
+
+    @staticmethod
+    def import_pipeline_chunk(records, owner_username=None):
+        """
+        Create the pipelines in the records dictionary (keyed by line number) within a
+        single transaction. The plugins of all the pipelines are fetched in a batch and
+        passed to the serializer. Return a list of (line number, error message) tuples
+        for the pipelines that could not be created.
+        """
+        usernames = {owner_username or r.get('owner_username') for r in records.values()}
+        owners = {u.username: u for u in User.objects.filter(username__in=usernames)}
+        nodes = []
+        for record in records.values():
+            for d in record['plugin_tree']:
+                try:
+                    if 'plugin_id' in d:
+                        nodes.append({'plugin_id': int(d['plugin_id'])})
+                    else:
+                        nodes.append({'plugin_name': d['plugin_name'],
+                                      'plugin_version': d['plugin_version']})
+                except (TypeError, ValueError):
+                    pass  # let the serializer report the invalid plugin id
+        tree_plugins = PipelineSerializer.get_tree_plugins(nodes)
+        errors = []
+        with transaction.atomic():
+            for (line_number, record) in records.items():
+                username = owner_username or record.get('owner_username')
+                owner = owners.get(username)
+                if owner is None:
+                    errors.append((line_number,
+                                   f"Couldn't find user '{username}' in the system"))
+                    continue
+                data = {'name': record['name'],
+                        'plugin_tree': json.dumps(record['plugin_tree']),
+                        'locked': record.get('locked', True)}
+                for key in ('authors', 'category', 'description'):
+                    if record.get(key):
+                        data[key] = record[key]
+                pipeline_serializer = PipelineSerializer(
+                    data=data, context={'tree_plugins': tree_plugins})
+                if not pipeline_serializer.is_valid():
+                    errors.append((line_number, str(pipeline_serializer.errors)))
+                    continue
+                try:
+                    with transaction.atomic():
+                        pipeline_serializer.save(owner=owner)
+                except Exception as e:
+                    errors.append((line_number, str(e)))
+        return errors
+
+    def precompute_representations(self, args):
+        """
+        Precompute the representation of the unlocked pipelines that don't have one
+        computed with the current representation version (for instance after upgrading
+        the store).
+        """
+        queryset = Pipeline.objects.filter(locked=False).exclude(
+            representation__version=REPRESENTATION_VERSION).order_by('id')
+        num_computed = 0
+        for pipeline in queryset.iterator():
+            PipelineSerializer.save_representation(pipeline)
+            num_computed += 1
+        print(f'{num_computed} pipeline representations computed', file=sys.stderr)
+
     def run(self, args=None):
         """
         Parse the arguments passed to the manager and perform the appropriate action.
@@ -112,6 +312,12 @@ class PipelineManager(object):
             self.modify_pipeline(options)
         elif options.subparser_name == 'remove':
             self.remove_pipeline(options)
+        elif options.subparser_name == 'export':
+            self.export_pipelines(options)
+        elif options.subparser_name == 'import':
+            self.import_pipelines(options)
+        elif options.subparser_name == 'precompute':
+            self.precompute_representations(options)
 
     @staticmethod
     def get_pipeline(id):
@@ -124,6 +330,53 @@ class PipelineManager(object):
             raise NameError("Couldn't find pipeline with id '%s' in the system" % id)
         return pipeline
 
+    @staticmethod
+    def get_pipeline_record(pipeline):
+        """
+        Get a dictionary representing a pipeline that can be serialized to a line of a
+        NDJSON file.
+        """
+        plugin_tree = pipeline.get_plugin_tree()
+        for d in plugin_tree:
+            del d['plugin_id']
+            d['plugin_parameter_defaults'] = [default for default in
+                                              d['plugin_parameter_defaults']
+                                              if default['default'] is not None]
+        return {'name': pipeline.name,
+                'authors': pipeline.authors,
+                'category': pipeline.category,
+                'description': pipeline.description,
+                'locked': pipeline.locked,
+                'owner_username': pipeline.owner.username,
+                'plugin_tree': plugin_tree}
+
+    @staticmethod
+    def read_checkpoint(checkpoint):
+        """
+        Get the number of lines already processed from a checkpoint file.
+        """
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as f:
+            return int(f.read().strip() or 0)
+
+    @staticmethod
+    def write_checkpoint(checkpoint, num_lines):
+        """
+        Atomically save the number of lines already processed to a checkpoint file.
+        """
+        if checkpoint:
+            tmp = checkpoint + '.tmp'
+            with open(tmp, 'w') as f:
+                f.write(str(num_lines))
+            os.replace(tmp, checkpoint)
+
+    @staticmethod
+    def report_import_error(line_number, error):
+        """
+        Report a pipeline that could not be imported.
+        """
+        print(f'Line {line_number}: {error}', file=sys.stderr)
 
 
 # ENTRYPOINT
@@ -0,0 +1,85 @@
+"""
+Signal receivers that keep the fingerprint and the resource envelope of pipelines and
+the precomputed representation of unlocked pipelines up to date and discard the cached
+execution plans whenever the underlying objects change.
+"""
+
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.utils import timezone
+
+from plugins.models import Plugin
+
+from .models import Pipeline, PipelineRepresentation, DEFAULT_PIPING_PARAMETER_MODELS
+from .serializers import PipelineSerializer
+
+
+def update_default_parameter_pipeline(sender, instance, created, **kwargs):
+    """
+    Recompute the fingerprint of the pipeline when an existing default parameter value
+    is modified and then the representation of the pipeline if it's unlocked, so that
+    the representation includes the new fingerprint.
+    """
+    if not created:
+        pipelines = Pipeline.objects.filter(plugin_pipings=instance.plugin_piping_id)
+        for pipeline in pipelines:
+            pipeline.update_fingerprint()
+            if not pipeline.locked:
+                PipelineSerializer.save_representation(pipeline)
+
+
+def discard_plugin_pipeline_representations(sender, instance, **kwargs):
+    """
+    Discard the representation of all the pipelines that use a plugin that is about to
+    be deleted (the deletion cascades to the pipelines' plugin pipings). The ids of the
+    unlocked pipelines are kept so that their representation is recomputed after the
+    deletion.
+    """
+    queryset = PipelineRepresentation.objects.filter(
+        pipeline__plugin_pipings__plugin=instance)
+    instance._unlocked_pipeline_ids = set(queryset.values_list('pipeline_id',
+                                                               flat=True))
+    queryset.delete()
+
+
+def update_plugin_pipeline_representations(sender, instance, **kwargs):
+    """
+    Recompute the representation of the unlocked pipelines that used a deleted plugin.
+    """
+    pipeline_ids = getattr(instance, '_unlocked_pipeline_ids', ())
+    for pipeline in Pipeline.objects.filter(pk__in=pipeline_ids, locked=False):
+        PipelineSerializer.save_representation(pipeline)
+
+
+def touch_plugin_pipelines(sender, instance, **kwargs):
+    """
+    Update the modification date of all the pipelines that use a plugin that is about
+    to be deleted so that their cached execution plans are not used anymore. The ids of
+    the pipelines are kept so that their resources are recomputed after the deletion.
+    """
+    queryset = Pipeline.objects.filter(plugin_pipings__plugin=instance)
+    instance._pipeline_ids = set(queryset.values_list('id', flat=True))
+    queryset.update(modification_date=timezone.now())
+
+
+def update_plugin_pipeline_resources(sender, instance, **kwargs):
+    """
+    Recompute the resource envelope of the pipelines that used a deleted plugin.
+    """
+    pipeline_ids = getattr(instance, '_pipeline_ids', ())
+    for pipeline in Pipeline.objects.filter(pk__in=pipeline_ids):
+        pipeline.update_resources()
+
+
+for default_model_class in DEFAULT_PIPING_PARAMETER_MODELS.values():
+    model_name = default_model_class.__name__
+    post_save.connect(update_default_parameter_pipeline, sender=default_model_class,
+                      dispatch_uid=f'update_{model_name}_pipeline')
+
+pre_delete.connect(discard_plugin_pipeline_representations, sender=Plugin,
+                   dispatch_uid='discard_plugin_pipeline_representations')
+post_delete.connect(update_plugin_pipeline_representations, sender=Plugin,
+                    dispatch_uid='update_plugin_pipeline_representations')
+pre_delete.connect(touch_plugin_pipelines, sender=Plugin,
+                   dispatch_uid='touch_plugin_pipelines')
+post_delete.connect(update_plugin_pipeline_resources, sender=Plugin,
+                    dispatch_uid='update_plugin_pipeline_resources')
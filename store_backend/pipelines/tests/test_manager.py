@@ -1,12 +1,18 @@
 
+import os
+import json
 import logging
+import tempfile
 from unittest import mock
 
+from django.db import connection
 from django.contrib.auth.models import User
 from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
 
 from plugins.models import PluginMeta, Plugin, PluginParameter, DefaultIntParameter
-from pipelines.models import Pipeline, PluginPiping
+from pipelines.models import (Pipeline, PipelineRepresentation, PluginPiping,
+                              REPRESENTATION_VERSION)
 from pipelines.services import manager
 
 
@@ -84,9 +90,144 @@ class PipelineManagerTests(TestCase):
         self.assertEqual(Pipeline.objects.count(), 0)
         self.assertEqual(PluginPiping.objects.count(), 0)
 
+    def test_mananger_can_precompute_representations(self):
+        """
+        Test whether the manager can precompute the representation of the unlocked
+        pipelines without an up-to-date one.
+        """
+        Pipeline.objects.filter(name=self.pipeline_name).update(locked=False)
+        with mock.patch('sys.stderr'):
+            self.pipeline_manager.run(['precompute'])
+        representation = PipelineRepresentation.objects.get()
+        self.assertEqual(representation.version, REPRESENTATION_VERSION)
+        self.assertEqual(len(representation.plugin_pipings), 2)
+
+        # outdated representations are recomputed
+        PipelineRepresentation.objects.update(version=0, etag='outdated')
+        with mock.patch('sys.stderr'):
+            self.pipeline_manager.run(['precompute'])
+        representation = PipelineRepresentation.objects.get()
+        self.assertEqual(representation.version, REPRESENTATION_VERSION)
+        self.assertNotEqual(representation.etag, 'outdated')
+
     def test_mananger_can_get_pipeline(self):
         """
         Test whether the manager can return a pipeline object.
         """
         pipeline = Pipeline.objects.get(name=self.pipeline_name)
         self.assertEqual(pipeline, self.pipeline_manager.get_pipeline(pipeline.id))
+
+    def test_mananger_can_export_pipelines(self):
+        """
+        Test whether the manager can export pipelines to a NDJSON file.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'pipelines.ndjson')
+            self.pipeline_manager.run(['export', '--file', file_path])
+            with open(file_path) as f:
+                lines = f.readlines()
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual(record['name'], self.pipeline_name)
+        self.assertEqual(record['owner_username'], self.username)
+        self.assertEqual(record['plugin_tree'][0]['plugin_name'], self.plugin_ds_name)
+        self.assertEqual(record['plugin_tree'][1]['previous_index'], 0)
+        self.assertNotIn('plugin_id', record['plugin_tree'][0])
+
+    def test_mananger_can_import_pipelines(self):
+        """
+        Test whether the manager can import pipelines from a NDJSON file, skipping the
+        invalid ones and saving a checkpoint.
+        """
+        tree = [{'plugin_name': self.plugin_ds_name, 'plugin_version': '0.1',
+                 'previous_index': None},
+                {'plugin_name': self.plugin_ds_name, 'plugin_version': '0.1',
+                 'previous_index': 0,
+                 'plugin_parameter_defaults': [{'name': 'dummyInt', 'default': 3}]}]
+        records = [{'name': 'Pipeline2', 'owner_username': self.username,
+                    'plugin_tree': tree},
+                   {'name': 'Pipeline3', 'owner_username': self.username,
+                    'plugin_tree': [{'plugin_name': 'unknown', 'plugin_version': '0.1',
+                                     'previous_index': None}]},
+                   {'name': 'Pipeline4', 'owner_username': self.username,
+                    'plugin_tree': [{'plugin_name': self.plugin_ds_name,
+                                     'plugin_version': '0.1', 'previous_index': 3}]},
+                   {'name': 'Pipeline5', 'owner_username': self.username,
+                    'locked': False, 'plugin_tree': tree}]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'pipelines.ndjson')
+            checkpoint = os.path.join(tmp_dir, 'checkpoint')
+            with open(file_path, 'w') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+            with mock.patch('sys.stderr'):
+                self.pipeline_manager.run(['import', file_path, '--chunksize', '3',
+                                           '--checkpoint', checkpoint])
+            with open(checkpoint) as f:
+                self.assertEqual(f.read(), '4')
+        self.assertEqual(Pipeline.objects.count(), 3)
+        pipeline = Pipeline.objects.get(name='Pipeline5')
+        self.assertFalse(pipeline.locked)
+        self.assertEqual(pipeline.plugin_pipings.count(), 2)
+
+    def test_mananger_import_pipeline_chunk_fetches_plugins_once(self):
+        """
+        Test whether the manager fetches the plugins of all the pipelines in a chunk
+        in a single batch that is used by the serializer to validate the pipelines.
+        """
+        plugin = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        tree = [{'plugin_name': self.plugin_ds_name, 'plugin_version': '0.1',
+                 'previous_index': None},
+                {'plugin_id': plugin.id, 'previous_index': 0}]
+        records = {1: {'name': 'Pipeline2', 'plugin_tree': tree},
+                   2: {'name': 'Pipeline3', 'plugin_tree': tree}}
+        get_tree_plugins = manager.PipelineSerializer.get_tree_plugins
+        with mock.patch.object(manager.PipelineSerializer, 'get_tree_plugins',
+                               wraps=get_tree_plugins) as get_tree_plugins_mock:
+            errors = self.pipeline_manager.import_pipeline_chunk(records, self.username)
+        self.assertEqual(errors, [])
+        get_tree_plugins_mock.assert_called_once()
+        self.assertEqual(PluginPiping.objects.filter(
+            pipeline__name__in=['Pipeline2', 'Pipeline3']).count(), 4)
+
+    def test_mananger_import_pipeline_chunk_plugin_queries_do_not_grow(self):
+        """
+        Test whether the number of DB queries on the plugins table when importing a
+        chunk of pipelines doesn't depend on the number of pipelines in the chunk.
+        """
+        tree = [{'plugin_name': self.plugin_ds_name, 'plugin_version': '0.1',
+                 'previous_index': None}]
+        num_plugin_queries = []
+        for num_pipelines in (1, 4):
+            records = {ix: {'name': f'Pipeline{num_pipelines}_{ix}', 'plugin_tree': tree}
+                       for ix in range(num_pipelines)}
+            with CaptureQueriesContext(connection) as ctx:
+                errors = self.pipeline_manager.import_pipeline_chunk(records,
+                                                                     self.username)
+            self.assertEqual(errors, [])
+            num_plugin_queries.append(len([q for q in ctx.captured_queries
+                                           if 'FROM "plugins_plugin"' in q['sql']]))
+        self.assertEqual(num_plugin_queries[0], num_plugin_queries[1])
+
+    def test_mananger_import_pipelines_resumes_from_checkpoint(self):
+        """
+        Test whether the manager skips the lines already processed according to the
+        checkpoint file when importing pipelines.
+        """
+        tree = [{'plugin_name': self.plugin_ds_name, 'plugin_version': '0.1',
+                 'previous_index': None}]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'pipelines.ndjson')
+            checkpoint = os.path.join(tmp_dir, 'checkpoint')
+            with open(file_path, 'w') as f:
+                for name in ('Pipeline2', 'Pipeline3'):
+                    record = {'name': name, 'plugin_tree': tree}
+                    f.write(json.dumps(record) + '\n')
+            with open(checkpoint, 'w') as f:
+                f.write('1')
+            with mock.patch('sys.stderr'):
+                self.pipeline_manager.run(['import', file_path, '--owner', self.username,
+                                           '--checkpoint', checkpoint,
+                                           '--workers', '2'])
+        self.assertFalse(Pipeline.objects.filter(name='Pipeline2').exists())
+        self.assertTrue(Pipeline.objects.filter(name='Pipeline3').exists())
@@ -75,10 +75,177 @@ class PipelineModelTests(ModelTests):
         plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
         # add a new plugin piping to pipeline but do not set a default value for
         # the plugin parameter
+        (pip, tf) = PluginPiping.objects.get_or_create(plugin=plugin_ds,
+                                                       pipeline=pipeline,
+                                                       previous=self.pips[1])
         PluginPiping.objects.get_or_create(plugin=plugin_ds, pipeline=pipeline,
-                                           previous=self.pips[1])
-        with self.assertRaises(ValueError):
+                                           previous=pip)
+        with self.assertNumQueries(2):
+            with self.assertRaises(ValueError) as cm:
+                pipeline.check_parameter_defaults()
+        self.assertEqual(str(cm.exception).count('prefix'), 2)
+
+    def test_check_parameter_defaults_with_piping_without_default(self):
+        """
+        Test whether custom check_parameter_defaults method raises an exception if
+        any of the plugin parameters associated to a single piping of the pipeline
+        doesn't have a default value.
+        """
+        pipeline = Pipeline.objects.get(name=self.pipeline_name)
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        # add a new plugin piping to pipeline but do not set a default value for
+        # the plugin parameter
+        (pip, tf) = PluginPiping.objects.get_or_create(plugin=plugin_ds,
+                                                       pipeline=pipeline,
+                                                       previous=self.pips[1])
+        with self.assertRaises(ValueError) as cm:
             pipeline.check_parameter_defaults()
+        self.assertIn(f'prefix (piping {pip.id})', str(cm.exception))
+        self.assertNotIn(f'(piping {self.pips[1].id})', str(cm.exception))
+
+    def test_check_parameter_defaults_single_query_if_all_defaults(self):
+        """
+        Test whether custom check_parameter_defaults method only makes one DB query
+        when all the plugin parameters in the pipeline have a default value.
+        """
+        pipeline = Pipeline.objects.get(name=self.pipeline_name)
+        with self.assertNumQueries(1):
+            pipeline.check_parameter_defaults()
+
+    def test_get_plugin_tree(self):
+        """
+        Test whether custom get_plugin_tree method returns the list of nodes of the
+        pipeline's tree of plugins with a fixed number of DB queries.
+        """
+        pipeline = Pipeline.objects.get(name=self.pipeline_name)
+        with self.assertNumQueries(5):
+            tree = pipeline.get_plugin_tree()
+        self.assertEqual(len(tree), 2)
+        self.assertIsNone(tree[0]['previous_index'])
+        self.assertEqual(tree[1]['previous_index'], 0)
+        self.assertEqual(tree[0]['plugin_name'], self.plugin_ds_name)
+        self.assertEqual(tree[0]['plugin_parameter_defaults'],
+                         [{'name': 'prefix', 'default': 'test0'}])
+        self.assertEqual(tree[1]['plugin_parameter_defaults'],
+                         [{'name': 'prefix', 'default': 'test1'}])
+
+    def test_get_default_parameters(self):
+        """
+        Test whether custom get_default_parameters method returns all the default
+        parameters of the pipeline regardless of their type in a single query.
+        """
+        pipeline = Pipeline.objects.get(name=self.pipeline_name)
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        (plg_param_ds, tf) = PluginParameter.objects.get_or_create(
+            plugin=plugin_ds, name='dummyInt', type='integer', optional=True)
+        DefaultIntParameter.objects.get_or_create(plugin_param=plg_param_ds, value=1)
+        PluginPiping.objects.get_or_create(plugin=plugin_ds, pipeline=pipeline,
+                                           previous=self.pips[1])
+        with self.assertNumQueries(1):
+            default_parameters = list(pipeline.get_default_parameters())
+        self.assertEqual(len(default_parameters), 4)
+        self.assertEqual([d['string_value'] for d in default_parameters[:2]],
+                         ['test0', 'test1'])
+        self.assertEqual(default_parameters[3]['type'], 'integer')
+        self.assertEqual(default_parameters[3]['integer_value'], 1)
+        self.assertIsNone(default_parameters[3]['string_value'])
+        self.assertEqual(default_parameters[3]['plugin_name'], self.plugin_ds_name)
+        with self.assertNumQueries(1):
+            self.assertEqual(pipeline.get_default_parameters()[1:3].count(), 2)
+
+    def test_fork(self):
+        """
+        Test whether custom fork method creates a new locked copy of the pipeline with
+        its tree of plugin pipings and their default parameter values.
+        """
+        pipeline = Pipeline.objects.get(name=self.pipeline_name)
+        pipeline.locked = False
+        pipeline.save()
+        user = User.objects.create_user(username='testuser', password='testuser-pass')
+        with self.assertNumQueries(10):  # including savepoint queries
+            new_pipeline = pipeline.fork(user, name='Pipeline2')
+        self.assertTrue(new_pipeline.locked)
+        self.assertEqual(new_pipeline.owner, user)
+        new_pips = list(new_pipeline.plugin_pipings.order_by('id'))
+        self.assertEqual(len(new_pips), 2)
+        self.assertNotIn(new_pips[0].id, [pip.id for pip in self.pips])
+        self.assertIsNone(new_pips[0].previous)
+        self.assertEqual(new_pips[1].previous, new_pips[0])
+        self.assertEqual(new_pips[0].string_param.get().value, 'test0')
+        self.assertEqual(new_pips[1].string_param.get().value, 'test1')
+        self.assertEqual(self.pips[0].string_param.count(), 1)
+
+    def test_compute_fingerprint(self):
+        """
+        Test whether custom compute_fingerprint method only depends on the plugins, the
+        defaults and the shape of the tree.
+        """
+        node = {'plugin_name': 'simpledsapp', 'plugin_version': '0.1', 'title': 'a',
+                'plugin_parameter_defaults': [{'name': 'prefix', 'default': 'x'}]}
+        tree_list = [dict(node, previous_index=None), dict(node, previous_index=0),
+                     dict(node, previous_index=0, plugin_version='0.2')]
+        fingerprint = Pipeline.compute_fingerprint(tree_list)
+        # same tree with different node order and titles
+        reordered = [dict(node, previous_index=2, plugin_version='0.2'),
+                     dict(node, previous_index=2, title='b'),
+                     dict(node, previous_index=None)]
+        self.assertEqual(Pipeline.compute_fingerprint(reordered), fingerprint)
+        # different shape
+        chain = [dict(node, previous_index=None), dict(node, previous_index=0),
+                 dict(node, previous_index=1, plugin_version='0.2')]
+        self.assertNotEqual(Pipeline.compute_fingerprint(chain), fingerprint)
+        # different default
+        tree_list[1] = dict(node, previous_index=0,
+                            plugin_parameter_defaults=[{'name': 'prefix', 'default': 'y'}])
+        self.assertNotEqual(Pipeline.compute_fingerprint(tree_list), fingerprint)
+
+    def test_update_fingerprint(self):
+        """
+        Test whether custom update_fingerprint method saves a new fingerprint when the
+        default parameter values change.
+        """
+        pipeline = Pipeline.objects.get(name=self.pipeline_name)
+        pipeline.update_fingerprint()
+        fingerprint = pipeline.fingerprint
+        default = self.pips[1].string_param.get()
+        default.value = 'changed'
+        default.save()
+        pipeline.update_fingerprint()
+        self.assertNotEqual(pipeline.fingerprint, fingerprint)
+        self.assertEqual(Pipeline.objects.get(pk=pipeline.pk).fingerprint,
+                         pipeline.fingerprint)
+
+    def test_compute_resources(self):
+        """
+        Test whether custom compute_resources method computes the peak demand over the
+        tree levels and the max single node demand of each resource.
+        """
+        pipings = [(1, None, 1000, 200, 0, 1),
+                   (2, 1, 2000, 100, 1, 1),
+                   (3, 1, 500, 300, None, 2),
+                   (4, 3, 3000, 100, 0, 1)]
+        resources = Pipeline.compute_resources(pipings)
+        self.assertEqual(resources['peak_cpu_limit'], 3000)
+        self.assertEqual(resources['peak_memory_limit'], 400)
+        self.assertEqual(resources['peak_gpu_limit'], 1)
+        self.assertEqual(resources['peak_number_of_workers'], 3)
+        self.assertEqual(resources['max_node_cpu_limit'], 3000)
+        self.assertEqual(resources['max_node_memory_limit'], 300)
+        self.assertEqual(resources['max_node_gpu_limit'], 1)
+        self.assertEqual(resources['max_node_number_of_workers'], 2)
+
+    def test_update_resources(self):
+        """
+        Test whether custom update_resources method saves the resource envelope of the
+        pipeline with a single query to get the pipings' plugins.
+        """
+        pipeline = Pipeline.objects.get(name=self.pipeline_name)
+        with self.assertNumQueries(2):
+            pipeline.update_resources()
+        pipeline = Pipeline.objects.get(pk=pipeline.pk)
+        self.assertEqual(pipeline.peak_cpu_limit, Plugin.defaults['min_cpu_limit'])
+        self.assertEqual(pipeline.peak_memory_limit, Plugin.defaults['min_memory_limit'])
+        self.assertEqual(pipeline.max_node_number_of_workers, 1)
 
     def test_get_accesible_pipelines(self):
         """
@@ -123,16 +290,30 @@ class PluginPipingModelTests(ModelTests):
         defaults = pip.integer_param.all()
         self.assertEqual(defaults[0].value, 2)
 
-    def test_check_parameter_defaults(self):
+    def test_swap_plugin(self):
         """
-        Test whether custom check_parameter_defaults method raises an exception if
-        any of the plugin parameters associated to the piping doesn't have a default value.
+        Test whether custom swap_plugin method replaces the piping's plugin keeping the
+        defaults of the common parameters, deleting the defaults of the removed
+        parameters and creating the defaults of the new parameters.
         """
-        pipeline = Pipeline.objects.get(name=self.pipeline_name)
         plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
-        # add a new plugin piping to pipeline but do not set a default value for
-        # the plugin parameter
-        (pip, tf) = PluginPiping.objects.get_or_create(plugin=plugin_ds, pipeline=pipeline,
-                                           previous=self.pips[1])
-        with self.assertRaises(ValueError):
-            pip.check_parameter_defaults()
+        (plg_param_ds, tf) = PluginParameter.objects.get_or_create(
+            plugin=plugin_ds, name='dummyInt', type='integer', optional=True)
+        DefaultIntParameter.objects.get_or_create(plugin_param=plg_param_ds, value=1)
+        pip = self.pips[1]
+        pip.save()  # create default for the new parameter
+        (plugin_ds2, tf) = Plugin.objects.get_or_create(
+            meta=plugin_ds.meta, version='0.2', dock_image='fnndsc/pl-simpledsapp:0.2')
+        (prefix_param, tf) = PluginParameter.objects.get_or_create(
+            plugin=plugin_ds2, name='prefix', type='string', optional=False)
+        (plg_param_ds2, tf) = PluginParameter.objects.get_or_create(
+            plugin=plugin_ds2, name='dummyFloat', type='float', optional=True)
+        pip.swap_plugin(plugin_ds2)
+        pip = PluginPiping.objects.get(pk=pip.pk)
+        self.assertEqual(pip.plugin, plugin_ds2)
+        self.assertEqual(pip.string_param.get().plugin_param, prefix_param)
+        self.assertEqual(pip.string_param.get().value, 'test1')
+        self.assertEqual(pip.integer_param.count(), 0)
+        self.assertEqual(pip.float_param.get().plugin_param, plg_param_ds2)
+        self.assertIsNone(pip.float_param.get().value)
+        self.assertEqual(self.pips[0].integer_param.count(), 0)
@@ -1,4 +1,5 @@
 
+import json
 import logging
 from unittest import mock
 
@@ -9,7 +10,7 @@ from rest_framework import serializers
 
 from plugins.models import PluginMeta, Plugin
 from plugins.models import PluginParameter, DefaultIntParameter, DefaultStrParameter
-from pipelines.models import Pipeline
+from pipelines.models import Pipeline, PipelineRepresentation
 from pipelines.serializers import PipelineSerializer
 
 
@@ -94,6 +95,73 @@ class PipelineSerializerTests(SerializerTests):
         self.assertIn(self.plugin_ds_name, pipeline_plg_names)
         self.assertIn("mri_analyze", pipeline_plg_names)
 
+    def test_create_sets_fingerprint(self):
+        """
+        Test whether overriden 'create' method sets the same fingerprint of the new
+        pipeline that is computed from the DB.
+        """
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        owner = User.objects.get(username=self.username)
+        plugin_tree = json.dumps([
+            {"plugin_id": plugin_ds.id, "previous_index": None},
+            {"plugin_id": plugin_ds.id, "previous_index": 0, "title": "second",
+             "plugin_parameter_defaults": [{"name": "dummyInt", "default": "5"}]}])
+        data = {'name': 'Pipeline2', 'plugin_tree': plugin_tree}
+        pipeline_serializer = PipelineSerializer(data=data)
+        pipeline_serializer.is_valid(raise_exception=True)
+        pipeline = pipeline_serializer.save(owner=owner)
+        fingerprint = pipeline.fingerprint
+        self.assertEqual(len(fingerprint), 64)
+        pipeline.update_fingerprint()
+        self.assertEqual(pipeline.fingerprint, fingerprint)
+
+    def test_create_unlocked_saves_representation_once(self):
+        """
+        Test whether overriden 'create' method computes the representation of a new
+        unlocked pipeline with default parameter values only once.
+        """
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        owner = User.objects.get(username=self.username)
+        defaults = [{"name": "dummyInt", "default": 5}]
+        tree = [{"plugin_id": plugin_ds.id, "previous_index": None,
+                 "plugin_parameter_defaults": defaults}]
+        tree.extend([{"plugin_id": plugin_ds.id, "previous_index": ix,
+                      "plugin_parameter_defaults": defaults} for ix in range(4)])
+        data = {'name': 'Pipeline2', 'plugin_tree': json.dumps(tree), 'locked': False}
+        pipeline_serializer = PipelineSerializer(data=data)
+        pipeline_serializer.is_valid(raise_exception=True)
+        with mock.patch.object(PipelineSerializer, 'save_representation',
+                               wraps=PipelineSerializer.save_representation) as save_mock:
+            pipeline = pipeline_serializer.save(owner=owner)
+        save_mock.assert_called_once_with(pipeline)
+        representation = PipelineRepresentation.objects.get(pipeline=pipeline)
+        defaults = representation.default_parameters.values_list('data', flat=True)
+        self.assertEqual([d['value'] for d in defaults], [5] * 5)
+
+    def test_create_on_duplicate(self):
+        """
+        Test whether overriden 'create' method rejects or returns an existing pipeline
+        with the same fingerprint when the on_duplicate mode is set.
+        """
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        owner = User.objects.get(username=self.username)
+        plugin_tree = json.dumps([{"plugin_id": plugin_ds.id, "previous_index": None}])
+        pipeline_serializer = PipelineSerializer(data={'name': 'Pipeline2',
+                                                       'plugin_tree': plugin_tree})
+        pipeline_serializer.is_valid(raise_exception=True)
+        pipeline = pipeline_serializer.save(owner=owner)
+        data = {'name': 'Pipeline3', 'plugin_tree': plugin_tree,
+                'on_duplicate': 'reject'}
+        pipeline_serializer = PipelineSerializer(data=data)
+        pipeline_serializer.is_valid(raise_exception=True)
+        with self.assertRaises(serializers.ValidationError):
+            pipeline_serializer.save(owner=owner)
+        data['on_duplicate'] = 'return'
+        pipeline_serializer = PipelineSerializer(data=data)
+        pipeline_serializer.is_valid(raise_exception=True)
+        self.assertEqual(pipeline_serializer.save(owner=owner), pipeline)
+        self.assertFalse(Pipeline.objects.filter(name='Pipeline3').exists())
+
     def test_update(self):
         """
         Test whether overriden 'update' method successfully updates an existing pipeline
@@ -105,6 +173,19 @@ class PipelineSerializerTests(SerializerTests):
         pipeline_serializer.update(pipeline, validated_data)
         self.assertEqual(pipeline.name, 'Pipeline2')
 
+    def test_update_saves_representation_if_pipeline_unlocked(self):
+        """
+        Test whether overriden 'update' method saves the precomputed representation of
+        the pipeline when the pipeline is unlocked.
+        """
+        pipeline = Pipeline.objects.get(name=self.pipeline_name)
+        pipeline_serializer = PipelineSerializer(pipeline)
+        pipeline_serializer.update(pipeline, {'locked': False})
+        representation = PipelineRepresentation.objects.get(pipeline=pipeline)
+        self.assertEqual(representation.detail['name'], self.pipeline_name)
+        self.assertEqual(representation.detail['url'],
+                         f'/api/v1/pipelines/{pipeline.id}/')
+
     def test_validate_validates_required_fields_on_create(self):
         """
         Test whether overriden validate method validates that 'plugin_tree' field
@@ -419,3 +500,26 @@ class PipelineSerializerTests(SerializerTests):
         pipeline_plg_names = [plugin.meta.name for plugin in pipeline.plugins.all()]
         self.assertEqual(len(pipeline_plg_names), 3)
         self.assertEqual(len([name for name in pipeline_plg_names if name == self.plugin_ds_name]), 2)
+
+    def test_save_representation(self):
+        """
+        Test whether custom save_representation method saves the precomputed
+        representation of a pipeline with host-relative urls.
+        """
+        pipeline = Pipeline.objects.get(name=self.pipeline_name)
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        tree = [{"plugin_id": plugin_ds.id,
+                 "title": "piping1",
+                 "plugin_parameter_defaults": [],
+                 "child_indices": []}]
+        PipelineSerializer._add_plugin_tree_to_pipeline(pipeline,
+                                                        {'root_index': 0, 'tree': tree})
+        PipelineSerializer.save_representation(pipeline)
+        representation = PipelineRepresentation.objects.get(pipeline=pipeline)
+        self.assertEqual(len(representation.etag), 64)
+        self.assertEqual(len(representation.plugin_pipings), 1)
+        self.assertEqual(representation.plugin_pipings[0]['title'], 'piping1')
+        defaults = list(representation.default_parameters.values_list('data', flat=True))
+        self.assertEqual(len(defaults), 1)
+        self.assertEqual(defaults[0]['value'], 111111)
+        self.assertTrue(defaults[0]['url'].startswith('/api/'))
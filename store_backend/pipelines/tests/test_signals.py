@@ -0,0 +1,81 @@
+
+import logging
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+
+from plugins.models import PluginMeta, Plugin
+from plugins.models import PluginParameter, DefaultIntParameter
+from pipelines.models import Pipeline, PipelineRepresentation, PluginPiping
+from pipelines.serializers import PipelineSerializer
+
+
+class SignalTests(TestCase):
+
+    def setUp(self):
+        # avoid cluttered console output (for instance logging all the http requests)
+        logging.disable(logging.WARNING)
+
+        self.plugin_ds_name = "simpledsapp"
+        self.username = 'foo'
+        self.password = 'foo-pass'
+
+        # create plugin
+        (meta, tf) = PluginMeta.objects.get_or_create(name=self.plugin_ds_name, type='ds')
+        (plugin_ds, tf) = Plugin.objects.get_or_create(meta=meta)
+
+        # add a parameter with a default
+        (plg_param_ds, tf) = PluginParameter.objects.get_or_create(
+            plugin=plugin_ds, name='dummyInt', type='integer', optional=True)
+        DefaultIntParameter.objects.get_or_create(plugin_param=plg_param_ds, value=1)
+
+        # create user
+        user = User.objects.create_user(username=self.username, password=self.password)
+
+        # create an unlocked pipeline with a plugin piping and its representation
+        (pipeline, tf) = Pipeline.objects.get_or_create(name='Pipeline1', owner=user,
+                                                        locked=False)
+        (self.pip, tf) = PluginPiping.objects.get_or_create(plugin=plugin_ds,
+                                                            pipeline=pipeline)
+        PipelineSerializer.save_representation(pipeline)
+
+    def tearDown(self):
+        # re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def test_modified_default_parameter_recomputes_pipeline_representation(self):
+        """
+        Test whether modifying a default parameter value recomputes the precomputed
+        representation of the corresponding pipeline.
+        """
+        default_param = self.pip.integer_param.get()
+        default_param.value = 2
+        default_param.save()
+        representation = PipelineRepresentation.objects.get()
+        default = representation.default_parameters.values_list('data', flat=True)[0]
+        self.assertEqual(default['value'], 2)
+
+    def test_deleted_plugin_recomputes_pipeline_representation(self):
+        """
+        Test whether deleting a plugin recomputes the precomputed representation of the
+        pipelines that used it.
+        """
+        etag = PipelineRepresentation.objects.get().etag
+        Plugin.objects.get(meta__name=self.plugin_ds_name).delete()
+        representation = PipelineRepresentation.objects.get()
+        self.assertNotEqual(representation.etag, etag)
+        self.assertEqual(representation.plugin_pipings, [])
+
+    def test_deleted_plugin_recomputes_pipeline_resources(self):
+        """
+        Test whether deleting a plugin recomputes the resource envelope of the
+        pipelines that used it, whether they are locked or not.
+        """
+        pipeline = Pipeline.objects.get(name='Pipeline1')
+        Pipeline.objects.filter(pk=pipeline.pk).update(locked=True)
+        pipeline.update_resources()
+        self.assertEqual(Pipeline.objects.get(pk=pipeline.pk).peak_cpu_limit, 1000)
+        Plugin.objects.get(meta__name=self.plugin_ds_name).delete()
+        pipeline = Pipeline.objects.get(pk=pipeline.pk)
+        self.assertEqual(pipeline.peak_cpu_limit, 0)
+        self.assertEqual(pipeline.max_node_cpu_limit, 0)
@@ -1,9 +1,11 @@
 
 import logging
 import json
+from unittest import mock
 
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 from rest_framework import status
@@ -12,7 +14,8 @@ from plugins.models import PluginMeta, Plugin
 from plugins.models import PluginParameter
 from plugins.models import DefaultStrParameter, DefaultBoolParameter
 from plugins.models import DefaultFloatParameter, DefaultIntParameter
-from pipelines.models import Pipeline, PluginPiping
+from pipelines.models import Pipeline, PipelineRepresentation, PluginPiping
+from pipelines.serializers import PipelineSerializer
 
 
 class ViewTests(TestCase):
@@ -108,6 +111,34 @@ class PipelineListViewTests(PipelineViewTests):
                                     content_type=self.content_type)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_pipeline_create_on_duplicate(self):
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        plugin_tree = json.dumps([{"plugin_id": plugin_ds.id, "previous_index": None}])
+        self.client.login(username=self.username, password=self.password)
+        post = json.dumps(
+            {"template": {"data": [{"name": "name", "value": "Pipeline2"},
+                                   {"name": "plugin_tree", "value": plugin_tree}]}})
+        response = self.client.post(self.create_read_url, data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        fingerprint = response.data['fingerprint']
+        post = json.dumps(
+            {"template": {"data": [{"name": "name", "value": "Pipeline3"},
+                                   {"name": "plugin_tree", "value": plugin_tree},
+                                   {"name": "on_duplicate", "value": "reject"}]}})
+        response = self.client.post(self.create_read_url, data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        post = post.replace('"reject"', '"return"')
+        response = self.client.post(self.create_read_url, data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Pipeline2')
+        list_url = reverse("pipeline-list-query-search") + '?fingerprint=' + fingerprint
+        response = self.client.get(list_url)
+        self.assertContains(response, 'Pipeline2')
+        self.assertEqual(response.data['count'], 1)
+
     def test_pipeline_list_success(self):
         self.client.login(username=self.username, password=self.password)
         response = self.client.get(self.create_read_url)
@@ -136,6 +167,62 @@ class PipelineListQuerySearchViewTests(PipelineViewTests):
         self.assertContains(response, "Pipeline1")
         self.assertContains(response, "Pipeline2")
 
+    def test_pipeline_list_query_search_by_resource_limit_success(self):
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        plugin_tree = json.dumps([{"plugin_id": plugin_ds.id, "previous_index": None},
+                                  {"plugin_id": plugin_ds.id, "previous_index": 0},
+                                  {"plugin_id": plugin_ds.id, "previous_index": 0}])
+        post = json.dumps(
+            {"template": {"data": [{"name": "name", "value": "Pipeline2"},
+                                   {"name": "plugin_tree", "value": plugin_tree}]}})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.post(reverse("pipeline-list"), data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.data['peak_cpu_limit'], 2000)
+        self.assertEqual(response.data['max_node_cpu_limit'], 1000)
+        Pipeline.objects.get(name='Pipeline1').update_resources()
+        list_url = reverse("pipeline-list-query-search") + '?max_cpu_limit=1500m'
+        response = self.client.get(list_url)
+        self.assertContains(response, "Pipeline1")
+        self.assertNotContains(response, "Pipeline2")
+        list_url = reverse("pipeline-list-query-search") + \
+                   '?max_cpu_limit=2&max_memory_limit=1Gi'
+        response = self.client.get(list_url)
+        self.assertContains(response, "Pipeline1")
+        self.assertContains(response, "Pipeline2")
+        list_url = reverse("pipeline-list-query-search") + '?max_cpu_limit=1'
+        response = self.client.get(list_url)
+        self.assertContains(response, "Pipeline1")
+        self.assertNotContains(response, "Pipeline2")
+
+    def test_pipeline_list_query_search_by_plugin_success(self):
+        owner = User.objects.get(username=self.username)
+        (pipeline, tf) = Pipeline.objects.get_or_create(name='Pipeline2', owner=owner,
+                                                        category='test')
+        (meta, tf) = PluginMeta.objects.get_or_create(name='mri_convert', type='ds')
+        (plugin_ds, tf) = Plugin.objects.get_or_create(meta=meta, version='1.2')
+        PluginPiping.objects.get_or_create(plugin=plugin_ds, pipeline=pipeline)
+        self.client.login(username=self.username, password=self.password)
+        list_url = reverse("pipeline-list-query-search") + '?plugin_name=' + \
+                   self.plugin_ds_name
+        response = self.client.get(list_url)
+        self.assertContains(response, "Pipeline1")
+        self.assertNotContains(response, "Pipeline2")
+        self.assertEqual(response.data['count'], 1)  # no duplicates
+        list_url = reverse("pipeline-list-query-search") + \
+                   '?plugin_name=mri_convert&plugin_version=1.2'
+        response = self.client.get(list_url)
+        self.assertContains(response, "Pipeline2")
+        self.assertNotContains(response, "Pipeline1")
+        list_url = reverse("pipeline-list-query-search") + \
+                   f'?plugin_name={self.plugin_ds_name}&plugin_version=1.2'
+        response = self.client.get(list_url)
+        self.assertEqual(response.data['count'], 0)
+        list_url = reverse("pipeline-list-query-search") + f'?plugin_id={plugin_ds.id}'
+        response = self.client.get(list_url)
+        self.assertContains(response, "Pipeline2")
+        self.assertNotContains(response, "Pipeline1")
+
 
 class PipelineDetailViewTests(PipelineViewTests):
     """
@@ -159,12 +246,79 @@ class PipelineDetailViewTests(PipelineViewTests):
         response = self.client.get(self.read_update_delete_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_pipeline_detail_success_precomputed_representation(self):
+        self.client.login(username=self.username, password=self.password)
+        put = json.dumps({"template": {"data": [{"name": "locked", "value": False}]}})
+        self.client.put(self.read_update_delete_url, data=put,
+                        content_type=self.content_type)
+        self.assertEqual(PipelineRepresentation.objects.count(), 1)
+        self.client.logout()
+        response = self.client.get(self.read_update_delete_url)
+        self.assertContains(response, "Pipeline1")
+        self.assertContains(response, "http://testserver" + self.read_update_delete_url)
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = self.client.get(self.read_update_delete_url,
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_pipeline_detail_success_precomputed_representation_sparse_fieldset(self):
+        self.client.login(username=self.username, password=self.password)
+        put = json.dumps({"template": {"data": [{"name": "locked", "value": False}]}})
+        self.client.put(self.read_update_delete_url, data=put,
+                        content_type=self.content_type)
+        self.client.logout()
+        response = self.client.get(self.read_update_delete_url)
+        sparse_response = self.client.get(self.read_update_delete_url + '?fields=name',
+                                          HTTP_ACCEPT='application/json')
+        data = json.loads(sparse_response.content.decode('utf8'))
+        data.pop('template')
+        self.assertEqual(data, {'url': 'http://testserver' + self.read_update_delete_url,
+                                'name': 'Pipeline1'})
+        self.assertNotEqual(sparse_response['ETag'], response['ETag'])
+
+    def test_pipeline_detail_does_not_compute_representation_on_read(self):
+        pipeline = Pipeline.objects.get(name="Pipeline1")
+        pipeline.locked = False
+        pipeline.save()
+        response = self.client.get(self.read_update_delete_url)
+        self.assertContains(response, "Pipeline1")
+        self.assertEqual(PipelineRepresentation.objects.count(), 0)
+
+    def test_pipeline_detail_ignores_outdated_representation(self):
+        self.client.login(username=self.username, password=self.password)
+        put = json.dumps({"template": {"data": [{"name": "locked", "value": False}]}})
+        self.client.put(self.read_update_delete_url, data=put,
+                        content_type=self.content_type)
+        PipelineRepresentation.objects.update(version=0, detail={'name': 'outdated'})
+        self.client.logout()
+        response = self.client.get(self.read_update_delete_url)
+        self.assertContains(response, "Pipeline1")
+        self.assertNotContains(response, "outdated")
+        self.assertNotIn('ETag', response)
+
     def test_pipeline_update_success(self):
         self.client.login(username=self.username, password=self.password)
         response = self.client.put(self.read_update_delete_url, data=self.put,
                                    content_type=self.content_type)
         self.assertContains(response, "Pipeline2")
 
+    def test_pipeline_update_success_ignores_on_duplicate(self):
+        self.client.login(username=self.username, password=self.password)
+        put = json.dumps({"template": {"data": [{"name": "name", "value": "Pipeline2"},
+                                                {"name": "on_duplicate",
+                                                 "value": "reject"}]}})
+        response = self.client.put(self.read_update_delete_url, data=put,
+                                   content_type=self.content_type)
+        self.assertContains(response, "Pipeline2")
+
+    def test_pipeline_update_failure_batch_of_templates(self):
+        self.client.login(username=self.username, password=self.password)
+        put = json.dumps({"templates": [
+            {"data": [{"name": "name", "value": "Pipeline2"}]}]})
+        response = self.client.put(self.read_update_delete_url, data=put,
+                                   content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_pipeline_update_failure_unauthenticated(self):
         response = self.client.put(self.read_update_delete_url, data=self.put,
                                    content_type=self.content_type)
@@ -192,6 +346,162 @@ class PipelineDetailViewTests(PipelineViewTests):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class PipelineDocumentViewTests(PipelineViewTests):
+    """
+    Test the pipeline-document view.
+    """
+
+    def setUp(self):
+        super(PipelineDocumentViewTests, self).setUp()
+        self.pipeline = Pipeline.objects.get(name="Pipeline1")
+        self.read_url = reverse("pipeline-document", kwargs={"pk": self.pipeline.id})
+
+    def test_pipeline_document_success(self):
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], "Pipeline1")
+        tree = response.data['plugin_tree']
+        self.assertEqual(len(tree), 2)
+        self.assertEqual(tree[1]['previous_index'], 0)
+        self.assertEqual(tree[1]['plugin_name'], self.plugin_ds_name)
+        self.assertEqual(tree[1]['plugin_parameter_defaults'],
+                         [{'name': 'dummyInt', 'default': 111111}])
+
+    def test_pipeline_document_plugin_tree_round_trips_null_defaults(self):
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        PluginParameter.objects.get_or_create(plugin=plugin_ds, name='dummyStr',
+                                              type='string', optional=True)
+        owner = User.objects.get(username=self.username)
+        (pipeline, tf) = Pipeline.objects.get_or_create(name='Pipeline2', owner=owner)
+        PluginPiping.objects.get_or_create(plugin=plugin_ds, pipeline=pipeline)
+        pipeline.update_fingerprint()
+        read_url = reverse("pipeline-document", kwargs={"pk": pipeline.id})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.get(read_url, HTTP_ACCEPT='application/json')
+        tree = response.data['plugin_tree']
+        self.assertIn({'name': 'dummyStr', 'default': None},
+                      tree[0]['plugin_parameter_defaults'])
+        post = json.dumps(
+            {"template": {"data": [{"name": "name", "value": "Pipeline3"},
+                                   {"name": "plugin_tree", "value": json.dumps(tree)}]}})
+        response = self.client.post(reverse("pipeline-list"), data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['fingerprint'],
+                         Pipeline.objects.get(name='Pipeline2').fingerprint)
+
+    def test_pipeline_document_failure_unauthenticated(self):
+        response = self.client.get(self.read_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PipelineExecutionPlanViewTests(PipelineViewTests):
+    """
+    Test the pipeline-plan view.
+    """
+
+    def setUp(self):
+        super(PipelineExecutionPlanViewTests, self).setUp()
+        self.pipeline = Pipeline.objects.get(name="Pipeline1")
+        self.read_url = reverse("pipeline-plan", kwargs={"pk": self.pipeline.id})
+
+    def test_pipeline_execution_plan_success(self):
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        levels = response.data['plan']
+        self.assertEqual(len(levels), 2)
+        self.assertEqual(levels[0][0]['piping_id'], self.pips[0].id)
+        self.assertEqual(levels[1][0]['previous_piping_id'], self.pips[0].id)
+        self.assertEqual(levels[1][0]['plugin_name'], self.plugin_ds_name)
+        self.assertEqual(levels[1][0]['parameters'][0]['name'], 'dummyInt')
+        self.assertEqual(levels[1][0]['parameters'][0]['value'], 111111)
+
+    def test_pipeline_execution_plan_success_cached_per_version(self):
+        self.client.login(username=self.username, password=self.password)
+        self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+        with mock.patch.object(Pipeline, 'get_execution_plan') as get_plan_mock:
+            self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+            get_plan_mock.assert_not_called()
+        default = self.pips[1].integer_param.get()
+        url = reverse("defaultpipingintparameter-detail", kwargs={"pk": default.id})
+        put = json.dumps({"template": {"data": [{"name": "value", "value": 5}]}})
+        self.client.put(url, data=put, content_type=self.content_type)
+        response = self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+        levels = response.data['plan']
+        self.assertEqual(levels[1][0]['parameters'][0]['value'], 5)
+
+    def test_pipeline_execution_plan_is_a_json_list(self):
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+        data = json.loads(response.content.decode('utf8'))
+        self.assertIsInstance(data['plan'], list)
+        self.assertEqual(data['plan'][0][0]['piping_id'], self.pips[0].id)
+        response = self.client.get(self.read_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_pipeline_execution_plan_discarded_on_plugin_change(self):
+        self.client.login(username=self.username, password=self.password)
+        self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+        plugin = self.pips[0].plugin
+        plugin.dock_image = 'fnndsc/pl-new'
+        plugin.save()
+        response = self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.data['plan'][0][0]['dock_image'], 'fnndsc/pl-new')
+
+    def test_pipeline_execution_plan_not_used_after_plugin_change_elsewhere(self):
+        self.client.login(username=self.username, password=self.password)
+        self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+        # the plugin is modified without signals (as if by another process)
+        Plugin.objects.filter(pk=self.pips[0].plugin_id).update(
+            dock_image='fnndsc/pl-new', modification_date=timezone.now())
+        response = self.client.get(self.read_url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.data['plan'][0][0]['dock_image'], 'fnndsc/pl-new')
+
+    def test_pipeline_execution_plan_failure_unauthenticated(self):
+        response = self.client.get(self.read_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PipelineForkViewTests(PipelineViewTests):
+    """
+    Test the pipeline-fork view.
+    """
+
+    def setUp(self):
+        super(PipelineForkViewTests, self).setUp()
+        self.pipeline = Pipeline.objects.get(name="Pipeline1")
+        self.create_url = reverse("pipeline-fork", kwargs={"pk": self.pipeline.id})
+        self.post = json.dumps(
+            {"template": {"data": [{"name": "name", "value": "Pipeline2"}]}})
+
+    def test_pipeline_fork_success(self):
+        self.pipeline.locked = False
+        self.pipeline.save()
+        self.client.login(username=self.other_username, password=self.other_password)
+        response = self.client.post(self.create_url, data=self.post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        pipeline = Pipeline.objects.get(name="Pipeline2")
+        self.assertEqual(pipeline.owner.username, self.other_username)
+        self.assertTrue(pipeline.locked)
+        self.assertEqual(pipeline.category, 'test')
+        self.assertEqual(pipeline.plugin_pipings.count(), 2)
+        self.assertEqual(len(pipeline.get_default_parameters()), 2)
+
+    def test_pipeline_fork_failure_not_found_pipeline_locked(self):
+        self.client.login(username=self.other_username, password=self.other_password)
+        response = self.client.post(self.create_url, data=self.post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_pipeline_fork_failure_unauthenticated(self):
+        response = self.client.post(self.create_url, data=self.post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
 class PipelinePluginListViewTests(PipelineViewTests):
     """
     Test the pipeline-plugin-list view.
@@ -221,6 +531,28 @@ class PipelinePluginListViewTests(PipelineViewTests):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class PluginPipelineListViewTests(PipelineViewTests):
+    """
+    Test the plugin-pipeline-list view.
+    """
+
+    def setUp(self):
+        super(PluginPipelineListViewTests, self).setUp()
+        plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        self.list_url = reverse("plugin-pipeline-list", kwargs={"pk": plugin_ds.id})
+
+    def test_plugin_pipeline_list_success(self):
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.get(self.list_url)
+        self.assertContains(response, "Pipeline1")
+        self.assertEqual(response.data['count'], 1)  # no duplicates
+
+    def test_plugin_pipeline_list_success_only_accessible_pipelines(self):
+        self.client.login(username=self.other_username, password=self.other_password)
+        response = self.client.get(self.list_url)
+        self.assertNotContains(response, "Pipeline1")
+
+
 class PipelinePluginPipingListViewTests(PipelineViewTests):
     """
     Test the pipeline-pluginpiping-list view.
@@ -243,11 +575,101 @@ class PipelinePluginPipingListViewTests(PipelineViewTests):
         response = self.client.get(self.list_url)
         self.assertContains(response, "plugin_id")
 
+    def test_pipeline_plugin_piping_list_success_precomputed_representation(self):
+        self.pipeline.locked = False
+        self.pipeline.save()
+        PipelineSerializer.save_representation(self.pipeline)
+        response = self.client.get(self.list_url)
+        self.assertContains(response, "plugin_id")
+        self.assertContains(response, "http://testserver/api/v1/pipelines/pipings/")
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('ETag', response)
+
     def test_pipeline_plugin_piping_list_failure_unauthenticated(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class PipelinePluginPipingSubtreeViewTests(PipelineViewTests):
+    """
+    Test the structural editing of a pipeline through the
+    pipeline-pluginpiping-list and pluginpiping-detail views.
+    """
+
+    def setUp(self):
+        super(PipelinePluginPipingSubtreeViewTests, self).setUp()
+        self.pipeline = Pipeline.objects.get(name="Pipeline1")
+        self.list_url = reverse("pipeline-pluginpiping-list",
+                                kwargs={"pk": self.pipeline.id})
+        self.plugin_ds = Plugin.objects.get(meta__name=self.plugin_ds_name)
+        plugin_tree = json.dumps([
+            {"plugin_id": self.plugin_ds.id, "previous_index": None,
+             "plugin_parameter_defaults": [{"name": "dummyInt", "default": 5}]},
+            {"plugin_id": self.plugin_ds.id, "previous_index": 0}])
+        self.post = json.dumps(
+            {"template": {"data": [{"name": "previous_id", "value": self.pips[0].id},
+                                   {"name": "plugin_tree", "value": plugin_tree}]}})
+
+    def test_add_subtree_success(self):
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.post(self.list_url, data=self.post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['previous_id'], self.pips[0].id)
+        self.assertEqual(self.pipeline.plugin_pipings.count(), 4)
+        root = PluginPiping.objects.get(pk=response.data['id'])
+        self.assertEqual(root.integer_param.get().value, 5)
+        self.assertEqual(root.next.count(), 1)
+
+    def test_add_subtree_failure_unlocked_pipeline(self):
+        self.pipeline.locked = False
+        self.pipeline.save()
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.post(self.list_url, data=self.post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_add_subtree_failure_access_denied(self):
+        self.client.login(username=self.other_username, password=self.other_password)
+        response = self.client.post(self.list_url, data=self.post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_remove_subtree_success(self):
+        url = reverse("pluginpiping-detail", kwargs={"pk": self.pips[1].id})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.pipeline.plugin_pipings.count(), 1)
+
+    def test_remove_subtree_failure_root_piping(self):
+        url = reverse("pluginpiping-detail", kwargs={"pk": self.pips[0].id})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.pipeline.plugin_pipings.count(), 2)
+
+    def test_swap_plugin_version_success(self):
+        (plugin_ds2, tf) = Plugin.objects.get_or_create(
+            meta=self.plugin_ds.meta, version='0.2', dock_image='fnndsc/pl-simpledsapp:0.2')
+        url = reverse("pluginpiping-detail", kwargs={"pk": self.pips[1].id})
+        put = json.dumps({"template": {"data": [{"name": "plugin_version",
+                                                 "value": "0.2"}]}})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.put(url, data=put, content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['plugin_id'], plugin_ds2.id)
+        self.assertEqual(PluginPiping.objects.get(pk=self.pips[1].id).plugin, plugin_ds2)
+
+    def test_swap_plugin_version_failure_unknown_version(self):
+        url = reverse("pluginpiping-detail", kwargs={"pk": self.pips[1].id})
+        put = json.dumps({"template": {"data": [{"name": "plugin_version",
+                                                 "value": "9.9"}]}})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.put(url, data=put, content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class PipelineDefaultParameterListViewTests(PipelineViewTests):
     """
     Test the pipeline-defaultparameter-list view.
@@ -270,10 +692,88 @@ class PipelineDefaultParameterListViewTests(PipelineViewTests):
         self.assertContains(response, plugin_ds.meta.name)
         self.assertContains(response, 111111)
 
+    def test_pipeline_default_parameter_list_success_precomputed_representation(self):
+        self.pipeline.locked = False
+        self.pipeline.save()
+        PipelineSerializer.save_representation(self.pipeline)
+        response = self.client.get(self.list_url)
+        self.assertContains(response, 111111)
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_pipeline_default_parameter_list_precomputed_etags_are_per_resource(self):
+        self.pipeline.locked = False
+        self.pipeline.save()
+        PipelineSerializer.save_representation(self.pipeline)
+        detail_url = reverse('pipeline-detail', kwargs={"pk": self.pipeline.id})
+        page_url = self.list_url + '?limit=1&offset=1'
+        etags = [self.client.get(url)['ETag'] for url in (self.list_url, page_url,
+                                                          detail_url)]
+        self.assertEqual(len(set(etags)), 3)
+        response = self.client.get(page_url, HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etags[2])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_pipeline_default_parameter_list_precomputed_page_is_fetched_from_db(self):
+        self.pipeline.locked = False
+        self.pipeline.save()
+        PipelineSerializer.save_representation(self.pipeline)
+        page_url = self.list_url + '?limit=1&offset=1'
+        with mock.patch.object(PipelineRepresentation,
+                               'get_precomputed_data') as get_data_mock:
+            response = self.client.get(page_url, HTTP_ACCEPT='application/json')
+            get_data_mock.assert_not_called()
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['plugin_piping_id'],
+                         self.pips[1].id)
+
     def test_pipeline_default_parameter_list_failure_unauthenticated(self):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_pipeline_default_parameter_batch_update_success(self):
+        defaults = self.pipeline.get_default_parameters()
+        put = json.dumps({"template": {"data": [{"name": "defaults", "value": [
+            {"id": defaults[0]['id'], "type": "integer", "value": 222222},
+            {"plugin_piping_id": self.pips[1].id, "param_name": "dummyInt",
+             "value": 333333}]}]}})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.put(self.list_url, data=put,
+                                   content_type=self.content_type)
+        self.assertContains(response, 222222)
+        self.assertContains(response, 333333)
+        self.assertEqual(self.pips[0].integer_param.get().value, 222222)
+        self.assertEqual(self.pips[1].integer_param.get().value, 333333)
+
+    def test_pipeline_default_parameter_batch_update_failure_invalid_entries(self):
+        patch = json.dumps({"template": {"data": [{"name": "defaults", "value": [
+            {"plugin_piping_id": self.pips[0].id, "param_name": "dummyInt",
+             "value": 222222},
+            {"plugin_piping_id": self.pips[1].id, "param_name": "dummyInt",
+             "value": "abc"},
+            {"plugin_piping_id": self.pips[1].id, "param_name": "unknown",
+             "value": 1}]}]}})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.patch(self.list_url, data=patch,
+                                     content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data['defaults']), 2)
+        self.assertEqual(self.pips[0].integer_param.get().value, 111111)
+
+    def test_pipeline_default_parameter_batch_update_failure_access_denied(self):
+        put = json.dumps({"template": {"data": [{"name": "defaults", "value": [
+            {"plugin_piping_id": self.pips[0].id, "param_name": "dummyInt",
+             "value": 222222}]}]}})
+        self.pipeline.locked = False
+        self.pipeline.save()
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.put(self.list_url, data=put,
+                                   content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
 
 class PluginPipingDetailViewTests(PipelineViewTests):
     """
@@ -408,6 +908,22 @@ class DefaultPipingIntParameterDetailViewTests(ViewTests):
                                    content_type=self.content_type)
         self.assertContains(response, 222222)
 
+    def test_default_piping_int_parameter_update_success_unlocked_representation(self):
+        User.objects.create_user(username='chris', password='chris1234')
+        pipeline = Pipeline.objects.get(name="Pipeline1")
+        pipeline.locked = False
+        pipeline.save()
+        PipelineSerializer.save_representation(pipeline)
+        self.client.login(username='chris', password='chris1234')
+        response = self.client.put(self.read_update_url, data=self.put,
+                                   content_type=self.content_type)
+        self.assertContains(response, 222222)
+        pipeline.refresh_from_db()
+        representation = PipelineRepresentation.objects.get(pipeline=pipeline)
+        self.assertEqual(representation.detail['fingerprint'], pipeline.fingerprint)
+        defaults = representation.default_parameters.values_list('data', flat=True)
+        self.assertIn(222222, [d['value'] for d in defaults])
+
     def test_default_piping_int_parameter_update_failure_unauthenticated(self):
         response = self.client.put(self.read_update_url, data=self.put,
                                    content_type=self.content_type)
@@ -1,18 +1,28 @@
 
-from rest_framework import generics, permissions
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from rest_framework import generics, permissions, serializers, status
+from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
 from collectionjson import services
+from plugins.models import Plugin
 from plugins.serializers import PluginSerializer
 
-from .models import Pipeline, PipelineFilter, PluginPiping
+from .models import Pipeline, PipelineFilter, PipelineRepresentation, PluginPiping
 from .models import DefaultPipingBoolParameter, DefaultPipingStrParameter
 from .models import DefaultPipingIntParameter, DefaultPipingFloatParameter
 from .serializers import PipelineSerializer, PluginPipingSerializer
+from .serializers import PipelineDocumentSerializer, PipelineForkSerializer
+from .serializers import PipelineExecutionPlanSerializer
 from .serializers import DEFAULT_PIPING_PARAMETER_SERIALIZERS
 from .serializers import GenericDefaultPipingParameterSerializer
-from .permissions import IsChrisOrOwnerOrNotLockedReadOnly, IsChrisOrOwnerOrNotLocked
+from .serializers import PipelineDefaultParameterBatchSerializer
+from .serializers import PluginPipingSubtreeSerializer
+from .permissions import IsChrisOrOwnerOrNotLockedReadOnly
 from .permissions import IsChrisOrOwnerAndLockedOrNotLockedReadOnly
+from .permissions import IsChrisOrOwnerAndLockedOrNotLockedReadOnlyPipeline
+from .permissions import IsChrisOrOwnerAndLockedOrNotLockedReadOnlyPiping
 
 
 class PipelineList(generics.ListCreateAPIView):
@@ -36,6 +46,20 @@ class PipelineList(generics.ListCreateAPIView):
         """
         serializer.save(owner=self.request.user)
 
+    def create(self, request, *args, **kwargs):
+        """
+        Overriden to return a 200 status code when an existing duplicate pipeline is
+        returned instead of creating a new one.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        status_code = status.HTTP_201_CREATED
+        if getattr(serializer, 'duplicate', None) is not None:
+            status_code = status.HTTP_200_OK
+        return Response(serializer.data, status=status_code, headers=headers)
+
     def list(self, request, *args, **kwargs):
         """
         Overriden to add document-level link relations, query list and a collection+json
@@ -43,8 +67,8 @@ class PipelineList(generics.ListCreateAPIView):
         """
         response = super(PipelineList, self).list(request, *args, **kwargs)
         # append query list
-        query_list = [reverse('pipeline-list-query-search', request=request)]
-        response = services.append_collection_querylist(response, query_list)
+        response = services.append_collection_queries(response, request,
+                                                      ['pipeline-list-query-search'])
         # append document-level link relations
         links = {'plugins': reverse('plugin-list', request=request)}
         response = services.append_collection_links(response, links)
@@ -81,13 +105,21 @@ class PipelineDetail(generics.RetrieveUpdateDestroyAPIView):
 
     def retrieve(self, request, *args, **kwargs):
         """
-        Overriden to append a collection+json template.
+        Overriden to append a collection+json template. Unlocked pipelines are served
+        from their precomputed representation when it exists.
         """
-        response = super(PipelineDetail, self).retrieve(request, *args, **kwargs)
         template_data = {'name': "", 'authors': "", 'category': "", 'description': ""}
-        pipeline = self.get_object()
-        if pipeline.locked:
-            template_data['locked'] = ""
+        precomputed = PipelineRepresentation.get_precomputed_data(kwargs['pk'], 'detail')
+        if precomputed is not None:
+            (etag, data) = precomputed
+            response = services.get_precomputed_response(self, data, etag)
+        else:
+            pipeline = self.get_object()
+            response = Response(self.get_serializer(pipeline).data)
+            if pipeline.locked:
+                template_data['locked'] = ""
+        if response.status_code != status.HTTP_200_OK:
+            return response  # not modified
         return services.append_collection_template(response, template_data)
 
     def update(self, request, *args, **kwargs):
@@ -104,6 +136,51 @@ class PipelineDetail(generics.RetrieveUpdateDestroyAPIView):
         return super(PipelineDetail, self).update(request, *args, **kwargs)
 
 
+class PipelineDocument(generics.RetrieveAPIView):
+    """
+    A view for a pipeline's full document (the pipeline's data, its tree of plugins and
+    all its default parameter values) returned in a single response.
+    """
+    http_method_names = ['get']
+    queryset = Pipeline.objects.select_related('owner')
+    serializer_class = PipelineDocumentSerializer
+    permission_classes = (IsChrisOrOwnerOrNotLockedReadOnly,)
+
+
+class PipelineExecutionPlan(generics.RetrieveAPIView):
+    """
+    A pipeline execution plan view.
+    """
+    http_method_names = ['get']
+    queryset = Pipeline.objects.all()
+    serializer_class = PipelineExecutionPlanSerializer
+    permission_classes = (IsChrisOrOwnerOrNotLockedReadOnly,)
+
+
+class PipelineFork(generics.CreateAPIView):
+    """
+    A view to fork an accessible pipeline into a new locked pipeline owned by the
+    authenticated user.
+    """
+    http_method_names = ['post']
+    serializer_class = PipelineForkSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        """
+        Overriden to return a custom queryset that is only comprised by the pipelines
+        that are accessible to the currently authenticated user.
+        """
+        return Pipeline.get_accesible_pipelines(self.request.user)
+
+    def perform_create(self, serializer):
+        """
+        Overriden to associate the source pipeline and an owner with the new pipeline
+        before first saving to the DB.
+        """
+        serializer.save(owner=self.request.user, source=self.get_object())
+
+
 class PipelinePluginList(generics.ListAPIView):
     """
     A view for a pipeline-specific collection of plugins.
@@ -133,26 +210,86 @@ class PipelinePluginList(generics.ListAPIView):
         return pipeline.plugins.all()
 
 
+class PluginPipelineList(generics.ListAPIView):
+    """
+    A view for the collection of plugin-specific pipelines (pipelines that use the
+    plugin).
+    """
+    http_method_names = ['get']
+    queryset = Plugin.objects.all()
+    serializer_class = PipelineSerializer
+
+    def list(self, request, *args, **kwargs):
+        """
+        Overriden to return a list of the accessible pipelines that use the queried
+        plugin. Document-level link relations are also added to the response.
+        """
+        queryset = self.get_pipelines_queryset()
+        response = services.get_list_response(self, queryset)
+        plugin = self.get_object()
+        links = {'plugin': reverse('plugin-detail', request=request,
+                                   kwargs={"pk": plugin.id})}
+        return services.append_collection_links(response, links)
+
+    def get_pipelines_queryset(self):
+        """
+        Custom method to get the actual pipelines queryset for the queried plugin.
+        """
+        plugin = self.get_object()
+        pipings = PluginPiping.objects.filter(pipeline=OuterRef('pk'), plugin=plugin)
+        queryset = Pipeline.get_accesible_pipelines(self.request.user)
+        return queryset.filter(Exists(pipings))
+
+
 class PipelinePluginPipingList(generics.ListAPIView):
     """
     A view for the collection of pipeline-specific plugin pipings.
     """
-    http_method_names = ['get']
+    http_method_names = ['get', 'post']
     queryset = Pipeline.objects.all()
     serializer_class = PluginPipingSerializer
-    permission_classes = (IsChrisOrOwnerOrNotLockedReadOnly,)
+    permission_classes = (IsChrisOrOwnerAndLockedOrNotLockedReadOnlyPipeline,)
 
-    def list(self, request, *args, **kwargs):
+    def post(self, request, *args, **kwargs):
+        return self.create(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
         """
-        Overriden to return a list of the plugin pipings for the queried pipeline.
-        Document-level link relations are also added to the response.
+        Custom method to add a subtree of plugins under an existing piping of the
+        queried pipeline. The new subtree's root piping is returned.
         """
-        queryset = self.get_plugin_pipings_queryset()
-        response = services.get_list_response(self, queryset)
         pipeline = self.get_object()
+        context = self.get_serializer_context()
+        context['pipeline'] = pipeline
+        serializer = PluginPipingSubtreeSerializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        root_piping = serializer.save(pipeline=pipeline)
+        piping_serializer = self.get_serializer(root_piping)
+        return Response(piping_serializer.data, status=status.HTTP_201_CREATED)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Overriden to return a list of the plugin pipings for the queried pipeline.
+        Document-level link relations are also added to the response. Unlocked
+        pipelines are served from their precomputed representation.
+        """
+        precomputed = PipelineRepresentation.get_precomputed_data(kwargs['pk'],
+                                                                  'plugin_pipings')
+        if precomputed is not None:
+            (etag, data) = precomputed
+            response = services.get_precomputed_response(self, data, etag)
+            if response.status_code != status.HTTP_200_OK:
+                return response  # not modified
+        else:
+            queryset = self.get_plugin_pipings_queryset()
+            response = services.get_list_response(self, queryset)
         links = {'pipeline': reverse('pipeline-detail', request=request,
-                                   kwargs={"pk": pipeline.id})}
-        return services.append_collection_links(response, links)
+                                   kwargs={"pk": kwargs['pk']})}
+        response = services.append_collection_links(response, links)
+        if precomputed is not None:
+            return response
+        template_data = {'previous_id': '', 'plugin_tree': ''}
+        return services.append_collection_template(response, template_data)
 
     def get_plugin_pipings_queryset(self,):
         """
@@ -166,46 +303,84 @@ class PipelineDefaultParameterList(generics.ListAPIView):
     """
     A view for the collection of pipeline-specific plugin parameters' defaults.
     """
-    http_method_names = ['get']
+    http_method_names = ['get', 'put', 'patch']
     queryset = Pipeline.objects.all()
     serializer_class = GenericDefaultPipingParameterSerializer
-    permission_classes = (IsChrisOrOwnerOrNotLockedReadOnly,)
+    permission_classes = (IsChrisOrOwnerAndLockedOrNotLockedReadOnlyPipeline,)
 
     def list(self, request, *args, **kwargs):
         """
         Overriden to return a list with all the default parameter values used by the
-        queried pipeline.
-        """
+        queried pipeline. Unlocked pipelines are served from their precomputed
+        representation.
+        """
+        precomputed = PipelineRepresentation.get_precomputed_default_parameters(
+            kwargs['pk'])
+        if precomputed is not None:
+            (etag, data) = precomputed
+            return services.get_precomputed_response(self, data, etag)
         queryset = self.get_default_parameters_queryset()
         response = services.get_list_response(self, queryset)
         return response
 
+    def update(self, request, *args, **kwargs):
+        """
+        Custom method to update many default parameter values of the queried pipeline
+        at once and return the updated list of default parameters.
+        """
+        pipeline = self.get_object()
+        serializer = PipelineDefaultParameterBatchSerializer(
+            pipeline, data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return self.list(request, *args, **kwargs)
+
+    def put(self, request, *args, **kwargs):
+        return self.update(request, *args, **kwargs)
+
+    def patch(self, request, *args, **kwargs):
+        return self.update(request, *args, **kwargs)
+
     def get_default_parameters_queryset(self):
         """
         Custom method to get a queryset with all the default parameters regardless their
         type.
         """
         pipeline = self.get_object()
-        queryset = []
-        queryset.extend(list(DefaultPipingStrParameter.objects.filter(
-            plugin_piping__pipeline=pipeline)))
-        queryset.extend(list(DefaultPipingIntParameter.objects.filter(
-            plugin_piping__pipeline=pipeline)))
-        queryset.extend(list(DefaultPipingFloatParameter.objects.filter(
-            plugin_piping__pipeline=pipeline)))
-        queryset.extend(list(DefaultPipingBoolParameter.objects.filter(
-            plugin_piping__pipeline=pipeline)))
-        return self.filter_queryset(queryset)
-
-
-class PluginPipingDetail(generics.RetrieveAPIView):
+        return self.filter_queryset(pipeline.get_default_parameters())
+
+
+class PluginPipingDetail(generics.RetrieveUpdateDestroyAPIView):
     """
     A plugin piping view.
     """
-    http_method_names = ['get']
+    http_method_names = ['get', 'put', 'delete']
     queryset = PluginPiping.objects.all()
     serializer_class = PluginPipingSerializer
-    permission_classes = (IsChrisOrOwnerOrNotLocked,)
+    permission_classes = (IsChrisOrOwnerAndLockedOrNotLockedReadOnlyPiping,)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Overriden to append a collection+json template.
+        """
+        response = super(PluginPipingDetail, self).retrieve(request, *args, **kwargs)
+        template_data = {'title': '', 'plugin_version': ''}
+        return services.append_collection_template(response, template_data)
+
+    def perform_destroy(self, instance):
+        """
+        Overriden to remove the whole subtree of pipings (and their defaults) rooted
+        at the piping. The root piping of a pipeline can not be removed.
+        """
+        pipeline = instance.pipeline
+        PluginPipingSerializer.validate_pipeline_locked(pipeline)
+        if instance.previous_id is None:
+            raise serializers.ValidationError(
+                {'non_field_errors': ['The root plugin piping of a pipeline can not be '
+                                      'removed.']})
+        with transaction.atomic():
+            instance.delete()  # the cascade deletes the subtree
+            PluginPipingSerializer.touch_pipeline(pipeline)
 
 
 class DefaultPipingStrParameterDetail(generics.RetrieveUpdateAPIView):
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-19 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plugins', '0019_alter_defaultboolparameter_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plugin',
+            name='modification_date',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
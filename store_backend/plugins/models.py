@@ -163,6 +163,7 @@ class Plugin(models.Model):
         'max_limit': 2147483647  # maxint
     }
     creation_date = models.DateTimeField(auto_now_add=True)
+    modification_date = models.DateTimeField(auto_now=True)
     version = models.CharField(max_length=10)
     dock_image = models.CharField(max_length=500)
     execshell = models.CharField(max_length=50, blank=True)
@@ -7,6 +7,10 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 from rest_framework import serializers
 
+from collectionjson.fields import HyperlinkedIdentityField, HyperlinkedRelatedField
+from collectionjson.serializers import (SparseFieldsetSerializerMixin,
+                                       LinkTemplateSerializerMixin)
+
 from .models import (PluginMeta, PluginMetaStar, PluginMetaCollaborator, Plugin,
                      PluginParameter, TYPES)
 from .models import (DefaultFloatParameter, DefaultIntParameter, DefaultBoolParameter,
@@ -14,10 +18,11 @@ from .models import (DefaultFloatParameter, DefaultIntParameter, DefaultBoolPara
 from .fields import CPUInt, MemoryInt
 
 
-class PluginMetaSerializer(serializers.HyperlinkedModelSerializer):
+class PluginMetaSerializer(SparseFieldsetSerializerMixin, LinkTemplateSerializerMixin,
+                           serializers.HyperlinkedModelSerializer):
     stars = serializers.ReadOnlyField(source='fans.count')
-    plugins = serializers.HyperlinkedIdentityField(view_name='pluginmeta-plugin-list')
-    collaborators = serializers.HyperlinkedIdentityField(
+    plugins = HyperlinkedIdentityField(view_name='pluginmeta-plugin-list')
+    collaborators = HyperlinkedIdentityField(
         view_name='pluginmeta-pluginmetacollaborator-list'
     )
 
@@ -36,14 +41,14 @@ class PluginMetaSerializer(serializers.HyperlinkedModelSerializer):
         return super(PluginMetaSerializer, self).update(instance, validated_data)
 
 
-class PluginMetaStarSerializer(serializers.HyperlinkedModelSerializer):
+class PluginMetaStarSerializer(SparseFieldsetSerializerMixin, LinkTemplateSerializerMixin,
+                               serializers.HyperlinkedModelSerializer):
     plugin_name = serializers.CharField(max_length=100, source='meta.name')
     meta_id = serializers.ReadOnlyField(source='meta.id')
     user_id = serializers.ReadOnlyField(source='user.id')
     username = serializers.ReadOnlyField(source='user.username')
-    meta = serializers.HyperlinkedRelatedField(view_name='pluginmeta-detail',
-                                               read_only=True)
-    user = serializers.HyperlinkedRelatedField(view_name='user-detail', read_only=True)
+    meta = HyperlinkedRelatedField(view_name='pluginmeta-detail', read_only=True)
+    user = HyperlinkedRelatedField(view_name='user-detail', read_only=True)
 
     class Meta:
         model = PluginMetaStar
@@ -78,15 +83,16 @@ class PluginMetaStarSerializer(serializers.HyperlinkedModelSerializer):
         return data
 
 
-class PluginMetaCollaboratorSerializer(serializers.HyperlinkedModelSerializer):
+class PluginMetaCollaboratorSerializer(SparseFieldsetSerializerMixin,
+                                       LinkTemplateSerializerMixin,
+                                       serializers.HyperlinkedModelSerializer):
     plugin_name = serializers.ReadOnlyField(source='meta.name')
     meta_id = serializers.ReadOnlyField(source='meta.id')
     user_id = serializers.ReadOnlyField(source='user.id')
     username = serializers.CharField(min_length=4, max_length=32, source='user.username',
                                      required=False)
-    meta = serializers.HyperlinkedRelatedField(view_name='pluginmeta-detail',
-                                               read_only=True)
-    user = serializers.HyperlinkedRelatedField(view_name='user-detail', read_only=True)
+    meta = HyperlinkedRelatedField(view_name='pluginmeta-detail', read_only=True)
+    user = HyperlinkedRelatedField(view_name='user-detail', read_only=True)
 
     class Meta:
         model = PluginMetaCollaborator
@@ -134,7 +140,8 @@ class PluginMetaCollaboratorSerializer(serializers.HyperlinkedModelSerializer):
         return data
 
 
-class PluginSerializer(serializers.HyperlinkedModelSerializer):
+class PluginSerializer(SparseFieldsetSerializerMixin, LinkTemplateSerializerMixin,
+                       serializers.HyperlinkedModelSerializer):
     name = serializers.CharField(max_length=100, source='meta.name')
     title = serializers.ReadOnlyField(source='meta.title')
     public_repo = serializers.URLField(max_length=300, source='meta.public_repo')
@@ -145,9 +152,9 @@ class PluginSerializer(serializers.HyperlinkedModelSerializer):
     authors = serializers.ReadOnlyField(source='meta.authors')
     documentation = serializers.ReadOnlyField(source='meta.documentation')
     stars = serializers.ReadOnlyField(source='meta.fans.count')
-    parameters = serializers.HyperlinkedIdentityField(view_name='pluginparameter-list')
-    meta = serializers.HyperlinkedRelatedField(view_name='pluginmeta-detail',
-                                               read_only=True)
+    parameters = HyperlinkedIdentityField(view_name='pluginparameter-list')
+    pipelines = HyperlinkedIdentityField(view_name='plugin-pipeline-list')
+    meta = HyperlinkedRelatedField(view_name='pluginmeta-detail', read_only=True)
     descriptor_file = serializers.FileField(write_only=True)
 
     class Meta:
@@ -158,7 +165,7 @@ class PluginSerializer(serializers.HyperlinkedModelSerializer):
                   'selfexec', 'min_number_of_workers', 'max_number_of_workers',
                   'min_cpu_limit', 'max_cpu_limit', 'min_memory_limit',
                   'max_memory_limit', 'min_gpu_limit', 'max_gpu_limit', 'parameters',
-                  'meta', 'descriptor_file')
+                  'pipelines', 'meta', 'descriptor_file')
 
     def create(self, validated_data):
         """
@@ -502,9 +509,10 @@ class PluginSerializer(serializers.HyperlinkedModelSerializer):
         return app_repr
 
 
-class PluginParameterSerializer(serializers.HyperlinkedModelSerializer):
-    plugin = serializers.HyperlinkedRelatedField(view_name='plugin-detail',
-                                                 read_only=True)
+class PluginParameterSerializer(SparseFieldsetSerializerMixin,
+                                LinkTemplateSerializerMixin,
+                                serializers.HyperlinkedModelSerializer):
+    plugin = HyperlinkedRelatedField(view_name='plugin-detail', read_only=True)
     default = serializers.SerializerMethodField()
 
     class Meta:
@@ -520,11 +528,13 @@ class PluginParameterSerializer(serializers.HyperlinkedModelSerializer):
         return default.value if default else None
 
 
-class DefaultStrParameterSerializer(serializers.HyperlinkedModelSerializer):
+class DefaultStrParameterSerializer(SparseFieldsetSerializerMixin,
+                                    LinkTemplateSerializerMixin,
+                                    serializers.HyperlinkedModelSerializer):
     param_name = serializers.ReadOnlyField(source='plugin_param.name')
     type = serializers.SerializerMethodField()
-    plugin_param = serializers.HyperlinkedRelatedField(view_name='pluginparameter-detail',
-                                                       read_only=True)
+    plugin_param = HyperlinkedRelatedField(view_name='pluginparameter-detail',
+                                           read_only=True)
 
     @staticmethod
     def get_type(obj):
@@ -535,11 +545,13 @@ class DefaultStrParameterSerializer(serializers.HyperlinkedModelSerializer):
         fields = ('url', 'id', 'param_name', 'value', 'type', 'plugin_param')
 
 
-class DefaultIntParameterSerializer(serializers.HyperlinkedModelSerializer):
+class DefaultIntParameterSerializer(SparseFieldsetSerializerMixin,
+                                    LinkTemplateSerializerMixin,
+                                    serializers.HyperlinkedModelSerializer):
     param_name = serializers.ReadOnlyField(source='plugin_param.name')
     type = serializers.SerializerMethodField()
-    plugin_param = serializers.HyperlinkedRelatedField(view_name='pluginparameter-detail',
-                                                       read_only=True)
+    plugin_param = HyperlinkedRelatedField(view_name='pluginparameter-detail',
+                                           read_only=True)
 
     @staticmethod
     def get_type(obj):
@@ -550,11 +562,13 @@ class DefaultIntParameterSerializer(serializers.HyperlinkedModelSerializer):
         fields = ('url', 'id', 'param_name', 'value', 'type', 'plugin_param')
 
 
-class DefaultFloatParameterSerializer(serializers.HyperlinkedModelSerializer):
+class DefaultFloatParameterSerializer(SparseFieldsetSerializerMixin,
+                                      LinkTemplateSerializerMixin,
+                                      serializers.HyperlinkedModelSerializer):
     param_name = serializers.ReadOnlyField(source='plugin_param.name')
     type = serializers.SerializerMethodField()
-    plugin_param = serializers.HyperlinkedRelatedField(view_name='pluginparameter-detail',
-                                                       read_only=True)
+    plugin_param = HyperlinkedRelatedField(view_name='pluginparameter-detail',
+                                           read_only=True)
 
     @staticmethod
     def get_type(obj):
@@ -565,11 +579,13 @@ class DefaultFloatParameterSerializer(serializers.HyperlinkedModelSerializer):
         fields = ('url', 'id', 'param_name', 'value', 'type', 'plugin_param')
 
 
-class DefaultBoolParameterSerializer(serializers.HyperlinkedModelSerializer):
+class DefaultBoolParameterSerializer(SparseFieldsetSerializerMixin,
+                                     LinkTemplateSerializerMixin,
+                                     serializers.HyperlinkedModelSerializer):
     param_name = serializers.ReadOnlyField(source='plugin_param.name')
     type = serializers.SerializerMethodField()
-    plugin_param = serializers.HyperlinkedRelatedField(view_name='pluginparameter-detail',
-                                                       read_only=True)
+    plugin_param = HyperlinkedRelatedField(view_name='pluginparameter-detail',
+                                           read_only=True)
 
     @staticmethod
     def get_type(obj):
@@ -108,3 +108,15 @@ class PluginFilterTests(ModelTests):
         queryset = Plugin.objects.all()
         qs = pl_filter.search_name_title_category(queryset, 'name_title_category', 'Dir')
         self.assertCountEqual(qs, queryset)
+
+    def test_name_exact(self):
+        """
+        Test whether the name_exact filter returns a filtered queryset with the plugins
+        whose meta has exactly the search value as name.
+        """
+        queryset = Plugin.objects.all()
+        pl_filter = PluginFilter({'name_exact': self.plugin_name}, queryset=queryset)
+        self.assertCountEqual(pl_filter.qs,
+                              Plugin.objects.filter(meta__name=self.plugin_name))
+        pl_filter = PluginFilter({'name_exact': 'unknown'}, queryset=queryset)
+        self.assertEqual(list(pl_filter.qs), [])
@@ -2,14 +2,17 @@
 import logging
 import json
 import io
-from unittest import mock
+from unittest import mock, skipIf
 
+from django.db import connection
 from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
 
 from rest_framework import status
 
+from collectionjson.renderers import msgpack
 from plugins.models import (PluginMeta, PluginMetaStar, PluginMetaCollaborator, Plugin,
                             PluginParameter)
 
@@ -120,6 +123,14 @@ class PluginMetaDetailViewTests(ViewTests):
                                    content_type=self.content_type)
         self.assertContains(response, "http://localhost11")
 
+    def test_plugin_meta_update_failure_batch_of_templates(self):
+        put = json.dumps({"templates": [
+            {"data": [{"name": "public_repo", "value": "http://localhost11.com"}]}]})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.put(self.read_update_delete_url, data=put,
+                                   content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_plugin_meta_update_failure_unauthenticated(self):
         response = self.client.put(self.read_update_delete_url, data={},
                                    content_type=self.content_type)
@@ -190,6 +201,34 @@ class PluginMetaStarListViewTests(ViewTests):
                                     content_type=self.content_type)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_plugin_meta_star_create_batch_success(self):
+        PluginMeta.objects.get_or_create(name='testplugin')
+        post = json.dumps({"templates": [
+            {"data": [{"name": "plugin_name", "value": self.plugin_name}]},
+            {"data": [{"name": "plugin_name", "value": "testplugin"}]}]})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.post(self.create_read_url, data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertContains(response, 'testplugin', status_code=201)
+        self.assertEqual(PluginMetaStar.objects.count(), 2)
+
+    def test_plugin_meta_star_create_batch_failure_rolls_back_all_items(self):
+        post = json.dumps({"templates": [
+            {"data": [{"name": "plugin_name", "value": self.plugin_name}]},
+            {"data": [{"name": "plugin_name", "value": "unknown"}]},
+            {"data": [{"name": "plugin_name", "value": self.plugin_name}]}]})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.post(self.create_read_url, data=post,
+                                    HTTP_ACCEPT='application/json',
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = json.loads(response.content.decode('utf8'))
+        self.assertEqual(errors[0], {})
+        self.assertIn('plugin_name', errors[1])
+        self.assertIn('non_field_errors', errors[2])
+        self.assertEqual(PluginMetaStar.objects.count(), 0)
+
     def test_plugin_meta_star_create_failure_unauthenticated(self):
         response = self.client.post(self.create_read_url, data={})
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -284,6 +323,28 @@ class PluginMetaCollaboratorListViewTests(ViewTests):
                                     content_type=self.content_type)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_plugin_meta_collaborator_create_batch_success(self):
+        User.objects.create_user(username='bobby', email='bob@test.com',
+                                 password='bobpassword')
+        post = json.dumps({"templates": [
+            {"data": [{"name": "username", "value": 'another'},
+                      {"name": "role", "value": 'M'}]},
+            {"data": [{"name": "username", "value": 'bobby'},
+                      {"name": "role", "value": 'M'}]}]})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.post(self.create_read_url, data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(PluginMetaCollaborator.objects.count(), 3)
+
+    def test_plugin_meta_collaborator_create_batch_failure_unauthenticated(self):
+        post = json.dumps({"templates": [
+            {"data": [{"name": "username", "value": 'another'},
+                      {"name": "role", "value": 'M'}]}]})
+        response = self.client.post(self.create_read_url, data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_plugin_meta_collaborator_create_failure_unauthenticated(self):
         response = self.client.post(self.create_read_url, data=self.post,
                                     content_type=self.content_type)
@@ -446,6 +507,39 @@ class PluginListViewTests(ViewTests):
             response = self.client.post(self.create_read_url, data=self.post)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_plugin_create_batch_success(self):
+        descriptor = self.plg_repr.copy()
+        post = json.dumps({"templates": [
+            {"data": [{"name": "name", "value": "testplugin"},
+                      {"name": "public_repo", "value": "http://localhost.com"},
+                      {"name": "dock_image", "value": "pl-testplugin"},
+                      {"name": "descriptor_file", "value": descriptor}]},
+            {"data": [{"name": "name", "value": "testplugin2"},
+                      {"name": "public_repo", "value": "http://localhost.com"},
+                      {"name": "dock_image", "value": "pl-testplugin2"},
+                      {"name": "descriptor_file", "value": json.dumps(descriptor)}]}]})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.post(self.create_read_url, data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Plugin.objects.filter(meta__name__startswith='testplugin')
+                         .count(), 2)
+
+    def test_plugin_create_batch_failure_rolls_back_all_items(self):
+        post = json.dumps({"templates": [
+            {"data": [{"name": "name", "value": "testplugin"},
+                      {"name": "public_repo", "value": "http://localhost.com"},
+                      {"name": "dock_image", "value": "pl-testplugin"},
+                      {"name": "descriptor_file", "value": self.plg_repr}]},
+            {"data": [{"name": "name", "value": "testplugin2"},
+                      {"name": "public_repo", "value": "http://localhost.com"},
+                      {"name": "dock_image", "value": "pl-testplugin2"}]}]})
+        self.client.login(username=self.username, password=self.password)
+        response = self.client.post(self.create_read_url, data=post,
+                                    content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PluginMeta.objects.filter(name='testplugin').exists())
+
     def test_plugin_create_failure_unauthenticated(self):
         response = self.client.post(self.create_read_url, data={})
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -459,6 +553,47 @@ class PluginListViewTests(ViewTests):
         response = self.client.get(self.create_read_url)
         self.assertContains(response, self.plugin_name)
 
+    def test_plugin_list_success_table_json(self):
+        response = self.client.get(self.create_read_url,
+                                   HTTP_ACCEPT='application/vnd.chris.table+json')
+        self.assertEqual(response['Content-Type'], 'application/vnd.chris.table+json')
+        table = json.loads(response.content.decode('utf8'))['table']
+        self.assertEqual(table['total'], 1)
+        row = dict(zip(table['columns'], table['rows'][0]))
+        self.assertEqual(row['name'], self.plugin_name)
+        self.assertIn('url', table['link_columns'])
+        self.assertIn('parameters', table['link_columns'])
+        self.assertNotIn('descriptor_file', table['columns'])
+
+    @skipIf(msgpack is None, 'msgpack is not installed')
+    def test_plugin_list_success_msgpack(self):
+        response = self.client.get(self.create_read_url,
+                                   HTTP_ACCEPT='application/vnd.collection+msgpack')
+        self.assertEqual(response['Content-Type'], 'application/vnd.collection+msgpack')
+        collection = json.loads(self.client.get(self.create_read_url).content)
+        self.assertEqual(msgpack.unpackb(response.content), collection)
+
+    def test_plugin_list_success_sparse_fieldset(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.create_read_url + '?fields=name,version',
+                                       HTTP_ACCEPT='application/json')
+        results = json.loads(response.content.decode('utf8'))['results']
+        self.assertEqual(set(results[0]), {'url', 'name', 'version'})
+        self.assertEqual(results[0]['name'], self.plugin_name)
+        plugin_query = [q['sql'] for q in ctx.captured_queries
+                        if 'FROM "plugins_plugin"' in q['sql']][-1]
+        self.assertNotIn('"dock_image"', plugin_query)
+        self.assertNotIn('"documentation"', plugin_query)
+
+    def test_plugin_list_success_sparse_fieldset_exclude(self):
+        response = self.client.get(self.create_read_url + '?exclude=parameters,meta')
+        self.assertContains(response, self.plugin_name)
+        item = json.loads(response.content.decode('utf8'))['collection']['items'][0]
+        names = {d['name'] for d in item['data']}
+        self.assertIn('dock_image', names)
+        self.assertNotIn('parameters', {link['rel'] for link in item['links']})
+        self.assertNotIn('meta', {link['rel'] for link in item['links']})
+
 
 class PluginDetailViewTests(ViewTests):
     """
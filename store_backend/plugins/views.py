@@ -1,4 +1,7 @@
 
+import json
+
+from django.core.files.base import ContentFile
 from rest_framework import generics, permissions
 from rest_framework.reverse import reverse
 
@@ -42,8 +45,8 @@ class PluginMetaList(generics.ListAPIView):
             })
         response = services.append_collection_links(response, links)
         # append query list
-        query_list = [reverse('pluginmeta-list-query-search', request=request)]
-        return services.append_collection_querylist(response, query_list)
+        return services.append_collection_queries(response, request,
+                                                  ['pluginmeta-list-query-search'])
 
 
 class PluginMetaListQuerySearch(generics.ListAPIView):
@@ -126,6 +129,7 @@ class PluginMetaStarList(generics.ListCreateAPIView):
     queryset = PluginMetaStar.objects.all()
     serializer_class = PluginMetaStarSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    allow_batch_create = True
 
     def perform_create(self, serializer):
         """
@@ -135,6 +139,15 @@ class PluginMetaStarList(generics.ListCreateAPIView):
         plugin_meta = serializer.validated_data.get('meta').get('name')
         serializer.save(meta=plugin_meta, user=user)
 
+    def create(self, request, *args, **kwargs):
+        """
+        Overriden to create a batch of plugin stars in a single transaction when a
+        list of templates is submitted.
+        """
+        if isinstance(request.data, list):
+            return services.get_batch_create_response(self, request.data)
+        return super(PluginMetaStarList, self).create(request, *args, **kwargs)
+
     def list(self, request, *args, **kwargs):
         """
         Overriden to append document-level link relations, query list and a
@@ -149,8 +162,8 @@ class PluginMetaStarList(generics.ListCreateAPIView):
                                     kwargs={"pk": user.id})
         response = services.append_collection_links(response, links)
         # append query list
-        query_list = [reverse('pluginmetastar-list-query-search', request=request)]
-        response = services.append_collection_querylist(response, query_list)
+        query_names = ['pluginmetastar-list-query-search']
+        response = services.append_collection_queries(response, request, query_names)
         # append write template
         template_data = {'plugin_name': ''}
         return services.append_collection_template(response, template_data)
@@ -185,6 +198,7 @@ class PluginMetaCollaboratorList(generics.ListCreateAPIView):
     queryset = PluginMeta.objects.all()
     serializer_class = PluginMetaCollaboratorSerializer
     permission_classes = (IsMetaOwnerOrReadOnly,)
+    allow_batch_create = True
 
     def get_plugin_meta_collaborators_queryset(self):
         """
@@ -201,6 +215,15 @@ class PluginMetaCollaboratorList(generics.ListCreateAPIView):
         user = serializer.validated_data['user']['username']
         serializer.save(meta=plg_meta, user=user)
 
+    def create(self, request, *args, **kwargs):
+        """
+        Overriden to add a batch of plugin meta collaborators in a single transaction
+        when a list of templates is submitted.
+        """
+        if isinstance(request.data, list):
+            return services.get_batch_create_response(self, request.data)
+        return super(PluginMetaCollaboratorList, self).create(request, *args, **kwargs)
+
     def list(self, request, *args, **kwargs):
         """
         Overriden to append document-level link relations and a collection+json template
@@ -245,6 +268,7 @@ class PluginList(generics.ListCreateAPIView):
     serializer_class = PluginSerializer
     queryset = Plugin.objects.all()
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
+    allow_batch_create = True
 
     def perform_create(self, serializer):
         """
@@ -255,13 +279,32 @@ class PluginList(generics.ListCreateAPIView):
     def create(self, request, *args, **kwargs):
         """
         Overriden to include required version descriptor in the request dict before
-        serializer validation.
+        serializer validation. A batch of plugins is registered in a single transaction
+        when a list of templates is submitted.
+        """
+        if isinstance(request.data, list):
+            batch_data = [self.get_create_data(data) for data in request.data]
+            return services.get_batch_create_response(self, batch_data)
+        self.get_create_data(request.data)
+        return super(PluginList, self).create(request, *args, **kwargs)
+
+    def get_create_data(self, data):
+        """
+        Custom method to prepare the submitted data of a new plugin for serializer
+        validation. A plugin descriptor file submitted inline (as a JSON object or
+        string) in a collection+json template is wrapped in an in-memory file.
         """
         # we can use any random version string that is not likely to be already in the DB
         # for this plugin's name, this is required because of the name,version unique
         # together constraint in the model
-        request.data['version'] = 'random_str'
-        return super(PluginList, self).create(request, *args, **kwargs)
+        data['version'] = 'random_str'
+        descriptor = data.get('descriptor_file')
+        if isinstance(descriptor, dict):
+            descriptor = json.dumps(descriptor)
+        if isinstance(descriptor, str) and descriptor:
+            data['descriptor_file'] = ContentFile(descriptor.encode(),
+                                                  name='descriptor_file.json')
+        return data
 
     def list(self, request, *args, **kwargs):
         """
@@ -278,8 +321,8 @@ class PluginList(generics.ListCreateAPIView):
                                     kwargs={"pk": user.id})
         response = services.append_collection_links(response, links)
         # append query list
-        query_list = [reverse('plugin-list-query-search', request=request)]
-        response = services.append_collection_querylist(response, query_list)
+        response = services.append_collection_queries(response, request,
+                                                      ['plugin-list-query-search'])
         # append write template
         template_data = {'name': '', 'dock_image': '', 'public_repo': '',
                          'descriptor_file': ''}
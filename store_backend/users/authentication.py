@@ -0,0 +1,91 @@
+"""
+Authentication classes that cache the verified credentials. Cached tokens keep the
+token's user so that token authenticated requests don't access the DB and are discarded
+by the signal receivers in the signals module whenever the token or its user changes.
+Cached basic auth credentials save the password hashing of every request and are only
+accepted while the user's password is unchanged and the user is active. Cached entries
+expire after a short time.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework import authentication
+from rest_framework.authtoken.models import Token
+
+from core.cache import cache_on_commit
+
+
+def get_token_cache_key(key):
+    """
+    Convenience function to get the cache key of an authentication token. The token
+    itself is hashed so that it's not exposed by the cache.
+    """
+    return 'auth_token_' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_credentials_cache_key(userid, password):
+    """
+    Convenience function to get the cache key of a pair of basic auth credentials. The
+    key is an HMAC of the credentials keyed with the SECRET_KEY setting so that the
+    cache doesn't expose (or allow brute-forcing) the passwords.
+    """
+    value = f'{userid}\x00{password}'
+    digest = salted_hmac('users.authentication.credentials', value,
+                         algorithm='sha256').hexdigest()
+    return 'auth_credentials_' + digest
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    """
+    Token authentication that keeps the token's user in the cache for the
+    TOKEN_AUTH_CACHE_TIMEOUT setting's number of seconds.
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Overriden to get the token's user from the cache when available.
+        """
+        cache_key = get_token_cache_key(key)
+        user = cache.get(cache_key)
+        if user is not None:
+            return (user, Token(key=key, user=user))
+        (user, token) = super(CachedTokenAuthentication,
+                              self).authenticate_credentials(key)
+        cache_on_commit(cache_key, user,
+                        getattr(settings, 'TOKEN_AUTH_CACHE_TIMEOUT', 60))
+        return (user, token)
+
+
+class CachedBasicAuthentication(authentication.BasicAuthentication):
+    """
+    Basic authentication that remembers the successfully verified credentials for the
+    BASIC_AUTH_CACHE_TIMEOUT setting's number of seconds so that the password is not
+    hashed again on every request. A remembered pair of credentials is only accepted
+    while the user's stored password hash is unchanged and the user is active.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        """
+        Overriden to skip the password hashing for recently verified credentials.
+        """
+        cache_key = get_credentials_cache_key(userid, password)
+        password_hash = cache.get(cache_key)
+        if password_hash is not None:
+            user_model = get_user_model()
+            try:
+                user = user_model._default_manager.get_by_natural_key(userid)
+            except user_model.DoesNotExist:
+                user = None
+            if (user is not None and user.is_active
+                    and constant_time_compare(user.password, password_hash)):
+                return (user, None)
+            cache.delete(cache_key)
+        (user, auth) = super(CachedBasicAuthentication,
+                             self).authenticate_credentials(userid, password, request)
+        cache_on_commit(cache_key, user.password,
+                        getattr(settings, 'BASIC_AUTH_CACHE_TIMEOUT', 300))
+        return (user, auth)
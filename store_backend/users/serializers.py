@@ -3,8 +3,13 @@ from django.contrib.auth.models import User
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
+from collectionjson.fields import HyperlinkedIdentityField
+from collectionjson.serializers import (SparseFieldsetSerializerMixin,
+                                       LinkTemplateSerializerMixin)
 
-class UserSerializer(serializers.HyperlinkedModelSerializer):
+
+class UserSerializer(SparseFieldsetSerializerMixin, LinkTemplateSerializerMixin,
+                     serializers.HyperlinkedModelSerializer):
     username = serializers.CharField(min_length=4, max_length=32,
                                      validators=[UniqueValidator(
                                          queryset=User.objects.all())])
@@ -12,9 +17,9 @@ class UserSerializer(serializers.HyperlinkedModelSerializer):
                                    validators=[UniqueValidator(
                                        queryset=User.objects.all())])
     password = serializers.CharField(min_length=8, max_length=100, write_only=True)
-    favorite_plugin_metas = serializers.HyperlinkedIdentityField(
+    favorite_plugin_metas = HyperlinkedIdentityField(
         view_name='user-favoritepluginmeta-list')
-    collab_plugin_metas = serializers.HyperlinkedIdentityField(
+    collab_plugin_metas = HyperlinkedIdentityField(
         view_name='user-pluginmetacollaborator-list')
 
     def create(self, validated_data):
@@ -0,0 +1,37 @@
+"""
+Signal receivers that discard the cached authentication tokens whenever a token or its
+user changes. Discarded tokens are verified again the next time they are used.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, pre_delete, post_delete
+from rest_framework.authtoken.models import Token
+
+from core.cache import delete_on_commit
+
+from .authentication import get_token_cache_key
+
+
+def discard_token(sender, instance, **kwargs):
+    """
+    Discard the cached token when the token is saved or deleted.
+    """
+    delete_on_commit(get_token_cache_key(instance.key))
+
+
+def discard_user_tokens(sender, instance, **kwargs):
+    """
+    Discard the cached tokens of a user when the user is saved (for instance when it's
+    deactivated) or deleted.
+    """
+    if not kwargs.get('created'):
+        for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+            delete_on_commit(get_token_cache_key(key))
+
+
+post_save.connect(discard_token, sender=Token, dispatch_uid='discard_token_on_save')
+post_delete.connect(discard_token, sender=Token, dispatch_uid='discard_token_on_delete')
+post_save.connect(discard_user_tokens, sender=User,
+                  dispatch_uid='discard_user_tokens_on_save')
+pre_delete.connect(discard_user_tokens, sender=User,
+                   dispatch_uid='discard_user_tokens_on_delete')
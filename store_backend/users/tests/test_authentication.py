@@ -0,0 +1,192 @@
+import base64
+import logging
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth.models import User
+
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from users.authentication import (CachedTokenAuthentication, CachedBasicAuthentication,
+                                  get_token_cache_key, get_credentials_cache_key)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        # avoid cluttered console output (for instance logging all the http requests)
+        logging.disable(logging.WARNING)
+        cache.clear()
+
+        self.user = User.objects.create_user(username='cube', email='dev@babymri.org',
+                                             password='cubepass')
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def tearDown(self):
+        # re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def authenticate(self, key):
+        factory = APIRequestFactory()
+        request = factory.get('/', HTTP_AUTHORIZATION=f'Token {key}')
+        return self.authentication.authenticate(request)
+
+    def test_authenticate_success_uses_cache(self):
+        """
+        Test whether custom authenticate_credentials method gets the token's user from
+        the cache without accessing the DB.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            (user, token) = self.authenticate(self.token.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(cache.get(get_token_cache_key(self.token.key)), self.user)
+        with self.assertNumQueries(0):
+            (user, token) = self.authenticate(self.token.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token, self.token)
+
+    def test_authenticate_does_not_cache_uncommitted_data(self):
+        """
+        Test whether custom authenticate_credentials method does not cache the token
+        until the transaction is committed.
+        """
+        with self.captureOnCommitCallbacks(execute=False):
+            self.authenticate(self.token.key)
+        self.assertIsNone(cache.get(get_token_cache_key(self.token.key)))
+
+    def test_authenticate_failure_invalid_token(self):
+        """
+        Test whether custom authenticate_credentials method raises AuthenticationFailed
+        for an invalid token.
+        """
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate('invalid')
+
+    def test_cached_token_is_discarded_on_token_delete(self):
+        """
+        Test whether the cached token is discarded when the token is deleted.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authenticate(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(self.token.key)
+
+    def test_cached_token_is_discarded_on_user_change(self):
+        """
+        Test whether the cached token is discarded when its user is modified.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authenticate(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertIsNone(cache.get(get_token_cache_key(self.token.key)))
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(self.token.key)
+
+    def test_cached_token_is_discarded_on_user_delete(self):
+        """
+        Test whether the cached token is discarded when its user is deleted.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authenticate(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertIsNone(cache.get(get_token_cache_key(self.token.key)))
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(self.token.key)
+
+
+class CachedBasicAuthenticationTests(TestCase):
+
+    def setUp(self):
+        # avoid cluttered console output (for instance logging all the http requests)
+        logging.disable(logging.WARNING)
+        cache.clear()
+
+        self.username = 'cube'
+        self.password = 'cubepass'
+        self.user = User.objects.create_user(username=self.username,
+                                             email='dev@babymri.org',
+                                             password=self.password)
+        self.authentication = CachedBasicAuthentication()
+
+    def tearDown(self):
+        # re-enable logging
+        logging.disable(logging.NOTSET)
+
+    def authenticate(self, username, password):
+        credentials = base64.b64encode(f'{username}:{password}'.encode()).decode()
+        factory = APIRequestFactory()
+        request = factory.get('/', HTTP_AUTHORIZATION=f'Basic {credentials}')
+        return self.authentication.authenticate(request)
+
+    def test_authenticate_success_skips_password_hashing(self):
+        """
+        Test whether custom authenticate_credentials method checks the password only
+        once for the same credentials.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            (user, auth) = self.authenticate(self.username, self.password)
+        self.assertEqual(user, self.user)
+        with mock.patch('django.contrib.auth.base_user.check_password') as check_mock:
+            (user, auth) = self.authenticate(self.username, self.password)
+            check_mock.assert_not_called()
+        self.assertEqual(user, self.user)
+        self.assertIsNone(auth)
+
+    def test_authenticate_failure_wrong_password_is_not_cached(self):
+        """
+        Test whether custom authenticate_credentials method does not accept a wrong
+        password after the right one has been cached.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authenticate(self.username, self.password)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(self.username, 'wrongpass')
+
+    def test_cached_credentials_are_not_accepted_after_password_change(self):
+        """
+        Test whether the cached credentials are not accepted anymore once the user's
+        password is changed.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authenticate(self.username, self.password)
+        self.user.set_password('newcubepass')
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(self.username, self.password)
+        self.assertIsNone(cache.get(get_credentials_cache_key(self.username,
+                                                               self.password)))
+
+    def test_cached_credentials_are_not_accepted_after_password_change_elsewhere(self):
+        """
+        Test whether the old credentials are rejected once the user's password is
+        changed without sending signals (for instance by another process).
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authenticate(self.username, self.password)
+        self.user.set_password('newcubepass')
+        User.objects.filter(pk=self.user.pk).update(password=self.user.password)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(self.username, self.password)
+        (user, auth) = self.authenticate(self.username, 'newcubepass')
+        self.assertEqual(user, self.user)
+
+    def test_cached_credentials_are_not_accepted_for_inactive_user(self):
+        """
+        Test whether the cached credentials are not accepted anymore once the user is
+        deactivated.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authenticate(self.username, self.password)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(self.username, self.password)
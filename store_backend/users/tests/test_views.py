@@ -112,6 +112,14 @@ class UserDetailViewTests(UserViewTests):
         self.assertContains(response, self.username)
         self.assertContains(response, "dev1@babymri.org")
 
+    def test_user_update_failure_batch_of_templates(self):
+        self.client.login(username=self.username, password=self.password)
+        put = json.dumps({"templates": [
+            {"data": [{"name": "email", "value": "dev1@babymri.org"}]}]})
+        response = self.client.put(self.read_update_url, data=put,
+                                   content_type=self.content_type)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_user_update_failure_unauthenticated(self):
         response = self.client.put(self.read_update_url, data=self.put,
                                    content_type=self.content_type)